@@ -0,0 +1,15 @@
+# ClearML is stubbed before transformers and pipeline steps are imported,
+# so benchmarks run offline
+from benchmarks.offline import stub_clearml
+
+stub_clearml()
+
+from benchmarks.generators import generate_sensor_data, write_raw_files
+from benchmarks.runner import (
+    BenchmarkCase,
+    check_aggregation_parity,
+    compare_with_baseline,
+    get_all_cases,
+    run_benchmarks,
+    save_baseline,
+)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+r"""
+Runs benchmarks of transformers and pipelines on synthetic data, e.g.
+python -m benchmarks --rows 100000 --objects 4 --nan-rate 0.1 --update-baseline
+"""
+from argparse import ArgumentParser
+import logging
+import sys
+
+import pandas as pd
+
+from benchmarks import (
+    check_aggregation_parity,
+    compare_with_baseline,
+    generate_sensor_data,
+    get_all_cases,
+    run_benchmarks,
+    save_baseline,
+)
+from benchmarks.runner import DEFAULT_BASELINE_PATH
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Benchmarks of transformers and pipelines")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows of every object")
+    parser.add_argument("--objects", type=int, default=4, help="Number of objects")
+    parser.add_argument("--features", type=int, default=10, help="Number of sensors")
+    parser.add_argument("--frequency", type=int, default=1, help="Sampling period in seconds")
+    parser.add_argument("--nan-rate", type=float, default=0.05, help="Share of missing values")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Share of duplicated sensors")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of timed runs of every case")
+    parser.add_argument("--cases", nargs="*", help="Names of cases, all cases by default")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Path to baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true", help="Save results as baseline")
+    parser.add_argument(
+        "--check-parity", action="store_true", help="Compare aggregation backends instead of benchmarks"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    data = generate_sensor_data(
+        n_rows=args.rows,
+        n_objects=args.objects,
+        n_features=args.features,
+        frequency=args.frequency,
+        nan_rate=args.nan_rate,
+        duplicate_rate=args.duplicate_rate,
+    )
+    if args.check_parity:
+        parity = check_aggregation_parity(data)
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(parity)
+        return int(not parity["parity"].all())
+
+    results = run_benchmarks(get_all_cases(data, args.cases), repeats=args.repeats)
+
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        if args.update_baseline:
+            print(results)
+            print(f"Baseline is saved to {save_baseline(results, args.baseline)}")
+            return 0
+        try:
+            comparison = compare_with_baseline(results, args.baseline, tolerance=args.tolerance)
+        except FileNotFoundError:
+            print(results)
+            print(f"Baseline {args.baseline} is not found, run with --update-baseline to create it")
+            return 0
+        print(comparison)
+    return int(comparison["regression"].any())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
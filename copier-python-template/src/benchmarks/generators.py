@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+r"""
+Generators of synthetic multi-object sensor data
+"""
+import os
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+def generate_sensor_data(
+    n_rows: int = 100_000,
+    n_objects: int = 4,
+    n_features: int = 10,
+    frequency: int = 1,
+    nan_rate: float = 0.05,
+    duplicate_rate: float = 0.0,
+    feature_names: Optional[List[str]] = None,
+    random_seed: int = 42,
+) -> pd.DataFrame:
+    """Returns synthetic time series of sensors of several objects.
+
+    Every object has its own random walk signals sampled with the same frequency,
+    objects are concatenated one after another and identified by GROUP_ID column.
+
+    Args:
+        n_rows (int, optional): Number of rows of every object. Defaults to 100_000.
+        n_objects (int, optional): Number of objects. Defaults to 4.
+        n_features (int, optional): Number of sensors. Defaults to 10.
+        frequency (int, optional): Sampling period in seconds. Defaults to 1.
+        nan_rate (float, optional): Share of missing values of sensors. Defaults to 0.05.
+        duplicate_rate (float, optional): Share of sensors which have duplicated column
+            with the same name and another missing values. Defaults to 0.0.
+        feature_names (Optional[List[str]], optional): Names of sensors. Defaults to None
+            which means feature_1, ..., feature_n.
+        random_seed (int, optional): Seed of random generator. Defaults to 42.
+
+    Returns:
+        pd.DataFrame: Dataframe with datetime, GROUP_ID and sensors columns.
+    """
+
+    rng = np.random.default_rng(random_seed)
+    feature_names = feature_names or [f"feature_{i}" for i in range(1, n_features + 1)]
+    n_features = len(feature_names)
+    n_duplicates = int(round(duplicate_rate * n_features))
+
+    objects = []
+    for group_id in range(n_objects):
+        values = np.cumsum(rng.normal(size=(n_rows, n_features + n_duplicates)), axis=0)
+        # Duplicated sensors repeat original signal with their own gaps
+        values[:, n_features:] = values[:, :n_duplicates]
+        values[rng.random(values.shape) < nan_rate] = np.nan
+        data = pd.DataFrame(
+            values.astype("float32"),
+            columns=feature_names + feature_names[:n_duplicates],
+        )
+        data.insert(0, "GROUP_ID", group_id)
+        data.insert(0, "datetime", pd.date_range("2024-01-01", periods=n_rows, freq=f"{frequency}s"))
+        objects.append(data)
+    return pd.concat(objects, ignore_index=True)
+
+
+def write_raw_files(
+    directory: Union[str, Path],
+    data: pd.DataFrame,
+) -> List[Path]:
+    """Writes every object of synthetic data to raw csv file like input files of preprocess step.
+
+    Args:
+        directory (Union[str, Path]): Output directory.
+        data (pd.DataFrame): Synthetic data with GROUP_ID column.
+
+    Returns:
+        List[Path]: Paths to raw files.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(exist_ok=True, parents=True)
+    paths = []
+    for group_id, group in data.groupby("GROUP_ID", sort=True):
+        path = Path(os.path.join(directory, f"object_{group_id}.csv"))
+        group.drop(columns="GROUP_ID").to_csv(path, index=False)
+        paths.append(path)
+    return paths
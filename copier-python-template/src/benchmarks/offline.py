@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""Module with stubs of ClearML for offline benchmarks"""
+import sys
+import types
+from unittest.mock import MagicMock
+
+
+def stub_clearml() -> None:
+    r"""Replaces ClearML modules with stubs, so transformers and pipeline steps modules
+    are imported without ClearML server. Already imported ClearML is kept as is."""
+
+    if "clearml" in sys.modules:
+        return
+    clearml = types.ModuleType("clearml")
+    for name in ("Task", "Dataset", "Logger", "StorageManager", "TaskTypes"):
+        setattr(clearml, name, MagicMock(name=name))
+    automation = types.ModuleType("clearml.automation")
+    automation.PipelineController = MagicMock(name="PipelineController")
+    clearml.automation = automation
+    sys.modules["clearml"] = clearml
+    sys.modules["clearml.automation"] = automation
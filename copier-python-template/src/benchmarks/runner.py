@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+r"""
+Benchmarks of transformers and pipelines
+"""
+from dataclasses import dataclass
+import json
+import logging
+import os
+from pathlib import Path
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+from sklearn import set_config
+
+from features.feature_engineer import FeatureEngineer
+from preprocess.preprocessor import Preprocessor
+from utilities.aggregations import check_backends_parity
+from utilities.transformers import (
+    ALL_TRANSFORMERS,
+    Aggregator,
+    Converter,
+    DuplicatedColumnsTransformer,
+    FourierTransformer,
+    MultiAggregator,
+    OutlierImputer,
+    WaveletTransformer,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+SERVICE_COLUMNS = ("datetime", "GROUP_ID")
+DEFAULT_BASELINE_PATH = Path(os.path.join(Path(__file__).resolve().parent, "baseline.json"))
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """Dataclass for describing benchmark of one transformer or pipeline"""
+
+    name: str
+    setup: Callable[[], Tuple[Callable[[Any], Any], Any]]
+    n_rows: int
+
+
+def _copy(data: Any) -> Any:
+    if isinstance(data, list):
+        return [_copy(element) for element in data]
+    return data.copy() if hasattr(data, "copy") else data
+
+
+def get_memory_usage(data: Any) -> int:
+    """Returns memory usage of benchmark input in bytes.
+
+    Args:
+        data (Any): Dataframe, series, array or list of them.
+
+    Returns:
+        int: Memory usage in bytes.
+    """
+
+    if isinstance(data, list):
+        return sum(get_memory_usage(element) for element in data)
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(deep=True).sum())
+    if isinstance(data, pd.Series):
+        return int(data.memory_usage(deep=True))
+    return int(getattr(data, "nbytes", 0))
+
+
+def get_transformer_cases(data: pd.DataFrame) -> List[BenchmarkCase]:
+    """Returns benchmarks of every transformer of ALL_TRANSFORMERS.
+
+    Args:
+        data (pd.DataFrame): Synthetic sensor data.
+
+    Returns:
+        List[BenchmarkCase]: Benchmark cases.
+    """
+
+    deduplicated = data.loc[:, ~data.columns.duplicated()]
+    features = [column for column in deduplicated.columns if column not in SERVICE_COLUMNS]
+    setups: Dict[str, Callable[[], Tuple[Callable[[Any], Any], Any]]] = {
+        DuplicatedColumnsTransformer.__name__: lambda: (DuplicatedColumnsTransformer().transform, data),
+        OutlierImputer.__name__: lambda: (
+            OutlierImputer().transform, deduplicated[[features[0]]].to_numpy()
+        ),
+        Aggregator.__name__: lambda: (
+            Aggregator(
+                feature_source=features[0],
+                feature_name=f"{features[0]}_mean_60",
+                window=60,
+                agg_func="mean",
+            ).transform,
+            deduplicated,
+        ),
+        MultiAggregator.__name__: lambda: (
+            MultiAggregator(aggregators=[
+                Aggregator(
+                    feature_source=feature,
+                    feature_name=f"{feature}_{agg_func}_{window}",
+                    window=window,
+                    agg_func=agg_func,
+                )
+                for feature in features
+                for window in (60, 600)
+                for agg_func in ("mean", "std")
+            ]).transform,
+            deduplicated,
+        ),
+        Converter.__name__: lambda: (
+            Converter(first_feature_source=features[0], second_feature_source=features[-1]).transform,
+            deduplicated,
+        ),
+        FourierTransformer.__name__: lambda: (FourierTransformer().transform, deduplicated[features[0]]),
+        WaveletTransformer.__name__: lambda: (WaveletTransformer().transform, deduplicated[features[0]]),
+    }
+    return [
+        BenchmarkCase(
+            name=name,
+            setup=setups.get(name, lambda transformer=transformer: (transformer().transform, deduplicated)),
+            n_rows=len(data),
+        )
+        for name, transformer in ALL_TRANSFORMERS.items()
+    ]
+
+
+def get_pipeline_cases(data: pd.DataFrame) -> List[BenchmarkCase]:
+    """Returns benchmarks of full Preprocessor and FeatureEngineer runs.
+
+    Preprocessor is applied to every object separately like to raw files,
+    FeatureEngineer is applied to all objects at once like to splitted dataset.
+
+    Args:
+        data (pd.DataFrame): Synthetic sensor data.
+
+    Returns:
+        List[BenchmarkCase]: Benchmark cases.
+    """
+
+    def preprocess(objects: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        # Objects are owned like data loaded in preprocess step
+        return [Preprocessor(copy=False).transform(raw) for raw in objects]
+
+    def setup_feature_engineer() -> Tuple[Callable[[Any], Any], Any]:
+        feature_engineer = FeatureEngineer()
+        features = deduplicated.drop(columns=list(SERVICE_COLUMNS)).columns
+        # Sources of custom aggregations are filled with synthetic sensors
+        sources = {
+            aggregator.feature_source
+            for _, transformer in feature_engineer.custom_pipeline.steps
+            if isinstance(transformer, MultiAggregator)
+            for aggregator in transformer.aggregators
+        }
+        X = deduplicated.assign(**{
+            source: deduplicated[features[i % len(features)]]
+            for i, source in enumerate(sorted(sources - set(deduplicated.columns)))
+        })
+        return feature_engineer.fit(X).transform, X
+
+    deduplicated = data.loc[:, ~data.columns.duplicated()]
+    objects = [group.drop(columns="GROUP_ID") for _, group in data.groupby("GROUP_ID", sort=True)]
+    return [
+        BenchmarkCase(
+            name=Preprocessor.__name__,
+            setup=lambda: (preprocess, objects),
+            n_rows=len(data),
+        ),
+        BenchmarkCase(
+            name=FeatureEngineer.__name__,
+            setup=setup_feature_engineer,
+            n_rows=len(deduplicated),
+        ),
+    ]
+
+
+def run_case(case: BenchmarkCase, repeats: int = 3) -> Dict[str, Any]:
+    """Measures the best time of several runs and peak memory of one more traced run.
+    Input data is copied before every run, copying isn't measured. Peak memory ratio
+    is peak memory of allocations during run relative to memory of input data.
+
+    Args:
+        case (BenchmarkCase): Benchmark case.
+        repeats (int, optional): Number of timed runs. Defaults to 3.
+
+    Returns:
+        Dict[str, Any]: Result of benchmark, failed case has error message.
+    """
+
+    result = {"case": case.name, "rows": case.n_rows}
+    set_config(transform_output="pandas")
+    try:
+        func, data = case.setup()
+        times = []
+        for _ in range(max(repeats, 1)):
+            X = _copy(data)
+            start = time.perf_counter()
+            func(X)
+            times.append(time.perf_counter() - start)
+
+        X = _copy(data)
+        tracemalloc.start()
+        try:
+            func(X)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except Exception as exception:
+        LOGGER.warning(f"Benchmark of {case.name} failed due to: {exception!r}")
+        return {**result, "error": repr(exception)}
+
+    best_time = min(times)
+    input_memory = get_memory_usage(data)
+    return {
+        **result,
+        "time": best_time,
+        "rows_per_second": case.n_rows / best_time if best_time > 0 else float("inf"),
+        "peak_memory": peak_memory,
+        "peak_memory_ratio": peak_memory / input_memory if input_memory else None,
+        "error": None,
+    }
+
+
+def run_benchmarks(cases: List[BenchmarkCase], repeats: int = 3) -> pd.DataFrame:
+    """Runs benchmark cases one by one.
+
+    Args:
+        cases (List[BenchmarkCase]): Benchmark cases.
+        repeats (int, optional): Number of timed runs of every case. Defaults to 3.
+
+    Returns:
+        pd.DataFrame: Time, throughput in rows/s and peak memory in bytes of every case.
+    """
+
+    results = []
+    for case in cases:
+        LOGGER.info(f"Benchmark of {case.name}")
+        results.append(run_case(case, repeats=repeats))
+    return pd.DataFrame(
+        results, 
+        columns=["case", "rows", "time", "rows_per_second", "peak_memory", "peak_memory_ratio", "error"],
+    )
+
+
+def check_aggregation_parity(data: pd.DataFrame, n_rows: int = 100_000) -> pd.DataFrame:
+    """Compares aggregation backends with pandas on sensors of synthetic data.
+
+    Args:
+        data (pd.DataFrame): Synthetic sensor data.
+        n_rows (int, optional): Number of the first rows which are compared. Defaults to 100_000.
+
+    Returns:
+        pd.DataFrame: Maximum absolute difference and parity flag of every backend and aggregation.
+    """
+
+    deduplicated = data.loc[:, ~data.columns.duplicated()]
+    features = [column for column in deduplicated.columns if column not in SERVICE_COLUMNS]
+    return check_backends_parity(
+        deduplicated[features].iloc[:n_rows].to_numpy(dtype="float64", na_value=float("nan"))
+    )
+
+
+def save_baseline(results: pd.DataFrame, path: Union[str, Path]) -> Path:
+    """Saves throughput and peak memory of successful cases as baseline.
+
+    Args:
+        results (pd.DataFrame): Results of run_benchmarks.
+        path (Union[str, Path]): Path to baseline JSON file.
+
+    Returns:
+        Path: Path to baseline JSON file.
+    """
+
+    baseline = {
+        row.case: {"rows_per_second": row.rows_per_second, "peak_memory": int(row.peak_memory)}
+        for row in results[results["error"].isna()].itertuples()
+    }
+    path = Path(path)
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+    return path
+
+
+def compare_with_baseline(
+    results: pd.DataFrame,
+    path: Union[str, Path],
+    tolerance: float = 0.2,
+) -> pd.DataFrame:
+    """Compares results with stored baseline.
+
+    Args:
+        results (pd.DataFrame): Results of run_benchmarks.
+        path (Union[str, Path]): Path to baseline JSON file.
+        tolerance (float, optional): Allowed relative decrease of throughput and
+            increase of peak memory. Defaults to 0.2.
+
+    Returns:
+        pd.DataFrame: Results with baseline values, relative changes and regression flags.
+            Cases missing in baseline are never regressions.
+    """
+
+    with open(path) as file:
+        baseline = pd.DataFrame.from_dict(json.load(file), orient="index")
+    baseline = baseline.add_prefix("baseline_").rename_axis("case").reset_index()
+
+    comparison = results.merge(baseline, on="case", how="left")
+    comparison["speedup"] = comparison["rows_per_second"] / comparison["baseline_rows_per_second"]
+    comparison["memory_ratio"] = comparison["peak_memory"] / comparison["baseline_peak_memory"]
+    comparison["regression"] = (
+        comparison["error"].notna() & comparison["baseline_rows_per_second"].notna()
+    ) | (comparison["speedup"] < 1 - tolerance) | (comparison["memory_ratio"] > 1 + tolerance)
+    return comparison
+
+
+def get_all_cases(data: pd.DataFrame, names: Optional[List[str]] = None) -> List[BenchmarkCase]:
+    """Returns benchmarks of transformers and pipelines.
+
+    Args:
+        data (pd.DataFrame): Synthetic sensor data.
+        names (Optional[List[str]], optional): Names of cases to keep. Defaults to None
+            which means all cases.
+
+    Returns:
+        List[BenchmarkCase]: Benchmark cases.
+    """
+
+    cases = get_transformer_cases(data) + get_pipeline_cases(data)
+    if names:
+        cases = [case for case in cases if case.name in names]
+    return cases
@@ -16,4 +16,8 @@ FILLNA_CONFIG: Dict[str, Dict[str, Union[Union[float, int], Optional[str]]]] = \
     {  
     "feature_1": {"value": 0, "method": None, "limit": None}, 
     }
-    
\ No newline at end of file
+    
+RESAMPLING_CONFIG: Dict[str, str] = \
+    {
+    "feature_1": "mean",
+    }
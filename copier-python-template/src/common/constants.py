@@ -4,7 +4,21 @@ from datetime import timedelta
 
 SECONDS_IN_MINUTE = int(timedelta(minutes=1).total_seconds())
 SECONDS_IN_HOUR = int(timedelta(hours=1).total_seconds())
+TIMESTEP_SAMPLE_SIZE = 100_000
 
-GENERAL_EXTENSION = ".gz"
+PICKLE_EXTENSION = ".gz"
+PARQUET_EXTENSION = ".parquet"
+FEATHER_EXTENSION = ".feather"
+GENERAL_EXTENSION = PARQUET_EXTENSION
+MANIFEST_FILE_NAME = "manifest.json"
+CHECKSUMS_FILE_NAME = "checksums.json"
+OBJECTS_FOLDER_NAME = "objects"
+SCHEMA_FILE_NAME = "schema.json"
+MODEL_FILE_NAME = "example.cbm"
 
 IGNORED_FEATURES = ["GROUP_ID", "SOME_FORBIDDEN_COLUMN"]
+METRICS = ["Accuracy", "AUC", "Recall", "Precision", "F1", "BalancedAccuracy", "MCC"]
+# Parameters of train step which aren't parameters of CatBoost model
+TRAIN_STEP_PARAMS = ["skip_cv", "n_splits", "train_final_model", "binary_threshold", "columns", "groups"]
+# Parameters of CatBoost model which are applied once on quantization of train pool
+QUANTIZATION_PARAMS = ["border_count", "max_bin", "feature_border_type", "per_float_feature_quantization", "nan_mode"]
@@ -19,4 +19,12 @@ class PipelineExecutionError(BaseException):
     
     
 class DatasetDownloadError(BaseException):
-    """Raised when pipeline failed during execution."""
\ No newline at end of file
+    """Raised when pipeline failed during execution."""
+    
+    
+class DatasetUploadError(BaseException):
+    """Raised when pipeline failed during uploading dataset."""
+    
+    
+class DatasetWriteError(BaseException):
+    """Raised when chunks of dataset can't be written to one file."""
@@ -54,6 +54,12 @@ TRAIN = PipelineStep(
     input_directory=storage_settings.features_folder,
     output_directory=storage_settings.prediction_folder
 )
+PREDICT = PipelineStep(
+    name="predict",
+    task_type=TaskTypes.inference.name,
+    input_directory=storage_settings.inference_folder,
+    output_directory=storage_settings.scores_folder
+)
 PLOTTING = PipelineStep(
     name="plotting",
     task_type=TaskTypes.service.name,
@@ -1,3 +1,3 @@
 from core.loader import BaseLoader
+from core.transformer import BaseTransformer
 from core.pipeline_step import BasePipelineStep
-from core import BaseTransformer
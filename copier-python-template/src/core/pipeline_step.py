@@ -1,37 +1,49 @@
 # -*- coding: utf-8 -*-
 """ Base pipeline step """
 from abc import ABC, abstractmethod
+import json
 import logging
+import os
 from pathlib import Path
 import traceback
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 from clearml import Task, Dataset
 import pandas as pd
 import yaml
 
+from common.constants import CHECKSUMS_FILE_NAME, MANIFEST_FILE_NAME
 from common.pipeline_steps import PipelineStep
 from common.exceptions import (
     DatasetDownloadError,
     PipelineExecutionError,
 )
 from settings import Settings
-from utilities.utils import compress_pickle
+from utilities.cache import StepCache, get_code_version, get_file_hash
+from utilities.utils import save_data
 from utilities.path_utils import is_empty_dir
+from utilities.profiling import StageProfiler
+from utilities.transfer import DatasetTransfer, get_storage_backend, join_url
+from utilities.writers import DatasetWriter
 
 
 class BasePipelineStep(ABC):
     r"""Abstract class for all pipeline steps."""
+    
+    # Modules which affect outputs of step besides the step module itself and project modules
+    # imported by them, which are hashed transitively
+    _cache_modules: List[str] = ["common.config"]
 
     def __init__(
         self,
         settings: 'Settings',
         pipeline_step: 'PipelineStep',
-        previous_pipeline_step: 'PipelineStep',
+        previous_pipeline_step: Optional['PipelineStep'] = None,
     ):
         self.settings: Settings = settings
         self.pipeline_step: PipelineStep = pipeline_step
-        self.previous_pipeline_step: PipelineStep = previous_pipeline_step
+        self.previous_pipeline_step: Optional[PipelineStep] = previous_pipeline_step
+        self.profiler = StageProfiler(enabled=self.settings.profiling.enabled)
 
         self._init_task()
         self._init_parameters()
@@ -159,16 +171,105 @@ class BasePipelineStep(ABC):
         else:
             raise PipelineExecutionError
         
-        _ = remote_dataset.get_mutable_local_copy(self._input_directory)
+        self._download_dataset(remote_dataset, self._input_directory)
+    
+    def _get_transfer(self, remote_url: str) -> DatasetTransfer:
+        return DatasetTransfer(
+            backend=get_storage_backend(remote_url),
+            max_workers=self.settings.transfer.max_workers,
+            retries=self.settings.transfer.retries,
+        )
+    
+    @staticmethod
+    def _get_remote_prefix(dataset: Dataset) -> Optional[str]:
+        r"""Returns remote folder of dataset version uploaded by transfer layer."""
+        for entry in dataset.link_entries:
+            if Path(entry.relative_path).name == CHECKSUMS_FILE_NAME:
+                return entry.link[:-len(CHECKSUMS_FILE_NAME)].rstrip('/')
+        return None
+    
+    def _download_dataset(
+        self,
+        dataset: Dataset,
+        local_folder: Union[str, Path],
+    ) -> None:
+        # Datasets uploaded by transfer layer are downloaded concurrently with resume
+        if remote_prefix := self._get_remote_prefix(dataset):
+            self._get_transfer(remote_prefix).download(remote_prefix, local_folder)
+        else:
+            _ = dataset.get_mutable_local_copy(local_folder, overwrite=True)
+    
+    @property
+    def _previous_output_dataset(self) -> Optional[Dataset]:
+        if not hasattr(self, '_previous_dataset'):
+            try:
+                self._previous_dataset = Dataset.get(
+                    dataset_project=self.settings.clearml.project,
+                    dataset_name=f"{self.settings.clearml.project} "
+                        f"{self.pipeline_step.name.replace('_', ' ')} output dataset",
+                    dataset_tags=self.settings.clearml.tags,
+                    only_completed=True,
+                )
+            except ValueError:
+                self._previous_dataset = None
+        return self._previous_dataset
+    
+    @property
+    def _manifest_path(self) -> Path:
+        return Path(os.path.join(self._output_directory, MANIFEST_FILE_NAME))
+    
+    def _load_manifest(self) -> Dict[str, Dict[str, str]]:
+        r"""Returns manifest of previous run which maps input files to their hashes, keys and outputs.
+        Outputs of previous run are downloaded if they are missing locally."""
+        if not self._manifest_path.exists() and self._previous_output_dataset is not None:
+            self._download_dataset(self._previous_output_dataset, self._output_directory)
+        if not self._manifest_path.exists():
+            return {}
+        with open(self._manifest_path) as file:
+            return json.load(file)
+    
+    def _save_manifest(self, manifest: Dict[str, Dict[str, str]]) -> None:
+        with open(self._manifest_path, "w") as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+    
+    def _get_file_hash(self, file_path: Union[str, Path]) -> str:
+        if not hasattr(self, '_file_hashes'):
+            self._file_hashes: Dict[Path, str] = {}
+        file_path = Path(file_path)
+        if file_path not in self._file_hashes:
+            self._file_hashes[file_path] = get_file_hash(file_path)
+        return self._file_hashes[file_path]
         
     def _upload_output_dataset(self) -> None:
+        # In incremental mode only changes relative to previous dataset version are uploaded
+        parent_dataset = self._previous_output_dataset if self.settings.incremental else None
         dataset = Dataset.create(
             dataset_project=self.settings.clearml.project,
             dataset_name=f"{self.settings.clearml.project} {self.pipeline_step.name.replace('_', ' ')} "
                 f"output dataset",
             dataset_tags=self.settings.clearml.tags,
+            parent_datasets=[parent_dataset.id] if parent_dataset is not None else None,
         )  
-        dataset.add_files(path=self._output_directory)
+        if output_url := self.settings.transfer.output_url:
+            # Files are uploaded concurrently to objects folder shared by runs of step, so files stored
+            # by previous runs aren't uploaded again. Dataset links checksums file of its own version
+            # folder, it lists files of version, so new runs don't change files of previous versions
+            remote_prefix = join_url(
+                output_url,
+                self.settings.clearml.project,
+                self.pipeline_step.name,
+                self.task.id,
+            )
+            self._get_transfer(remote_prefix).upload(self._output_directory, remote_prefix)
+            # Entries of parent dataset are replaced by checksums file of the new version
+            if parent_dataset is not None:
+                for file in set(dataset.list_files()) - {CHECKSUMS_FILE_NAME}:
+                    dataset.remove_files(dataset_path=file)
+            dataset.add_external_files(source_url=join_url(remote_prefix, CHECKSUMS_FILE_NAME))
+        elif parent_dataset is not None:
+            dataset.sync_folder(local_path=self._output_directory)
+        else:
+            dataset.add_files(path=self._output_directory)
         dataset.finalize(auto_upload=True)
         self.task.set_parameter(
             name="output_dataset_id",
@@ -180,8 +281,24 @@ class BasePipelineStep(ABC):
         path: Union[str, Path],
         data: pd.DataFrame,
     ) -> None:
+        file_name = Path(path).name
         try:    
-            file_name = compress_pickle(path, data).name
+            file_name = save_data(path, data, extension=self._extension).name
+            self._log_success_save_data(file_name=file_name)
+        except Exception as exception:
+            self._log_failed_save_data(
+                file_name=file_name,
+                exception=exception,
+            )
+            raise PipelineExecutionError
+    
+    def _get_writer(self, path: Union[str, Path]) -> DatasetWriter:
+        return DatasetWriter(path, extension=self._extension)
+    
+    def _close_writer(self, writer: DatasetWriter) -> None:
+        file_name = writer.path.name
+        try:
+            writer.close()
             self._log_success_save_data(file_name=file_name)
         except Exception as exception:
             self._log_failed_save_data(
@@ -197,6 +314,35 @@ class BasePipelineStep(ABC):
     @property 
     def _output_directory(self):
         return self.pipeline_step.output_directory
+    
+    @property 
+    def _extension(self) -> str:
+        return self.settings.storage.extension
+    
+    @property 
+    def _cache(self) -> Optional[StepCache]:
+        if not self.settings.cache.enabled:
+            return None
+        if not hasattr(self, '_step_cache'):
+            self._step_cache = StepCache(
+                directory=Path(os.path.join(self.settings.storage.cache_folder, self.pipeline_step.name)),
+                max_size=self.settings.cache.max_size,
+            )
+        return self._step_cache
+    
+    def _get_cache_key(self, file_path: Union[str, Path], *parts: Any) -> str:
+        if not hasattr(self, '_code_version'):
+            self._code_version = get_code_version(self._cache_modules + [type(self).__module__])
+        # Key is also compared by incremental manifest, so it doesn't depend on enabled cache
+        return StepCache.get_key(
+            self._get_file_hash(file_path),
+            self.pipeline_step.name,
+            self.common_params,
+            self.step_params,
+            self._extension,
+            self._code_version,
+            *parts,
+        )
 
     @property 
     @abstractmethod
@@ -211,12 +357,38 @@ class BasePipelineStep(ABC):
     def _process_data(self):
         pass
     
+    def _report_profile(self) -> None:
+        summary = self.profiler.summary()
+        if summary.empty:
+            return
+        self.task.logger.report_table(
+            title="Profiling",
+            series=self.pipeline_step.name,
+            iteration=0,
+            table_plot=summary,
+        )
+        for stage, stage_summary in summary.groupby("stage", sort=False):
+            for metric in ("wall_time", "cpu_time"):
+                self.task.logger.report_single_value(
+                    name=f"{stage} {metric}",
+                    value=stage_summary[metric].sum(),
+                )
+        trace_path = self.profiler.save(Path(os.path.join(
+            self.settings.artifacts.reports_folder,
+            f"{self.pipeline_step.name}_trace.json",
+        )))
+        self.task.upload_artifact(name='profiling_trace', artifact_object=trace_path)
+    
     def _execute(self):
-        self._process_data()
-        self._upload_output_dataset()
-        self._upload_artifacts()
+        with self.profiler.measure("_process_data"):
+            self._process_data()
+        with self.profiler.measure("_upload_output_dataset"):
+            self._upload_output_dataset()
+        with self.profiler.measure("_upload_artifacts"):
+            self._upload_artifacts()
+        self._report_profile()
         
         self.task.logger.report_text(
             f"{self.pipeline_step.name} is finished",
             level=logging.INFO
-        ) 
\ No newline at end of file
+        ) 
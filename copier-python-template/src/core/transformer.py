@@ -7,7 +7,14 @@ from sklearn.base import BaseEstimator, TransformerMixin
 
 
 class BaseTransformer(BaseEstimator, TransformerMixin):
-    r"""Abstract class for all transformers."""
+    r"""Abstract class for all transformers.
+
+    Ownership contract of transform: with `copy` set to True input data is never modified,
+    with `copy` set to False transformer owns input data and may modify it in place,
+    so caller mustn't use input data after transform.
+    """
+    copy: bool = True
+    
     def fit(self, X, y=None):
         return self
     
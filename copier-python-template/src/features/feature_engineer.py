@@ -1,29 +1,61 @@
 # -*- coding: utf-8 -*-
 """ Base feature engineer """
+from functools import partial
 import logging
-from typing import List
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
 from sklearn import set_config
 from sklearn.pipeline import Pipeline, make_pipeline
 
+from common.constants import TIMESTEP_SAMPLE_SIZE
 from core import BaseTransformer
 from utilities.transformers import (
     InfValuesTransformer,
     ColumnsTypeTransformer,
     FillNanTransformer,
     Aggregator,
+    MultiAggregator,
 )
+from utilities.parallel import process_map
 from utilities.utils import get_common_timestep
 
+if TYPE_CHECKING:
+    from settings import MultiprocessingSettings
+
 LOGGER = logging.getLogger(__name__)
 
+
+def transform_partition(feature_engineer: 'FeatureEngineer', X: pd.DataFrame) -> pd.DataFrame:
+    """Applies feature engineer pipeline to one partition in child process."""
+    return feature_engineer._transform_partition(X)
+
     
 class FeatureEngineer(BaseTransformer):
+
+    def __init__(
+        self,
+        group_column: Optional[str] = "GROUP_ID",
+        multiprocessing_settings: Optional['MultiprocessingSettings'] = None,
+        copy: bool = True,
+    ):
+        """
+        Args:
+            group_column (Optional[str], optional): Column of object identifiers. Pipeline is applied
+                to every object separately, so windows never cross objects boundaries. 
+                Defaults to "GROUP_ID".
+            multiprocessing_settings (Optional[MultiprocessingSettings], optional): Settings of 
+                process pool for partitions. Defaults to None which means sequential processing.
+            copy (bool, optional): Whether to copy input data. Defaults to True.
+        """
+        self.group_column = group_column
+        self.multiprocessing_settings = multiprocessing_settings
+        self.copy = copy
     
     def fit(self, X, y=None):
         self.prefitted_pipeline = None
+        self.time_steps_ = {}
         return self
     
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
@@ -32,18 +64,60 @@ class FeatureEngineer(BaseTransformer):
             X = X.copy()
             
         self.initial_columns = X.columns
-        self.time_step = get_common_timestep(X)
         
+        if self.group_column is not None and self.group_column in X.columns:
+            X = self._transform_partitions(X)
+        else:
+            self.time_step = get_common_timestep(X)
+            X = self._transform_partition(X)
+        self.output_columns = X.columns
+        
+        return X
+
+    def _transform_partition(self, X: pd.DataFrame) -> pd.DataFrame:
         set_config(transform_output="pandas")
         combined_pipeline = make_pipeline(
             self.preprocessing_pipeline,
             self.custom_pipeline,
         )
         # It's required to start this pipeline to get masks for further transformers
-        X = combined_pipeline.fit_transform(X)
-        self.output_columns = X.columns
+        return combined_pipeline.fit_transform(X)
+
+    def _transform_partitions(self, X: pd.DataFrame) -> pd.DataFrame:
+        groups = X.groupby(self.group_column, sort=False, observed=True, dropna=False).indices
+        self.time_step = self._get_time_step(X, groups)
+        positions = list(groups.values())
+        partitions = [X.iloc[partition_positions] for partition_positions in positions]
         
-        return X
+        if self.multiprocessing_settings is not None and len(partitions) > 1:
+            outputs = process_map(
+                partial(transform_partition, self),
+                partitions,
+                settings=self.multiprocessing_settings,
+            )
+        else:
+            outputs = [self._transform_partition(partition) for partition in partitions]
+        for output in outputs:
+            if isinstance(output, Exception):
+                raise output
+        
+        # Restore original order of rows
+        order = np.argsort(np.concatenate(positions), kind="stable")
+        return pd.concat(outputs).iloc[order]
+    
+    def _get_time_step(self, X: pd.DataFrame, groups: Dict[Any, np.ndarray]) -> Optional[int]:
+        r"""Returns the smallest time step of objects. Time step of every object is inferred
+        from its first rows once and cached, so train and test of the same objects reuse it."""
+        if not hasattr(self, "time_steps_"):
+            self.time_steps_: Dict[Any, Optional[int]] = {}
+        datetime_columns = X.select_dtypes(include=["datetime64", "datetimetz"]).columns
+        for group, group_positions in groups.items():
+            if group not in self.time_steps_:
+                self.time_steps_[group] = get_common_timestep(
+                    X[datetime_columns].iloc[group_positions[:TIMESTEP_SAMPLE_SIZE]]
+                )
+        time_steps = [self.time_steps_[group] for group in groups if self.time_steps_[group] is not None]
+        return min(time_steps) if time_steps else None
     
     @property
     def preprocessing_pipeline(self) -> 'Pipeline':
@@ -62,7 +136,8 @@ class FeatureEngineer(BaseTransformer):
     
     @property
     def custom_pipeline(self) -> 'Pipeline':
-        pipeline = [
+        # Aggregators are computed in batches by MultiAggregator
+        aggregators = [
             Aggregator(
                 feature_source="some_column",
                 window=120,
@@ -71,6 +146,9 @@ class FeatureEngineer(BaseTransformer):
                 feature_name="some_column_median_120_shift_0", 
             ),
         ]
+        pipeline = [
+            MultiAggregator(aggregators=aggregators),
+        ]
         return make_pipeline(*pipeline)
 
     @property
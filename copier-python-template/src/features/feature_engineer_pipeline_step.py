@@ -8,12 +8,11 @@ import traceback
 from typing import List, Union, TYPE_CHECKING
 import warnings
 
-from common.constants import GENERAL_EXTENSION
 from common.exceptions import PipelineExecutionError
 from common.pipeline_steps import FEATURE_ENGINEER
 from core import BasePipelineStep
 from features.feature_engineer import FeatureEngineer
-from utilities.loaders import PickleLoader
+from utilities.loaders import get_loader
 
 if TYPE_CHECKING:
     from settings import Settings
@@ -33,7 +32,7 @@ class FeatureEngineerPipelineStep(BasePipelineStep):
     def _input_files(self) -> List[Path]:
         self._check_input_directory()
         input_directory = self._input_directory
-        file_type = f"/*{GENERAL_EXTENSION}"
+        file_type = f"/*{self._extension}"
         input_filepath_files = [
             Path(file_path) for file_path in glob(str(input_directory) + file_type)
         ]
@@ -54,15 +53,19 @@ class FeatureEngineerPipelineStep(BasePipelineStep):
             artifact_object={"processing_errors": processing_errors})
     
     def _process_data(self) -> None:
-        train_input_directory = Path(os.path.join(self._input_directory, "train"))
-        train = PickleLoader(path=train_input_directory).load()
+        train_input_directory = Path(os.path.join(self._input_directory, f"train{self._extension}"))
+        with self.profiler.measure("load", "train"):
+            train = get_loader(path=train_input_directory).load()
         try :
-            test = PickleLoader(path=Path(os.path.join(self._input_directory, "test"))).load()
+            with self.profiler.measure("load", "test"):
+                test = get_loader(
+                    path=Path(os.path.join(self._input_directory, f"test{self._extension}"))
+                ).load()
         except FileNotFoundError:
             test = None
               
         try:    
-            fe = FeatureEngineer()
+            fe = FeatureEngineer(multiprocessing_settings=self.settings.multiprocessing)
             fe.fit(train)
         except Exception as exception:
             self.task.logger.report_text(
@@ -81,26 +84,30 @@ class FeatureEngineerPipelineStep(BasePipelineStep):
             artifact_object={"feature_engineer": fe}
         )
 
-        train = fe.transform(train)        
+        with self.profiler.measure("transform", "train"):
+            train = fe.transform(train)        
         train_output_directory = Path(os.path.join(
             self._output_directory, 
-            f"train{GENERAL_EXTENSION}"
+            f"train{self._extension}"
         ))
-        self._save_locally_data(
-            path=train_output_directory,
-            data=train,
-        )
+        with self.profiler.measure("save", "train"):
+            self._save_locally_data(
+                path=train_output_directory,
+                data=train,
+            )
         
         if test or not test.empty:
-            test = fe.transform(test)
+            with self.profiler.measure("transform", "test"):
+                test = fe.transform(test)
             test_output_directory = Path(os.path.join(
                 self._output_directory, 
-                f"test{GENERAL_EXTENSION}"
+                f"test{self._extension}"
             ))
-            self._save_locally_data(
-                path=test_output_directory,
-                data=test,
-            )
+            with self.profiler.measure("save", "test"):
+                self._save_locally_data(
+                    path=test_output_directory,
+                    data=test,
+                )
 
         del train, test
         gc.collect()
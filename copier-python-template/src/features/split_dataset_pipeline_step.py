@@ -5,17 +5,18 @@ from glob import glob
 import logging
 from pathlib import Path
 import random
+import shutil
 from typing import Dict, List, Optional, TYPE_CHECKING
 import warnings
 
-import pandas as pd
 from tqdm import tqdm
 
-from common.constants import GENERAL_EXTENSION
+from common.constants import SCHEMA_FILE_NAME
 from common.exceptions import PipelineExecutionError
 from common.pipeline_steps import SPLIT_DATASET
 from core import BasePipelineStep
-from utilities.loaders import PickleLoader
+from utilities.loaders import get_loader
+from utilities.schema import DataSchema, INTEGER_DTYPES
 
 if TYPE_CHECKING:
     from settings import Settings
@@ -35,7 +36,7 @@ class SplitDatasetPipelineStep(BasePipelineStep):
     def _input_files(self) -> List[Path]:
         self._check_input_directory()
         input_directory = self._input_directory
-        file_type = f"/*{GENERAL_EXTENSION}"
+        file_type = f"/*{self._extension}"
         input_filepath_files = [
             Path(file_path) for file_path in glob(str(input_directory) + file_type)
         ]
@@ -69,27 +70,50 @@ class SplitDatasetPipelineStep(BasePipelineStep):
         }
         self.task.upload_artifact("groups_mapping", self.file_name_mapping)  
     
+    def _get_schema(self) -> Optional[DataSchema]:
+        r"""Returns schema saved by preprocess step, so all objects are written with the same dtypes
+        and categories. Schema is copied to output dataset for the next steps."""
+        schema_path = Path(os.path.join(self._input_directory, SCHEMA_FILE_NAME))
+        if not schema_path.exists():
+            return None
+        shutil.copy(schema_path, os.path.join(self._output_directory, SCHEMA_FILE_NAME))
+        schema = DataSchema.load(schema_path)
+        # Integer columns of raw data are resampled to floats by preprocessor,
+        # categorical columns of all objects are encoded with shared categories
+        return DataSchema(
+            dtypes={
+                column: dtype for column, dtype in schema.dtypes.items() 
+                if dtype.lower() not in INTEGER_DTYPES
+            },
+            categories=schema.categories,
+        )
+    
     def _process_data(self) -> None:
         self._set_test_objects()
         self._log_groups_mapping()
-            
-        train = pd.DataFrame()
-        test = pd.DataFrame()
+        
+        # Every object is appended to output file once, so it's partitioned by GROUP_ID
+        input_files = self._input_files
+        schema = self._get_schema()
+        train_writer = self._get_writer(Path(os.path.join(self._output_directory, "train")))
+        test_writer = self._get_writer(Path(os.path.join(self._output_directory, "test")))
         try:
-            for file_path in tqdm(self._input_files, total=len(self._input_files)):
+            for file_path in tqdm(input_files, total=len(input_files)):
                 file_name = Path(file_path).stem
                 self.task.logger.report_text(
                     f"Processing of {file_name}", 
                     level=logging.DEBUG,
                     print_console=False,
                 )
-                data = PickleLoader(path=file_path).load()
+                data = get_loader(path=file_path).load()
+                if schema is not None:
+                    data = schema.apply(data)
                 data['GROUP_ID'] = self.file_name_mapping[file_name]
 
                 if file_name in self.test_objects:
-                    test = pd.concat([test, data])
+                    test_writer.write(data)
                 else:
-                    train = pd.concat([train, data])
+                    train_writer.write(data)
 
                 del data
                 gc.collect()
@@ -100,14 +124,11 @@ class SplitDatasetPipelineStep(BasePipelineStep):
                 exception=exception,
             )
             raise PipelineExecutionError
-        
-        self._save_locally_data(
-            path=Path(os.path.join(self._output_directory, "train")),
-            data=train,
-        )
-
-        if self.step_params.get('split_test', False) and not test.empty:
-            self._save_locally_data(
-                path=Path(os.path.join(self._output_directory, "test")),
-                data=test,
-            )
\ No newline at end of file
+        else:
+            self._close_writer(train_writer)
+            if self.step_params.get('split_test', False) and test_writer.n_rows:
+                self._close_writer(test_writer)
+        finally:
+            # Hidden segments of writers which weren't closed are removed
+            train_writer.abort()
+            test_writer.abort()
\ No newline at end of file
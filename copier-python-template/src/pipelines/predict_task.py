@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from predict import PredictPipelineStep
+from settings import Settings
+
+
+if __name__ == "__main__":
+    PredictPipelineStep(settings=Settings())
\ No newline at end of file
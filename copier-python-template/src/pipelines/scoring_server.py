@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+import yaml
+
+from common.pipeline_steps import PREDICT
+from predict.scoring import ScoringService, serve
+from settings import Settings
+
+
+if __name__ == "__main__":
+    settings = Settings()
+    with open(settings.params_path) as file:
+        params = yaml.load(file, Loader=yaml.Loader).get(PREDICT.name) or {}
+    service = ScoringService.from_settings(
+        settings,
+        feature_engineer_task_id=params.get("feature_engineer_task_id"),
+        train_task_id=params.get("train_task_id"),
+        threshold=params.get("binary_threshold", 0.5),
+    )
+    serve(service, host=settings.scoring.host, port=settings.scoring.port)
\ No newline at end of file
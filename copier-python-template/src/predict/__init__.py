@@ -0,0 +1 @@
+from predict.predict_pipeline_step import PredictPipelineStep
\ No newline at end of file
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Module with loading of fitted artifacts of pipeline tasks for inference"""
+from functools import lru_cache
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Union, TYPE_CHECKING
+
+from catboost import CatBoostClassifier
+from clearml import Task
+
+from common.constants import MODEL_FILE_NAME
+from common.pipeline_steps import FEATURE_ENGINEER, PREPROCESS, TRAIN
+from features.feature_engineer import FeatureEngineer
+from utilities.schema import DataSchema
+
+if TYPE_CHECKING:
+    from settings import Settings
+
+LOGGER = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def load_model(model_path: Union[Path, str]) -> CatBoostClassifier:
+    """Returns fitted model, it's loaded once per process.
+
+    Args:
+        model_path (Union[Path, str]): Path to fitted CatBoost model.
+
+    Returns:
+        CatBoostClassifier: Fitted model.
+    """
+    return CatBoostClassifier().load_model(str(model_path))
+
+
+def get_artifacts_task(settings: 'Settings', pipeline_step_name: str, task_id: Optional[str] = None) -> Task:
+    """Returns task with artifacts of pipeline step.
+
+    Args:
+        settings (Settings): Project settings.
+        pipeline_step_name (str): Name of pipeline step.
+        task_id (Optional[str], optional): Id of task. Defaults to None which means
+            the last completed task of pipeline step.
+
+    Returns:
+        Task: ClearML task.
+    """
+
+    if task_id:
+        return Task.get_task(task_id=task_id)
+    return Task.get_task(
+        project_name=settings.clearml.project,
+        task_name=f'{pipeline_step_name} task',
+        task_filter={'status': ['completed']},
+    )
+
+
+def get_feature_engineer(settings: 'Settings', task_id: Optional[str] = None) -> FeatureEngineer:
+    """Returns fitted feature engineer of feature engineer task.
+
+    Args:
+        settings (Settings): Project settings.
+        task_id (Optional[str], optional): Id of feature engineer task. Defaults to None
+            which means the last completed one.
+
+    Returns:
+        FeatureEngineer: Fitted feature engineer.
+    """
+    task = get_artifacts_task(settings, FEATURE_ENGINEER.name, task_id)
+    return task.artifacts['feature_engineer'].get()["feature_engineer"]
+
+
+def get_model_path(settings: 'Settings', task_id: Optional[str] = None) -> Path:
+    """Returns path to fitted model. Model of the last local training is used,
+    otherwise it's downloaded from train task.
+
+    Args:
+        settings (Settings): Project settings.
+        task_id (Optional[str], optional): Id of train task, its model is always downloaded.
+            Defaults to None.
+
+    Returns:
+        Path: Path to fitted CatBoost model.
+    """
+
+    model_path = Path(os.path.join(settings.artifacts.models_folder, MODEL_FILE_NAME))
+    if task_id or not model_path.exists():
+        task = get_artifacts_task(settings, TRAIN.name, task_id)
+        model_path = Path(task.models["output"][-1].get_local_copy())
+    return model_path
+
+
+def get_schema(settings: 'Settings') -> Optional[DataSchema]:
+    """Returns schema of raw data saved by preprocess task.
+
+    Args:
+        settings (Settings): Project settings.
+
+    Returns:
+        Optional[DataSchema]: Schema of raw data. None if schema is disabled or isn't found.
+    """
+
+    if not settings.data_schema.enabled:
+        return None
+    try:
+        schema = get_artifacts_task(settings, PREPROCESS.name).artifacts['schema'].get()
+    except Exception as exception:
+        LOGGER.warning(f"Schema of raw data isn't loaded due to: {exception!r}")
+        return None
+    return DataSchema(**schema)
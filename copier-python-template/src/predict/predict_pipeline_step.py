@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+import os
+import gc
+from functools import partial
+from glob import glob
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+import warnings
+
+from sklearn import set_config
+
+from common.exceptions import PipelineExecutionError
+from common.pipeline_steps import PREDICT
+from core import BasePipelineStep
+from features.feature_engineer import FeatureEngineer
+from predict.artifacts import get_feature_engineer, get_model_path, get_schema, load_model
+from preprocess.preprocessor import Preprocessor
+from utilities.loaders import CsvLoader
+from utilities.parallel import process_map
+from utilities.prediction import BatchPredictor, add_ignored_features
+from utilities.profiling import StageProfiler
+from utilities.schema import DataSchema
+from utilities.writers import DatasetWriter
+
+if TYPE_CHECKING:
+    from settings import Settings
+
+warnings.simplefilter(action="ignore", category=FutureWarning)
+
+
+def predict_input_file(
+    file_path: Union[Path, str],
+    output_directory: Union[Path, str],
+    feature_engineer: FeatureEngineer,
+    model_path: Union[Path, str],
+    extension: str,
+    threshold: float = 0.5,
+    batch_size: int = 100_000,
+    schema: Optional[DataSchema] = None,
+    profiler: Optional[StageProfiler] = None,
+) -> str:
+    """Loads, preprocesses, transforms features and predicts raw file, predictions
+    are saved by batches. It's executed in child process so it doesn't use ClearML task.
+
+    Args:
+        file_path (Union[Path, str]): Path to raw file.
+        output_directory (Union[Path, str]): Path to output directory.
+        feature_engineer (FeatureEngineer): Fitted feature engineer.
+        model_path (Union[Path, str]): Path to fitted CatBoost model.
+        extension (str): Extension of output file.
+        threshold (float, optional): Threshold of positive class. Defaults to 0.5.
+        batch_size (int, optional): Number of rows predicted at once. Defaults to 100_000.
+        schema (Optional[DataSchema], optional): Schema of raw data. Defaults to None.
+        profiler (Optional[StageProfiler], optional): Profiler of stages. Defaults to None.
+
+    Returns:
+        str: Name of processed object.
+    """
+
+    profiler = profiler or StageProfiler()
+    file_path = Path(file_path)
+    file_name = file_path.stem.replace(" ", "").upper()
+    set_config(transform_output="pandas")
+    model = load_model(model_path)
+
+    with profiler.measure("load"):
+        data = CsvLoader(path=file_path).load()
+    with profiler.measure("preprocess"):
+        data = Preprocessor(profiler=profiler, copy=False, schema=schema).transform(data)
+    with profiler.measure("feature_engineer"):
+        data = add_ignored_features(feature_engineer.transform(data), [model])
+
+    predictor = BatchPredictor(models=[model], batch_size=batch_size, threshold=threshold)
+    columns = [column for column in ["datetime"] if column in data.columns]
+    with profiler.measure("predict"):
+        with DatasetWriter(Path(os.path.join(output_directory, file_name)), extension=extension) as writer:
+            predictor.write(data, writer, columns=columns)
+
+    del data
+    gc.collect()
+
+    return file_name
+
+
+def profile_input_file(file_path: Union[Path, str], **kwargs: Any) -> Tuple[str, List[Dict[str, Any]]]:
+    """Predicts raw file in child process with enabled profiler.
+
+    Args:
+        file_path (Union[Path, str]): Path to raw file.
+        kwargs (Any): Other arguments of `predict_input_file`.
+
+    Returns:
+        Tuple[str, List[Dict[str, Any]]]: Name of processed object and profiling records.
+    """
+
+    profiler = StageProfiler(enabled=True)
+    file_name = Path(file_path).stem.replace(" ", "").upper()
+    with profiler.measure("predict_input_file", file_name):
+        file_name = predict_input_file(file_path, profiler=profiler, **kwargs)
+    return file_name, profiler.records
+
+
+class PredictPipelineStep(BasePipelineStep):
+    def __init__(
+        self,
+        settings: 'Settings'
+    ):
+        self.pipeline_step = PREDICT
+        super().__init__(settings, self.pipeline_step)
+
+    @property
+    def _input_files(self) -> List[Path]:
+        self._check_input_directory()
+        input_directory = self._input_directory
+        file_type = r"/*csv"
+        input_filepath_files = [
+            Path(file_path) for file_path in glob(str(input_directory) + file_type)
+        ]
+        return input_filepath_files
+
+    def _upload_artifacts(self) -> None:
+        processed_objects: List[str] = [value for value in self.result if isinstance(value, str)]
+        initial_files = set(
+            file_path.stem.replace(" ", "").upper() for file_path in self._input_files
+        )
+        processing_errors: List[str] = list(initial_files - set(processed_objects))
+
+        self.task.upload_artifact(
+            name='processed_objects',
+            artifact_object={"processed_objects": processed_objects})
+        self.task.upload_artifact(
+            name='processing_errors',
+            artifact_object={"processing_errors": processing_errors})
+
+    def _get_predict_kwargs(self) -> Dict[str, Any]:
+        # Fitted feature engineer and model are loaded once for all files
+        try:
+            return dict(
+                output_directory=self._output_directory,
+                feature_engineer=get_feature_engineer(
+                    self.settings, self.step_params.get("feature_engineer_task_id")
+                ),
+                model_path=get_model_path(self.settings, self.step_params.get("train_task_id")),
+                extension=self._extension,
+                threshold=self.step_params.get("binary_threshold", 0.5),
+                batch_size=self.settings.prediction.batch_size,
+                schema=get_schema(self.settings),
+            )
+        except Exception as exception:
+            self._log_failed_step_execution(
+                file_name="artifacts",
+                exception=exception,
+            )
+            raise PipelineExecutionError
+
+    def _process_data_sequentially(self, input_files: List[Path], kwargs: Dict[str, Any]) -> None:
+        for path in input_files:
+            file_name = path.stem.replace(" ", "").upper()
+            try:
+                with self.profiler.measure("predict_input_file", file_name):
+                    self.result.append(predict_input_file(path, profiler=self.profiler, **kwargs))
+                self._log_success_step_execution(file_name=file_name)
+            except Exception as exception:
+                self._log_failed_step_execution(
+                    file_name=file_name,
+                    exception=exception,
+                )
+                self.result.append(exception)
+
+    def _process_data_in_parallel(self, input_files: List[Path], kwargs: Dict[str, Any]) -> None:
+        try:
+            # Profiling records of child processes are returned along with results
+            results = process_map(
+                partial(
+                    profile_input_file if self.profiler.enabled else predict_input_file,
+                    **kwargs,
+                ),
+                input_files,
+                settings=self.settings.multiprocessing,
+            )
+        except Exception as exception:
+            self._log_failed_step_execution(
+                file_name=f"{len(input_files)} files",
+                exception=exception,
+            )
+            raise PipelineExecutionError
+
+        for path, result in zip(input_files, results):
+            if isinstance(result, tuple):
+                result, records = result
+                self.profiler.extend(records)
+            if isinstance(result, Exception):
+                self._log_failed_step_execution(
+                    file_name=path.stem.replace(" ", "").upper(),
+                    exception=result,
+                )
+            else:
+                self._log_success_step_execution(file_name=result)
+            self.result.append(result)
+
+    def _process_data(self) -> None:
+        self.result = []
+        self.step_params = self.step_params or {}
+        input_files = self._input_files
+        kwargs = self._get_predict_kwargs()
+
+        if self.settings.multiprocessing.n_cpu != 1 and len(input_files) > 1:
+            self._process_data_in_parallel(input_files, kwargs)
+        else:
+            self._process_data_sequentially(input_files, kwargs)
+
+        if self.settings.multiprocessing.error_behavior == 'raise' and \
+            any(isinstance(value, Exception) for value in self.result):
+            raise PipelineExecutionError
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""Module with in-process scoring of new rows of objects and local HTTP server"""
+from collections import OrderedDict
+import copy
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import threading
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, TYPE_CHECKING
+
+from catboost import CatBoostClassifier
+import pandas as pd
+from sklearn import set_config
+from sklearn.pipeline import Pipeline
+
+from features.feature_engineer import FeatureEngineer
+from predict.artifacts import get_feature_engineer, get_model_path, get_schema, load_model
+from preprocess.preprocessor import Preprocessor
+from utilities.prediction import BatchPredictor, add_ignored_features
+from utilities.profiling import transform_pipeline
+from utilities.schema import DataSchema
+from utilities.transformers import Aggregator, MultiAggregator
+
+if TYPE_CHECKING:
+    from settings import Settings
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _iter_aggregators(pipeline: Any) -> Iterator[Aggregator]:
+    if isinstance(pipeline, Aggregator):
+        yield pipeline
+    elif isinstance(pipeline, MultiAggregator):
+        yield from pipeline.aggregators
+    elif isinstance(pipeline, Pipeline):
+        for _, step in pipeline.steps:
+            yield from _iter_aggregators(step)
+
+
+def get_history_size(feature_engineer: FeatureEngineer, max_history: int) -> int:
+    """Returns number of the last rows of object which are required to compute
+    aggregations of new rows like for the whole history of object.
+
+    Args:
+        feature_engineer (FeatureEngineer): Fitted feature engineer.
+        max_history (int): Number of rows kept for expanding windows, their values
+            are approximated by the last rows.
+
+    Returns:
+        int: Number of rows.
+    """
+
+    history_size = 0
+    for aggregator in _iter_aggregators(feature_engineer.custom_pipeline):
+        window = aggregator.window if aggregator.window is not None else max_history
+        history_size = max(history_size, window + abs(aggregator.shift_size or 0))
+    return min(history_size, max_history)
+
+
+@dataclass
+class GroupState:
+    """Dataclass for describing state of one object between requests"""
+
+    preprocessor: Optional[Pipeline]
+    feature_engineer: FeatureEngineer
+    history: Optional[pd.DataFrame] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ScoringService:
+    def __init__(
+        self,
+        feature_engineer: FeatureEngineer,
+        models: Sequence[CatBoostClassifier],
+        schema: Optional[DataSchema] = None,
+        preprocess: bool = True,
+        max_groups: int = 1000,
+        max_history: int = 10_000,
+        threshold: float = 0.5,
+    ):
+        r"""Scores new rows of objects with fitted feature engineer and models which are kept in memory.
+        Preprocessing states and the last preprocessed rows required by window aggregations
+        are kept for every GROUP_ID in LRU cache, so history isn't recomputed on every request.
+        States of evicted objects are started again from their next rows.
+
+        Args:
+            feature_engineer (FeatureEngineer): Fitted feature engineer.
+            models (Sequence[CatBoostClassifier]): Fitted models, their probabilities are averaged.
+            schema (Optional[DataSchema], optional): Schema of raw data. Defaults to None.
+            preprocess (bool, optional): Whether new rows are raw and are preprocessed by stateful
+                Preprocessor, otherwise they are already preprocessed. Defaults to True.
+            max_groups (int, optional): Maximum number of objects in cache. Defaults to 1000.
+            max_history (int, optional): Maximum number of the last rows of every object in cache.
+                Defaults to 10_000.
+            threshold (float, optional): Threshold of positive class. Defaults to 0.5.
+        """
+
+        self.feature_engineer = feature_engineer
+        self.models = list(models)
+        self.schema = schema
+        self.preprocess = preprocess
+        self.max_groups = max_groups
+        self.history_size = get_history_size(feature_engineer, max_history)
+        self.predictor = BatchPredictor(models=self.models, threshold=threshold)
+        self._states: 'OrderedDict[Hashable, GroupState]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def n_groups(self) -> int:
+        return len(self._states)
+
+    def _get_state(self, group_id: Hashable) -> GroupState:
+        with self._lock:
+            if group_id in self._states:
+                self._states.move_to_end(group_id)
+                return self._states[group_id]
+            state = GroupState(
+                preprocessor=Preprocessor(schema=self.schema).get_stateful_pipeline() if self.preprocess else None,
+                # Feature engineer keeps attributes of the last transform, so every object has its own copy
+                feature_engineer=copy.copy(self.feature_engineer),
+            )
+            self._states[group_id] = state
+            if len(self._states) > self.max_groups:
+                evicted, _ = self._states.popitem(last=False)
+                LOGGER.debug(f"State of {evicted} is evicted")
+            return state
+
+    def _predict(self, state: Optional[GroupState], data: pd.DataFrame) -> pd.DataFrame:
+        if state is None or data.empty:
+            return pd.DataFrame(columns=["datetime", "PREDICTION_CONT", "PREDICTION_DISC"])
+        history_size = 0 if state.history is None else len(state.history)
+        if history_size:
+            data = pd.concat([state.history, data], ignore_index=True)
+        state.history = data.iloc[-self.history_size:] if self.history_size else None
+
+        features = state.feature_engineer.transform(data).iloc[history_size:]
+        features = add_ignored_features(features.reset_index(drop=True), self.models)
+        probability = self.predictor.predict_proba(features)
+        prediction = features[[column for column in ["datetime"] if column in features.columns]].copy()
+        prediction["PREDICTION_CONT"] = probability
+        prediction["PREDICTION_DISC"] = (probability > self.predictor.threshold).astype("int8")
+        return prediction
+
+    def score(self, group_id: Hashable, rows: pd.DataFrame) -> pd.DataFrame:
+        """Returns predictions of new rows of object. Raw rows of the last resample bin
+        are kept until the next rows of object or flush.
+
+        Args:
+            group_id (Hashable): Identifier of object.
+            rows (pd.DataFrame): New rows of object in order of time.
+
+        Returns:
+            pd.DataFrame: Datetime and PREDICTION_CONT and PREDICTION_DISC of new rows.
+        """
+
+        set_config(transform_output="pandas")
+        state = self._get_state(group_id)
+        with state.lock:
+            data = rows
+            if state.preprocessor is not None:
+                data = transform_pipeline(state.preprocessor, rows.copy())
+            return self._predict(state, data)
+
+    def flush(self, group_id: Hashable) -> pd.DataFrame:
+        """Returns predictions of rows of object which are kept by preprocessing and removes its state.
+
+        Args:
+            group_id (Hashable): Identifier of object.
+
+        Returns:
+            pd.DataFrame: Datetime and PREDICTION_CONT and PREDICTION_DISC of kept rows.
+        """
+
+        with self._lock:
+            state = self._states.pop(group_id, None)
+        if state is None or state.preprocessor is None:
+            return self._predict(state, pd.DataFrame())
+        set_config(transform_output="pandas")
+        with state.lock:
+            return self._predict(state, state.preprocessor.named_steps["resampler"].flush())
+
+    def reset(self) -> None:
+        """Removes states of all objects."""
+        with self._lock:
+            self._states.clear()
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: 'Settings',
+        feature_engineer_task_id: Optional[str] = None,
+        train_task_id: Optional[str] = None,
+        threshold: float = 0.5,
+    ) -> 'ScoringService':
+        """Returns scoring service with fitted artifacts of pipeline tasks.
+
+        Args:
+            settings (Settings): Project settings.
+            feature_engineer_task_id (Optional[str], optional): Id of feature engineer task.
+                Defaults to None which means the last completed one.
+            train_task_id (Optional[str], optional): Id of train task. Defaults to None
+                which means the last local model or model of the last completed task.
+            threshold (float, optional): Threshold of positive class. Defaults to 0.5.
+
+        Returns:
+            ScoringService: Scoring service.
+        """
+
+        return cls(
+            feature_engineer=get_feature_engineer(settings, feature_engineer_task_id),
+            models=[load_model(get_model_path(settings, train_task_id))],
+            schema=get_schema(settings),
+            max_groups=settings.scoring.max_groups,
+            max_history=settings.scoring.max_history,
+            threshold=threshold,
+        )
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    r"""Handler of JSON requests to scoring service:
+    POST /predict {"group_id": ..., "rows": [{column: value, ...}, ...]},
+    POST /flush {"group_id": ...} and GET /health."""
+
+    service: ScoringService
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _get_records(self, prediction: pd.DataFrame) -> List[Dict[str, Any]]:
+        return json.loads(prediction.to_json(orient="records", date_format="iso"))
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send(404, {"error": f"{self.path} isn't found"})
+            return
+        self._send(200, {"status": "ok", "groups": self.service.n_groups})
+
+    def do_POST(self) -> None:
+        if self.path not in ("/predict", "/flush"):
+            self._send(404, {"error": f"{self.path} isn't found"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            group_id = request["group_id"]
+            if self.path == "/predict":
+                prediction = self.service.score(group_id, pd.DataFrame.from_records(request["rows"]))
+            else:
+                prediction = self.service.flush(group_id)
+        except (KeyError, TypeError, ValueError) as exception:
+            self._send(400, {"error": repr(exception)})
+            return
+        except Exception as exception:
+            LOGGER.exception(f"Scoring of request failed due to: {exception!r}")
+            self._send(500, {"error": repr(exception)})
+            return
+        self._send(200, {"group_id": group_id, "predictions": self._get_records(prediction)})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        LOGGER.debug(format % args)
+
+
+def serve(service: ScoringService, host: str = "127.0.0.1", port: int = 8080) -> None:
+    """Serves scoring service by local HTTP server until interruption.
+
+    Args:
+        service (ScoringService): Scoring service.
+        host (str, optional): Host of server. Defaults to "127.0.0.1".
+        port (int, optional): Port of server. Defaults to 8080.
+    """
+
+    handler = type("Handler", (ScoringRequestHandler,), {"service": service})
+    with ThreadingHTTPServer((host, port), handler) as server:
+        LOGGER.info(f"Scoring service is listening on {host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            LOGGER.info("Scoring service is stopped")
@@ -1,20 +1,27 @@
 # -*- coding: utf-8 -*-
 import os
 import gc
+from functools import partial
 from glob import glob
 import logging
 from pathlib import Path
-from typing import List, Union, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 import warnings
 
+import pandas as pd
 from sklearn import set_config
 from sklearn.pipeline import Pipeline
 
-from common.constants import GENERAL_EXTENSION
+from common.constants import SCHEMA_FILE_NAME
 from common.exceptions import PipelineExecutionError
 from common.pipeline_steps import PipelineStep, PREPROCESS
 from core import BasePipelineStep
 from utilities.loaders import CsvLoader
+from utilities.parallel import process_map
+from utilities.profiling import StageProfiler, transform_pipeline
+from utilities.schema import DataSchema
+from utilities.utils import save_data
+from utilities.writers import DatasetWriter
 from preprocess.preprocessor import Preprocessor, MarkDataTransformer
 
 if TYPE_CHECKING:
@@ -23,6 +30,141 @@ if TYPE_CHECKING:
 warnings.simplefilter(action="ignore", category=FutureWarning)
 
 
+def get_step_pipeline(
+    skip_mark: bool, 
+    profiler: Optional[StageProfiler] = None,
+    schema: Optional[DataSchema] = None,
+) -> Pipeline:
+    """Returns preprocess step pipeline.
+
+    Args:
+        skip_mark (bool): Whether to skip marking data with target.
+        profiler (Optional[StageProfiler], optional): Profiler of preprocessor transformers.
+            Defaults to None.
+        schema (Optional[DataSchema], optional): Schema of raw data. Defaults to None.
+
+    Returns:
+        Pipeline: Preprocess step pipeline.
+    """
+
+    if skip_mark:
+        return Pipeline(
+            [
+                ("preprocessor", Preprocessor(profiler=profiler, copy=False, schema=schema))
+             ]
+        )
+    return Pipeline(
+        steps=[
+            ("preprocessor", Preprocessor(profiler=profiler, copy=False, schema=schema)),
+            ("add_target", MarkDataTransformer()),
+         ]
+    )
+
+
+def stream_input_file(
+    file_path: Union[Path, str],
+    output_filepath: Union[Path, str],
+    skip_mark: bool,
+    extension: str,
+    block_size: int,
+    profiler: Optional[StageProfiler] = None,
+    schema: Optional[DataSchema] = None,
+) -> Path:
+    """Preprocesses raw file chunk by chunk and incrementally saves output,
+    so memory footprint doesn't depend on file size.
+
+    Args:
+        file_path (Union[Path, str]): Path to raw file.
+        output_filepath (Union[Path, str]): Path to output file.
+        skip_mark (bool): Whether to skip marking data with target.
+        extension (str): Extension of output file.
+        block_size (int): Size of raw file chunks in bytes.
+        profiler (Optional[StageProfiler], optional): Profiler of stages. Defaults to None.
+        schema (Optional[DataSchema], optional): Schema of raw data. Defaults to None.
+
+    Returns:
+        Path: Path to output file.
+    """
+
+    profiler = profiler or StageProfiler()
+    marker = None if skip_mark else MarkDataTransformer()
+    chunks = CsvLoader(path=file_path, block_size=block_size).load_chunks()
+    with DatasetWriter(output_filepath, extension=extension) as writer:
+        for preprocessed in Preprocessor(profiler=profiler, copy=False, schema=schema).transform_chunks(chunks):
+            if marker is not None:
+                with profiler.measure("add_target"):
+                    preprocessed = marker.transform(preprocessed)
+            with profiler.measure("save"):
+                writer.write(preprocessed)
+    return writer.path
+
+
+def transform_input_file(
+    file_path: Union[Path, str],
+    output_directory: Union[Path, str],
+    skip_mark: bool,
+    extension: str,
+    block_size: Optional[int] = None,
+    profiler: Optional[StageProfiler] = None,
+    schema: Optional[DataSchema] = None,
+) -> str:
+    """Loads, preprocesses and locally saves raw file.
+    It's executed in child process so it doesn't use ClearML task.
+
+    Args:
+        file_path (Union[Path, str]): Path to raw file.
+        output_directory (Union[Path, str]): Path to output directory.
+        skip_mark (bool): Whether to skip marking data with target.
+        extension (str): Extension of output file.
+        block_size (Optional[int], optional): Size of raw file chunks in bytes for
+            streaming preprocessing. Defaults to None which means reading whole file.
+        profiler (Optional[StageProfiler], optional): Profiler of stages. Defaults to None.
+        schema (Optional[DataSchema], optional): Schema of raw data. Defaults to None.
+
+    Returns:
+        str: Name of processed object.
+    """
+
+    profiler = profiler or StageProfiler()
+    file_path = Path(file_path)
+    file_name = file_path.stem.replace(" ", "").upper()
+    output_filepath = Path(os.path.join(output_directory, f"{file_name}{extension}"))
+    set_config(transform_output="pandas")
+    
+    if block_size:
+        stream_input_file(file_path, output_filepath, skip_mark, extension, block_size, profiler, schema)
+        return file_name
+    
+    with profiler.measure("load"):
+        data = CsvLoader(path=file_path).load()
+    preprocessed = transform_pipeline(get_step_pipeline(skip_mark, profiler, schema), data, profiler)
+    with profiler.measure("save"):
+        save_data(output_filepath, preprocessed, extension=extension)
+    
+    del preprocessed, data
+    gc.collect()
+    
+    return file_name
+
+
+def profile_input_file(file_path: Union[Path, str], **kwargs: Any) -> Tuple[str, List[Dict[str, Any]]]:
+    """Preprocesses raw file in child process with enabled profiler.
+
+    Args:
+        file_path (Union[Path, str]): Path to raw file.
+        kwargs (Any): Other arguments of `transform_input_file`.
+
+    Returns:
+        Tuple[str, List[Dict[str, Any]]]: Name of processed object and profiling records.
+    """
+
+    profiler = StageProfiler(enabled=True)
+    file_name = Path(file_path).stem.replace(" ", "").upper()
+    with profiler.measure("transform_input_file", file_name):
+        file_name = transform_input_file(file_path, profiler=profiler, **kwargs)
+    return file_name, profiler.records
+
+
 class PreprocessPipelineStep(BasePipelineStep):
     def __init__(
         self,
@@ -54,6 +196,8 @@ class PreprocessPipelineStep(BasePipelineStep):
         self.task.upload_artifact(
             name='processing_errors', 
             artifact_object={"processing_errors": processing_errors})
+        if self._schema is not None:
+            self.task.upload_artifact(name='schema', artifact_object=self._schema.to_dict())
     
     def _transform_input_data(self, file_path: Union[Path, str]):
         if not isinstance(file_path, Path):
@@ -66,26 +210,39 @@ class PreprocessPipelineStep(BasePipelineStep):
             print_console=False,
         )
         
-        data = CsvLoader(path=file_path).load()
+        if self.settings.storage.stream_block_size:
+            try:
+                stream_input_file(
+                    file_path=file_path,
+                    output_filepath=Path(os.path.join(
+                        self._output_directory, f"{file_name}{self._extension}"
+                    )),
+                    skip_mark=self.step_params.get('skip_mark', True),
+                    extension=self._extension,
+                    block_size=self.settings.storage.stream_block_size,
+                    profiler=self.profiler,
+                    schema=self._schema,
+                )
+                self._log_success_step_execution(file_name=file_name)
+            except Exception as exception:
+                self._log_failed_step_execution(
+                    file_name=file_name,
+                    exception=exception,
+                )
+                return exception
+            return file_name
+        
+        with self.profiler.measure("load"):
+            data = CsvLoader(path=file_path).load()
         # Configure pipeline
-        if self.step_params.get('skip_mark', True):
-            step_pipeline = Pipeline(
-                [
-                    ("preprocessor", Preprocessor())
-                 ]
-            )
-        else:
-            step_pipeline = Pipeline(
-                steps=[
-                    ("preprocessor", Preprocessor()),
-                    ("add_target", MarkDataTransformer()),
-                 ]
-            )
+        step_pipeline = get_step_pipeline(
+            self.step_params.get('skip_mark', True), self.profiler, self._schema
+        )
         set_config(transform_output="pandas")
                  
         # Transform data
         try:    
-            preprocessed = step_pipeline.transform(data)
+            preprocessed = transform_pipeline(step_pipeline, data, self.profiler)
             self._log_success_step_execution(file_name=file_name)
         except Exception as exception:
             self._log_failed_step_execution(
@@ -97,14 +254,15 @@ class PreprocessPipelineStep(BasePipelineStep):
         # Save locally data
         preprocessed_filepath = Path(
             os.path.join(
-                self._output_directory, f"{file_name}{GENERAL_EXTENSION}"
+                self._output_directory, f"{file_name}{self._extension}"
             )
         )
         try:
-            self._save_locally_data(
-                path=preprocessed_filepath,
-                data=preprocessed,
-            )
+            with self.profiler.measure("save"):
+                self._save_locally_data(
+                    path=preprocessed_filepath,
+                    data=preprocessed,
+                )
         except PipelineExecutionError as exception:
             return exception
             
@@ -113,7 +271,224 @@ class PreprocessPipelineStep(BasePipelineStep):
         
         return file_name
     
+    def _get_output_filepath(self, file_path: Union[Path, str]) -> Path:
+        file_name = Path(file_path).stem.replace(" ", "").upper()
+        return Path(os.path.join(self._output_directory, f"{file_name}{self._extension}"))
+    
+    def _get_output_key(self, file_path: Path, schema: Optional[DataSchema]) -> str:
+        # Outputs depend on dtypes of schema, which are inferred from the first files. Categories
+        # only grow and outputs are encoded with final categories by split step, so they aren't part of key
+        return self._get_cache_key(file_path, schema.dtypes if schema is not None else None)
+    
+    def _get_modified_input_files(self, input_files: List[Path]) -> List[Path]:
+        r"""Compares input files with manifest of previous run, removes outputs of deleted files
+        and returns new or modified files. Files are also processed again when step parameters,
+        code or dtypes of schema are changed, since keys of manifest entries depend on them."""
+        self._manifest = self._load_manifest()
+        # Schema of previous run is reused, otherwise all files are processed with new schema
+        schema = None
+        if self.settings.data_schema.enabled and self._schema_path.exists():
+            schema = DataSchema.load(self._schema_path)
+        input_names = set(path.name for path in input_files)
+        for name in list(self._manifest):
+            if name not in input_names:
+                self._get_output_filepath(name).unlink(missing_ok=True)
+                del self._manifest[name]
+        
+        modified_files = []
+        for path in input_files:
+            if self._manifest.get(path.name, {}).get("key") == self._get_output_key(path, schema) \
+                and self._get_output_filepath(path).exists():
+                self.result.append(path.stem.replace(" ", "").upper())
+            else:
+                modified_files.append(path)
+        self.task.logger.report_text(
+            f"{len(modified_files)} of {len(input_files)} files are new or modified", 
+            level=logging.INFO,
+        )
+        return modified_files
+    
+    def _update_manifest(self, input_files: List[Path]) -> None:
+        processed_objects = set(value for value in self.result if isinstance(value, str))
+        for path in input_files:
+            if path.stem.replace(" ", "").upper() in processed_objects:
+                self._manifest[path.name] = {
+                    "hash": self._get_file_hash(path),
+                    "key": self._get_output_key(path, self._schema),
+                    "output": self._get_output_filepath(path).name,
+                }
+            else:
+                # Failed files are processed again in the next run
+                self._manifest.pop(path.name, None)
+        self._save_manifest(self._manifest)
+    
+    def _restore_cached_outputs(self, input_files: List[Path]) -> List[Path]:
+        """Restores outputs of already processed files and returns files which should be processed."""
+        self._cache_keys: Dict[Path, str] = {}
+        not_cached_files = []
+        for path in input_files:
+            key = self._get_output_key(path, self._schema)
+            if self._cache.restore(key, self._get_output_filepath(path)):
+                file_name = path.stem.replace(" ", "").upper()
+                self.task.logger.report_text(
+                    f"Output for {file_name} is restored from cache", 
+                    level=logging.DEBUG,
+                    print_console=False,
+                )
+                self.result.append(file_name)
+            else:
+                self._cache_keys[path] = key
+                not_cached_files.append(path)
+        self.task.logger.report_text(
+            f"{len(input_files) - len(not_cached_files)} of {len(input_files)} files "
+            f"are restored from cache", 
+            level=logging.INFO,
+        )
+        return not_cached_files
+    
+    def _store_cached_outputs(self) -> None:
+        processed_objects = set(value for value in self.result if isinstance(value, str))
+        for path, key in self._cache_keys.items():
+            if path.stem.replace(" ", "").upper() in processed_objects:
+                self._cache.store(key, self._get_output_filepath(path))
+        self._cache.evict()
+    
+    @property
+    def _schema_path(self) -> Path:
+        return Path(os.path.join(self._output_directory, SCHEMA_FILE_NAME))
+    
+    def _get_schema(self, input_files: List[Path], modified_files: List[Path]) -> Optional[DataSchema]:
+        r"""Returns schema of raw data which is inferred once from samples of the first files
+        and saved along with outputs. In incremental mode schema of previous run is reused,
+        so dtypes of new outputs are the same as dtypes of already processed ones.
+        Categories of categorical columns which are kept in outputs are collected from all processed files."""
+        schema_settings = self.settings.data_schema
+        if not schema_settings.enabled:
+            return None
+        
+        parameters = dict(
+            category_ratio=schema_settings.category_ratio,
+            max_categories=schema_settings.max_categories,
+            infer_integers=schema_settings.infer_integers,
+        )
+        sample = None
+        if self.settings.incremental and self._schema_path.exists():
+            schema = DataSchema.load(self._schema_path, **parameters)
+        else:
+            schema = DataSchema(**parameters)
+            modified_files = input_files
+            for path in sorted(input_files)[:schema_settings.sample_files]:
+                try:
+                    path_sample = CsvLoader(path=path).load_sample(schema_settings.sample_rows)
+                    schema.update(path_sample)
+                    sample = path_sample if sample is None else sample
+                except Exception as exception:
+                    self.task.logger.report_text(
+                        f"Schema isn't inferred from {path.name} due to: {exception!r}", 
+                        level=logging.WARNING,
+                    )
+        
+        category_columns = [column for column, dtype in schema.dtypes.items() if dtype == "category"]
+        if category_columns and modified_files:
+            # Columns dropped by step pipeline, e.g. by resampler of default one, don't need categories
+            output_columns = self._get_output_columns(schema, sorted(modified_files)[0], sample)
+            if output_columns is not None:
+                category_columns = [column for column in category_columns if column in output_columns]
+        # Only categorical columns are read, other columns aren't converted
+        if category_columns:
+            for path in sorted(modified_files):
+                try:
+                    schema.update_categories(CsvLoader(path=path).load_unique(category_columns))
+                except Exception as exception:
+                    self.task.logger.report_text(
+                        f"Categories aren't collected from {path.name} due to: {exception!r}", 
+                        level=logging.WARNING,
+                    )
+        schema.save(self._schema_path)
+        return schema
+    
+    def _get_output_columns(
+        self, 
+        schema: DataSchema, 
+        path: Path, 
+        sample: Optional[pd.DataFrame] = None,
+    ) -> Optional[List[str]]:
+        r"""Returns columns of output of step pipeline for sample of raw file.
+        None means that columns are unknown, since sample can't be transformed."""
+        try:
+            if sample is None:
+                sample = CsvLoader(path=path).load_sample(self.settings.data_schema.sample_rows)
+            step_pipeline = get_step_pipeline(self.step_params.get('skip_mark', True), schema=schema)
+            set_config(transform_output="pandas")
+            return list(transform_pipeline(step_pipeline, sample.copy()).columns)
+        except Exception as exception:
+            self.task.logger.report_text(
+                f"Output columns aren't inferred from {path.name} due to: {exception!r}", 
+                level=logging.WARNING,
+            )
+            return None
+    
+    def _process_data_sequentially(self, input_files: List[Path]) -> None:
+        for path in input_files:
+            with self.profiler.measure("transform_input_file", path.stem.replace(" ", "").upper()):
+                self.result.append(self._transform_input_data(path))
+    
+    def _process_data_in_parallel(self, input_files: List[Path]) -> None:
+        try:
+            # Profiling records of child processes are returned along with results
+            results = process_map(
+                partial(
+                    profile_input_file if self.profiler.enabled else transform_input_file,
+                    output_directory=self._output_directory,
+                    skip_mark=self.step_params.get('skip_mark', True),
+                    extension=self._extension,
+                    block_size=self.settings.storage.stream_block_size,
+                    schema=self._schema,
+                ),
+                input_files,
+                settings=self.settings.multiprocessing,
+            )
+        except Exception as exception:
+            self._log_failed_step_execution(
+                file_name=f"{len(input_files)} files",
+                exception=exception,
+            )
+            raise PipelineExecutionError
+        
+        for path, result in zip(input_files, results):
+            if isinstance(result, tuple):
+                result, records = result
+                self.profiler.extend(records)
+            if isinstance(result, Exception):
+                self._log_failed_step_execution(
+                    file_name=path.stem.replace(" ", "").upper(),
+                    exception=result,
+                )
+            else:
+                self._log_success_step_execution(file_name=result)
+            self.result.append(result)
+    
     def _process_data(self) -> None:
         self.result = []
-        for path in self._input_files:
-            self.result.append(self._transform_input_data(path))
+        input_files = self._input_files
+        all_input_files = input_files
+        if self.settings.incremental:
+            input_files = self._get_modified_input_files(input_files)
+        with self.profiler.measure("infer_schema"):
+            self._schema = self._get_schema(all_input_files, input_files)
+        if self._cache is not None:
+            input_files = self._restore_cached_outputs(input_files)
+            
+        if self.settings.multiprocessing.n_cpu != 1 and len(input_files) > 1:
+            self._process_data_in_parallel(input_files)
+        else:
+            self._process_data_sequentially(input_files)
+        
+        if self._cache is not None:
+            self._store_cached_outputs()
+        if self.settings.incremental:
+            self._update_manifest(all_input_files)
+        
+        if self.settings.multiprocessing.error_behavior == 'raise' and \
+            any(isinstance(value, Exception) for value in self.result):
+            raise PipelineExecutionError
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 r"""Preprocessor transformers"""
 import logging
+from typing import Iterable, Iterator, Optional
 
 import pandas as pd
 from sklearn import set_config
@@ -10,16 +11,35 @@ from core import BaseTransformer
 from utilities.transformers import (
     DuplicatedColumnsTransformer,
     ColumnsTypeTransformer, 
-    ClipTransformer, 
-    InfValuesTransformer,
-    FillNanTransformer,
+    CleaningTransformer,
     TimeResampler,
 )
+from utilities.profiling import StageProfiler, transform_pipeline
+from utilities.schema import DataSchema
 
 LOGGER = logging.getLogger(__name__)
 
 
 class Preprocessor(BaseTransformer):
+    def __init__(
+        self, 
+        profiler: Optional[StageProfiler] = None, 
+        copy: bool = True, 
+        schema: Optional[DataSchema] = None,
+    ):
+        """
+        Args:
+            profiler (Optional[StageProfiler], optional): Profiler which measures every
+                transformer of common pipeline. Defaults to None.
+            copy (bool, optional): Whether to copy input data. Transformers of common pipeline 
+                own data after this single copy and modify it in place. Defaults to True.
+            schema (Optional[DataSchema], optional): Schema of raw data. Defaults to None
+                which means dtypes of ALL_TYPES only.
+        """
+        self.profiler = profiler
+        self.copy = copy
+        self.schema = schema
+
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """Transforms raw data with basic preprocess methods and
             predefined or custom pipelines.
@@ -30,22 +50,59 @@ class Preprocessor(BaseTransformer):
             pd.DataFrame: Dataframe of preprocessed data.
         """
         
-        data = X.copy()
-        common_pipeline = Pipeline(
-            [
-                ("drop_duplicate_columns", DuplicatedColumnsTransformer()),
-                ("convert_columns_type", ColumnsTypeTransformer()),
-                ("drop_outliers", ClipTransformer()),
-                ("drop_inf_values", InfValuesTransformer()),
-                ("fill_nan", FillNanTransformer()),
-                ("resampler", TimeResampler()),
-            ]
-        )
+        data = X.copy() if self.copy else X
+        common_pipeline = self._get_common_pipeline()
         set_config(transform_output="pandas")
         
-        data = common_pipeline.transform(data)
+        data = transform_pipeline(common_pipeline, data, self.profiler)
         return data
 
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Transforms consecutive chunks of one raw file with the same pipeline.
+            Forward filling and resampling states are carried across chunk boundaries,
+            so output is the same as for the whole file.
+        Args:
+            chunks (Iterable[pd.DataFrame]): Consecutive chunks of input raw data.
+
+        Yields:
+            Iterator[pd.DataFrame]: Chunks of preprocessed data.
+        """
+
+        common_pipeline = self.get_stateful_pipeline()
+        set_config(transform_output="pandas")
+
+        for chunk in chunks:
+            if self.copy:
+                chunk = chunk.copy()
+            data = transform_pipeline(common_pipeline, chunk, self.profiler)
+            if not data.empty:
+                yield data
+        data = common_pipeline.named_steps["resampler"].flush()
+        if not data.empty:
+            yield data
+
+    def get_stateful_pipeline(self) -> Pipeline:
+        """Returns common pipeline which carries forward filling and resampling states
+            across calls of transform, e.g. for rows of one object which arrive by parts.
+            Rows of the last resample bin are returned by flush of resampler step.
+
+        Returns:
+            Pipeline: Common pipeline with states.
+        """
+        return self._get_common_pipeline(keep_state=True)
+
+    def _get_common_pipeline(self, keep_state: bool = False) -> Pipeline:
+        # Preprocessor owns data, so transformers don't copy it
+        return Pipeline(
+            [
+                ("drop_duplicate_columns", DuplicatedColumnsTransformer(copy=False)),
+                ("convert_columns_type", ColumnsTypeTransformer(copy=False, schema=self.schema)),
+                # Outliers, infinite and missing values are cleaned in one pass
+                ("clean", CleaningTransformer(keep_state=keep_state, copy=False)),
+                ("resampler", TimeResampler(keep_state=keep_state, copy=False)),
+            ]
+        )
+
 
 class MarkDataTransformer(BaseTransformer):
     r"""Transformer for marking preprocessed data according to expert config."""
@@ -1,16 +1,18 @@
 # -*- coding: utf-8 -*-
 import os
 import gc
+from functools import partial
 import logging
 from pathlib import Path
-from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 import warnings
 
 from catboost import (
     Pool,
     CatBoostClassifier,
-    eval_metric
 )
+from catboost.utils import eval_metric
 from clearml import OutputModel
 import numpy as np
 import pandas as pd
@@ -20,8 +22,16 @@ from tqdm import tqdm
 from core import BasePipelineStep
 from common.exceptions import PipelineExecutionError
 from common.pipeline_steps import TRAIN
-from common.constants import GENERAL_EXTENSION, IGNORED_FEATURES
-from utilities.loaders import PickleLoader
+from common.constants import (
+    IGNORED_FEATURES,
+    METRICS,
+    MODEL_FILE_NAME,
+    QUANTIZATION_PARAMS,
+    TRAIN_STEP_PARAMS,
+)
+from utilities.loaders import get_loader
+from utilities.parallel import get_n_cpu, process_map, split_cpu_budget
+from utilities.prediction import BatchPredictor, get_features_data
 from utilities.path_utils import get_last_modified
 
 if TYPE_CHECKING:
@@ -30,6 +40,45 @@ if TYPE_CHECKING:
 warnings.simplefilter(action="ignore", category=FutureWarning)
 
 
+def fit_fold(
+    fold: Tuple[np.ndarray, np.ndarray],
+    pool: Union[Pool, str],
+    model_params: Dict[str, Any],
+    random_seed: int,
+) -> Dict[str, float]:
+    """Trains model on train part of fold and evaluates it on validation part.
+    It's executed in child process so it doesn't use ClearML task.
+
+    Args:
+        fold (Tuple[np.ndarray, np.ndarray]): Sorted indices of train and validation objects.
+        pool (Union[Pool, str]): Pool of the whole train data or path to saved quantized pool.
+        model_params (Dict[str, Any]): Parameters of CatBoost model.
+        random_seed (int): Random seed of model.
+
+    Returns:
+        Dict[str, float]: Metrics of validation part.
+    """
+
+    if not isinstance(pool, Pool):
+        pool = Pool(f"quantized://{pool}")
+    train_idx, valid_idx = fold
+    # Indices of folds are sorted, so objects of every group stay consecutive
+    train_pool = pool.slice(train_idx)
+    eval_pool = pool.slice(valid_idx)
+    # Concurrent folds don't write training logs, logs of evaluation are written to own temporary directory
+    with TemporaryDirectory() as directory:
+        fitted_model = CatBoostClassifier(
+            **{**model_params, "allow_writing_files": False, "train_dir": directory},
+            random_seed=random_seed,
+        ).fit(
+            train_pool,
+            eval_set=eval_pool,
+        )
+        # All metrics are computed with one prediction of validation part
+        metrics = fitted_model.eval_metrics(eval_pool, METRICS)
+    return {metric: metrics[metric][-1] for metric in METRICS}
+
+
 class TrainPipelineStep(BasePipelineStep):
     def __init__(
         self,
@@ -46,14 +95,25 @@ class TrainPipelineStep(BasePipelineStep):
         pass
     
     def _get_data(self) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+        # Read only required columns and groups if they are specified
+        columns: Optional[List[str]] = self.step_params.pop("columns", None)
+        if columns:
+            columns = list(dict.fromkeys(columns + ["GROUP_ID", "TARGET"]))
+        groups: Optional[List[int]] = self.step_params.pop("groups", None)
+        filters = [("GROUP_ID", "in", groups)] if groups else None
+        
         output = {}
         for data_type in ["train", "test"]:
             data_directory = Path(os.path.join(
                 self._input_directory, 
-                f"{data_type}{GENERAL_EXTENSION}"
+                f"{data_type}{self._extension}"
             ))
             try:
-                data = PickleLoader(path=data_directory).load()
+                data = get_loader(
+                    path=data_directory,
+                    columns=columns,
+                    filters=filters,
+                ).load()
             except FileNotFoundError:
                 data = None
             
@@ -65,65 +125,95 @@ class TrainPipelineStep(BasePipelineStep):
         ignored_features = list(np.intersect1d(self.train_data.columns.tolist(), IGNORED_FEATURES))
         self.step_params["ignored_features"] = ignored_features
         
-    def _get_cb_pool(self, data: pd.DataFrame) -> Pool:
-        X = data.drop(axis=1, columns="TARGET").copy()
-        y = data["TARGET"].fillna(0).copy()
-        groups = data["GROUP_ID"].copy()
-        cat_features = X.select_dtypes(include=["object", "category"]).columns.tolist()
+    @property
+    def _model_params(self) -> Dict[str, Any]:
+        return {
+            key: value for key, value in self.step_params.items() 
+            if key not in TRAIN_STEP_PARAMS and key not in QUANTIZATION_PARAMS
+        }
+    
+    def _get_cb_pool(self, data: pd.DataFrame, quantize: bool = False) -> Pool:
+        """Returns CatBoost pool of data.
+
+        Args:
+            data (pd.DataFrame): Input data with TARGET and GROUP_ID.
+            quantize (bool, optional): Whether to quantize features, so raw features are released
+                and pool takes one byte per value. Defaults to False.
+
+        Returns:
+            Pool: CatBoost pool.
+        """
         
         pool = Pool(
-            data=X,
-            label=y,
-            group_id=groups,
-            cat_features=cat_features,
+            data=get_features_data(data),
+            label=data["TARGET"].fillna(0).to_numpy(),
+            group_id=data["GROUP_ID"].to_numpy(),
         )
+        if quantize:
+            pool.quantize(**{
+                key: value for key, value in self.step_params.items() if key in QUANTIZATION_PARAMS
+            })
         return pool
         
-    def _run_cv(self):
+    def _run_cv(self, pool: Pool, groups: np.ndarray):
         """
         Uploaded results of common metrics for each fold 
         provided by GroupKFold cross-validation.
+        Folds are slices of the pool of the whole train data,
+        so features are neither copied nor quantized again.
+        Folds are trained concurrently, CPU budget is split
+        between processes and CatBoost threads.
         """
         
-        X = self.train_data.drop(axis=1, columns="TARGET").copy()
-        y = self.train_data["TARGET"].fillna(0).copy()
-        groups = self.train_data["GROUP_ID"].copy()
-        
-        n_splits = self.step_params.pop("n_splits", 2)
-        skf = GroupKFold(n_splits=n_splits)
-        cv_result = pd.DataFrame()
-        for train_idx, valid_idx in tqdm(skf.split(X, y, groups=groups), total=n_splits):
+        n_splits = self.step_params.get("n_splits", 2)
+        folds = list(GroupKFold(n_splits=n_splits).split(groups, groups=groups))
+        for train_idx, valid_idx in folds:
             self.task.logger.report_text(
-                f"Train GROUP_ID:{X.loc[train_idx, 'GROUP_ID'].unique()}",
+                f"Train GROUP_ID:{np.unique(groups[train_idx])}",
                 level=logging.DEBUG,
                 print_console=False,
             )
             self.task.logger.report_text(
-                f"Test GROUP_ID:{X.loc[valid_idx, 'GROUP_ID'].unique()}",
+                f"Test GROUP_ID:{np.unique(groups[valid_idx])}",
                 level=logging.DEBUG,
                 print_console=False,
             )
-            
-            train_pool = self._get_cb_pool(self.train_data[train_idx])
-            eval_pool = self._get_cb_pool(self.train_data[valid_idx])
-            fitted_model = CatBoostClassifier(
-                **self.step_params,
-                random_seed=self.settings.random_seed,
-            ).fit(
-                train_pool,
-                eval_set=eval_pool,
+        
+        n_processes, thread_count = split_cpu_budget(
+            self.settings.multiprocessing.n_cpu, 
+            len(folds), 
+            self._model_params.get("thread_count"),
+        )
+        fit = partial(
+            fit_fold,
+            model_params={**self._model_params, "thread_count": thread_count},
+            random_seed=self.settings.random_seed,
+        )
+        if n_processes == 1:
+            results = [fit(fold, pool) for fold in tqdm(folds, total=len(folds))]
+        else:
+            # Child processes load quantized pool from file instead of pickling it
+            with TemporaryDirectory() as directory:
+                pool_path = os.path.join(directory, "train_pool.bin")
+                pool.save(pool_path)
+                results = process_map(
+                    partial(fit, pool=pool_path),
+                    folds,
+                    settings=self.settings.multiprocessing.model_copy(update={"n_cpu": n_processes}),
+                )
+        
+        # Metrics of failed folds are missing, order of folds is kept
+        cv_result = []
+        for number, result in enumerate(results):
+            if isinstance(result, dict):
+                cv_result.append(result)
+                continue
+            self._log_failed_step_execution(
+                file_name=f"fold {number}",
+                exception=result,
             )
-
-            fold_result = {}
-            metrics = ["Accuracy", "AUC", "Recall", "Precision", "F1", "BalancedAccuracy", "MCC"]
-            for metric in metrics:
-                fold_result[f"{metric}"] = fitted_model.eval_metrics(eval_pool, [metric])[
-                    metric
-                ][-1]
-            fold_result = pd.DataFrame([fold_result])
-            cv_result = pd.concat([cv_result, fold_result])
-            del train_pool, eval_pool
-            gc.collect()
+            cv_result.append({})
+        cv_result = pd.DataFrame(cv_result, columns=METRICS)
             
         cv_result.loc["mean"] = cv_result.mean()
         self.task.logger.report_table(
@@ -132,68 +222,60 @@ class TrainPipelineStep(BasePipelineStep):
             table_plot=cv_result
         ) 
         
-    def _train_model(self):
-        train_pool = self._get_cb_pool(self.train_data)
-        test_pool = self._get_cb_pool(self.test_data)
+    def _train_model(self, train_pool: Pool):
+        # Test pool isn't quantized, CatBoost applies borders of train pool to it
+        test_pool = self._get_cb_pool(self.test_data) if self.test_data is not None else None
 
+        # Training logs are written to artifacts instead of working directory
         self.fitted_model = CatBoostClassifier(
-            **self.step_params,
+            **{
+                "train_dir": os.path.join(self.settings.artifacts.root_folder, "catboost_info"),
+                **self._model_params,
+            },
             random_seed=self.settings.random_seed,
         ).fit(train_pool, eval_set=test_pool, verbose=True)
         
-        fitted_model_filepath = os.path.join(self.settings.artifacts.models_folder, "example.cbm")
+        fitted_model_filepath = os.path.join(self.settings.artifacts.models_folder, MODEL_FILE_NAME)
         self.fitted_model.save_model(fitted_model_filepath)
         
         self.output_model = OutputModel(task=self.task)
         self.output_model.update_labels(train_pool.get_label())
         self.output_model.update_weights(weights_filename=fitted_model_filepath)
         
-    def _get_prediction(self) -> pd.DataFrame:
-        # Get prediction with fitted models
-        prediction = pd.DataFrame()
-        prediction["GROUP_ID"] = self.test_data["GROUP_ID"].copy()
-        probability = np.empty(len(self.test_data))
-        try: 
-            # In case of several fitted models iterate over it
-            models = [self.fitted_model]
-            for model in models:
-                required_columns = model.feature_names_
-                probability += pd.DataFrame(
-                    model.predict(self.test_data[required_columns], prediction_type="Probability")
-                )[1]
-            probability = probability / len(models)
-            prediction["PREDICTION_CONT"] = probability
-            
-            threshold = self.step_params.get("binary_threshold", 0.5)
-            prediction["PREDICTION_DISC"] = np.where(probability > threshold, 1, 0)
+    def _predict_test(self):
+        # Predictions are written by batches, only probabilities are kept for metrics
+        predictor = BatchPredictor(
+            models=[self.fitted_model],
+            batch_size=self.settings.prediction.batch_size,
+            n_threads=get_n_cpu(self.settings.multiprocessing.n_cpu),
+            threshold=self.step_params.get("binary_threshold", 0.5),
+        )
+        writer = self._get_writer(Path(os.path.join(self._output_directory, "prediction")))
+        try:
+            probability = predictor.write(self.test_data, writer)
         except Exception as exception:
             self._log_failed_step_execution(
                 file_name="test_pool",
                 exception=exception
             )
             raise PipelineExecutionError
-        
-        return prediction
-        
-    def _predict_test(self):
-        prediction = self._get_prediction()
-        
-        # Save locally predictions for plots
-        self._save_locally_data(
-            path=self._output_directory,
-            data=prediction,
-        )
+        else:
+            self._close_writer(writer)
+        finally:
+            # Hidden segments are removed if prediction or closing of writer failed
+            writer.abort()
             
         # Track metrics at test dataset
+        label = self.test_data["TARGET"].fillna(0).to_numpy()
+        prediction = (probability > predictor.threshold).astype(np.int8)
         test_metrics = {}
-        metrics = ["Accuracy", "AUC", "Recall", "Precision", "F1", "BalancedAccuracy", "MCC"]
-        for metric in metrics:
+        for metric in METRICS:
             test_metrics[f"{metric}"] = eval_metric(
-                label=self.test_data["TARGET"].fillna(0).copy(),
-                approx=prediction["PREDICTION_DISC"],
+                label=label,
+                approx=prediction,
                 metric=metric,
             )[0]
-        test_metrics = pd.DataFrame.from_dict(test_metrics)
+        test_metrics = pd.DataFrame([test_metrics])
         self.task.logger.report_table(
             title="test metrics", 
             series="test metrics",
@@ -204,14 +286,23 @@ class TrainPipelineStep(BasePipelineStep):
         self.train_data, self.test_data = self._get_data()
         self._set_ignored_features()
         
+        # Train pool is built and quantized once for cross validation and final model
+        groups = self.train_data["GROUP_ID"].to_numpy()
+        train_pool = self._get_cb_pool(self.train_data, quantize=True)
+        del self.train_data
+        gc.collect()
+        
         # Cross validation
-        self._run_cv()
+        if not self.step_params.get("skip_cv", False):
+            self._run_cv(train_pool, groups)
         
         # Train final model
-        self._train_model()
+        if not self.step_params.get("train_final_model", True):
+            return
+        self._train_model(train_pool)
         
         # Get prediction for test data
-        if self.test_data:
+        if self.test_data is not None:
             self._predict_test()
         
         
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""Module with backends of window aggregations and their selection by measured cost"""
+from abc import ABC, abstractmethod
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from bottleneck import move_max, move_mean, move_median, move_min, move_sum
+import numpy as np
+import pandas as pd
+
+from utilities.utils import get_subclasses
+
+LOGGER = logging.getLogger(__name__)
+
+AggFunc = Union[str, Callable[[Any], Any]]
+
+
+class AggregationBackend(ABC):
+    r"""Base class of window aggregation backends. Backend gets 2D float64 array of rows
+    and columns, window or None for expanding window and resolved min_periods, and returns
+    float64 array of the same shape with pandas semantics of missing values."""
+
+    name: str = ""
+    agg_funcs: Tuple[str, ...] = ()
+
+    def supports(self, agg_func: AggFunc, window: Optional[int], min_periods: int) -> bool:
+        """Returns whether backend computes aggregation.
+
+        Args:
+            agg_func (AggFunc): Aggregation function.
+            window (Optional[int]): Size of the moving window, None for expanding window.
+            min_periods (int): Minimum number of observations in window required to have a value.
+
+        Returns:
+            bool: Whether aggregation is supported.
+        """
+        return isinstance(agg_func, str) and agg_func in self.agg_funcs
+
+    @abstractmethod
+    def aggregate(
+        self,
+        values: np.ndarray,
+        agg_func: AggFunc,
+        window: Optional[int],
+        min_periods: int,
+    ) -> np.ndarray:
+        pass
+
+
+class PandasBackend(AggregationBackend):
+    r"""Backend of pandas rolling and expanding windows, it supports any aggregation."""
+
+    name = "pandas"
+
+    def supports(self, agg_func: AggFunc, window: Optional[int], min_periods: int) -> bool:
+        return True
+
+    def aggregate(
+        self,
+        values: np.ndarray,
+        agg_func: AggFunc,
+        window: Optional[int],
+        min_periods: int,
+    ) -> np.ndarray:
+        data = pd.DataFrame(values)
+        if window is None:
+            rolling = data.expanding(min_periods=min_periods)
+        else:
+            rolling = data.rolling(window=window, min_periods=min_periods)
+        return rolling.agg(agg_func).to_numpy(dtype=np.float64)
+
+
+class BottleneckBackend(AggregationBackend):
+    r"""Backend of bottleneck moving window functions, it doesn't support expanding windows.
+    Standard deviation isn't supported, since running sums of squares of bottleneck lose
+    precision for long after level shifts of values."""
+
+    name = "bottleneck"
+    functions: Dict[str, Callable[..., np.ndarray]] = {
+        "sum": move_sum,
+        "mean": move_mean,
+        "median": move_median,
+        "min": move_min,
+        "max": move_max,
+    }
+    agg_funcs = tuple(functions)
+
+    def supports(self, agg_func: AggFunc, window: Optional[int], min_periods: int) -> bool:
+        return super().supports(agg_func, window, min_periods) and window is not None and min_periods > 0
+
+    def aggregate(
+        self,
+        values: np.ndarray,
+        agg_func: AggFunc,
+        window: Optional[int],
+        min_periods: int,
+    ) -> np.ndarray:
+        # Windows longer than data are truncated like in pandas
+        window = min(window, len(values))
+        if not window or min_periods > window:
+            return np.full(values.shape, np.nan)
+        return self.functions[agg_func](values, window=window, min_count=min_periods, axis=0)
+
+
+class NumpyBackend(AggregationBackend):
+    r"""Backend of cumulative kernels of expanding windows. Moving windows and standard deviation
+    aren't supported, since differences of cumulative sums cancel catastrophically after level
+    shifts of values."""
+
+    name = "numpy"
+    agg_funcs = ("sum", "mean", "min", "max")
+
+    def supports(self, agg_func: AggFunc, window: Optional[int], min_periods: int) -> bool:
+        return super().supports(agg_func, window, min_periods) and window is None
+
+    def aggregate(
+        self,
+        values: np.ndarray,
+        agg_func: AggFunc,
+        window: Optional[int],
+        min_periods: int,
+    ) -> np.ndarray:
+        # Infinite values are missing like in pandas windows
+        is_valid = np.isfinite(values)
+        count = np.cumsum(is_valid, axis=0)
+        if agg_func in ("min", "max"):
+            accumulate = np.fmin.accumulate if agg_func == "min" else np.fmax.accumulate
+            output = accumulate(np.where(is_valid, values, np.nan), axis=0)
+        else:
+            # Cumulative sums aren't subtracted, so they are as precise as sequential summation
+            output = np.cumsum(np.where(is_valid, values, 0.0), axis=0)
+            if agg_func == "mean":
+                output /= np.maximum(count, 1)
+        output[(count < min_periods) | (count == 0)] = np.nan
+        return output
+
+
+ALL_BACKENDS: Dict[str, AggregationBackend] = {
+    backend.name: backend() for backend in get_subclasses(AggregationBackend)
+}
+
+
+class BackendSelector:
+    def __init__(
+        self,
+        backends: Optional[Dict[str, AggregationBackend]] = None,
+        sizes: Tuple[int, int] = (1024, 65536),
+        window: int = 60,
+        repeats: int = 3,
+        random_seed: int = 0,
+    ):
+        r"""Selects the cheapest backend of aggregation. Cost of every backend is measured once
+        per process for every aggregation and window type, when it's requested for the first time.
+        Cost is modelled as fixed overhead of call plus time of one value, so it's extrapolated
+        to data of any size.
+
+        Args:
+            backends (Optional[Dict[str, AggregationBackend]], optional): Candidate backends.
+                Defaults to None which means ALL_BACKENDS.
+            sizes (Tuple[int, int], optional): Numbers of rows of calibration data. Defaults to (1024, 65536).
+            window (int, optional): Size of the moving window of calibration. Defaults to 60.
+            repeats (int, optional): Number of timed runs, the best one is used. Defaults to 3.
+            random_seed (int, optional): Seed of calibration data. Defaults to 0.
+        """
+
+        self.backends = backends or ALL_BACKENDS
+        self.sizes = sizes
+        self.window = window
+        self.repeats = repeats
+        self.random_seed = random_seed
+        self.costs: Dict[Tuple[str, str, bool], Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _measure(self, backend: AggregationBackend, agg_func: str, expanding: bool, n_rows: int) -> float:
+        values = np.random.default_rng(self.random_seed).normal(size=(n_rows, 1))
+        values[::20] = np.nan
+        window = None if expanding else self.window
+        times = []
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            backend.aggregate(values, agg_func, window, 1)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def calibrate(self, agg_func: str, expanding: bool) -> Dict[str, Tuple[float, float]]:
+        """Measures costs of backends which support aggregation.
+
+        Args:
+            agg_func (str): Aggregation function.
+            expanding (bool): Whether window is expanding.
+
+        Returns:
+            Dict[str, Tuple[float, float]]: Overhead in seconds and seconds per value of backends.
+        """
+
+        costs = {}
+        small, large = self.sizes
+        for name, backend in self.backends.items():
+            if not backend.supports(agg_func, None if expanding else self.window, 1):
+                continue
+            small_time = self._measure(backend, agg_func, expanding, small)
+            large_time = self._measure(backend, agg_func, expanding, large)
+            per_value = max(large_time - small_time, 0.0) / (large - small)
+            costs[name] = (max(small_time - per_value * small, 0.0), per_value)
+        LOGGER.debug(f"Costs of {'expanding' if expanding else 'rolling'} {agg_func} backends: {costs}")
+        return costs
+
+    def get_costs(self, agg_func: str, expanding: bool) -> Dict[str, Tuple[float, float]]:
+        with self._lock:
+            if not any(key[1:] == (agg_func, expanding) for key in self.costs):
+                for name, cost in self.calibrate(agg_func, expanding).items():
+                    self.costs[(name, agg_func, expanding)] = cost
+            return {
+                name: cost for (name, *key), cost in self.costs.items() if tuple(key) == (agg_func, expanding)
+            }
+
+    def select(
+        self,
+        agg_func: AggFunc,
+        window: Optional[int],
+        min_periods: int,
+        n_values: int,
+    ) -> AggregationBackend:
+        """Returns the cheapest backend which supports aggregation.
+
+        Args:
+            agg_func (AggFunc): Aggregation function.
+            window (Optional[int]): Size of the moving window, None for expanding window.
+            min_periods (int): Minimum number of observations in window required to have a value.
+            n_values (int): Number of aggregated values.
+
+        Returns:
+            AggregationBackend: Backend of aggregation.
+        """
+
+        candidates = [
+            name for name, backend in self.backends.items()
+            if backend.supports(agg_func, window, min_periods)
+        ]
+        if len(candidates) == 1 or not isinstance(agg_func, str):
+            return self.backends[candidates[0]]
+        costs = self.get_costs(agg_func, window is None)
+        candidates = [name for name in candidates if name in costs] or candidates
+        return self.backends[min(
+            candidates,
+            key=lambda name: costs[name][0] + costs[name][1] * n_values if name in costs else np.inf,
+        )]
+
+
+_SELECTOR = BackendSelector()
+
+
+def get_backend_selector() -> BackendSelector:
+    """Returns backend selector of process, it keeps measured costs of backends."""
+    return _SELECTOR
+
+
+def aggregate(
+    values: np.ndarray,
+    agg_func: AggFunc,
+    window: Optional[int] = None,
+    min_periods: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> np.ndarray:
+    """Returns rolling or expanding aggregation of columns like pandas.
+
+    Args:
+        values (np.ndarray): 1D or 2D array, windows are moved along the first axis.
+        agg_func (AggFunc): Aggregation function.
+        window (Optional[int], optional): Size of the moving window. Defaults to None
+            which means expanding window.
+        min_periods (Optional[int], optional): Minimum number of observations in window
+            required to have a value. Defaults to None which means window for moving window
+            and 1 for expanding one.
+        backend (Optional[str], optional): Name of backend. Defaults to None which means
+            the cheapest backend by calibration.
+
+    Raises:
+        ValueError: Raised when backend doesn't support aggregation.
+
+    Returns:
+        np.ndarray: Float64 array of aggregations with the same shape as input.
+    """
+
+    if min_periods is None:
+        min_periods = 1 if window is None else window
+    values = np.asarray(values, dtype=np.float64)
+    is_infinite = np.isinf(values)
+    if is_infinite.any():
+        # Infinite values are missing in windows of pandas
+        values = np.where(is_infinite, np.nan, values)
+    is_vector = values.ndim == 1
+    if is_vector:
+        values = values.reshape(-1, 1)
+
+    if backend is None:
+        selected = get_backend_selector().select(agg_func, window, min_periods, values.size)
+    else:
+        selected = ALL_BACKENDS[backend]
+        if not selected.supports(agg_func, window, min_periods):
+            raise ValueError(f"Backend {backend} doesn't support {agg_func} with window {window}")
+
+    output = selected.aggregate(values, agg_func, window, min_periods)
+    return output.reshape(-1) if is_vector else output
+
+
+def check_backends_parity(
+    values: np.ndarray,
+    agg_funcs: Tuple[str, ...] = ("sum", "mean", "std", "median", "min", "max"),
+    windows: Tuple[Optional[int], ...] = (1, 60, 3600, None),
+    min_periods: Tuple[Optional[int], ...] = (None, 1),
+    rtol: float = 1e-7,
+    atol: float = 1e-9,
+) -> pd.DataFrame:
+    """Compares outputs of all backends with pandas backend.
+
+    Args:
+        values (np.ndarray): 1D or 2D array.
+        agg_funcs (Tuple[str, ...], optional): Aggregation functions.
+            Defaults to ("sum", "mean", "std", "median", "min", "max").
+        windows (Tuple[Optional[int], ...], optional): Sizes of windows, None for expanding window.
+            Defaults to (1, 60, 3600, None).
+        min_periods (Tuple[Optional[int], ...], optional): Minimum numbers of observations.
+            Defaults to (None, 1).
+        rtol (float, optional): Relative tolerance. Defaults to 1e-7.
+        atol (float, optional): Absolute tolerance. Defaults to 1e-9.
+
+    Returns:
+        pd.DataFrame: Maximum absolute difference and parity flag of every backend and aggregation.
+    """
+
+    records: List[Dict[str, Any]] = []
+    for agg_func in agg_funcs:
+        for window in windows:
+            for periods in min_periods:
+                expected = aggregate(values, agg_func, window, periods, backend=PandasBackend.name)
+                for name, backend in ALL_BACKENDS.items():
+                    resolved_periods = periods if periods is not None else (1 if window is None else window)
+                    if name == PandasBackend.name or not backend.supports(agg_func, window, resolved_periods):
+                        continue
+                    output = aggregate(values, agg_func, window, periods, backend=name)
+                    difference = np.abs(output - expected)
+                    records.append({
+                        "backend": name,
+                        "agg_func": agg_func,
+                        "window": window,
+                        "min_periods": periods,
+                        "max_difference": float(np.nanmax(difference, initial=0.0)),
+                        "parity": bool(np.allclose(output, expected, rtol=rtol, atol=atol, equal_nan=True)),
+                    })
+    return pd.DataFrame.from_records(records)
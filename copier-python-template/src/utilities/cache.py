@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Module with local content-addressed cache of pipeline steps outputs"""
+import ast
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Iterable, Optional, Union
+
+LOGGER = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024**2
+# Directory with project modules, only they are followed when hashing code
+SOURCE_ROOT = Path(__file__).resolve().parents[1]
+
+
+def get_file_hash(path: Union[str, Path]) -> str:
+    """Returns sha256 hash of file content.
+
+    Args:
+        path (Union[str, Path]): Path to file.
+
+    Returns:
+        str: Hex digest of file content.
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _get_project_module_path(name: str) -> Optional[Path]:
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or spec.origin is None or not spec.has_location:
+        return None
+    path = Path(spec.origin).resolve()
+    return path if SOURCE_ROOT in path.parents else None
+
+
+def _get_imported_modules(source: str) -> Iterable[str]:
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            yield node.module
+            # Imported names may be submodules of package
+            yield from (f"{node.module}.{alias.name}" for alias in node.names)
+
+
+def get_code_version(modules: Iterable[str]) -> str:
+    """Returns hash of source code of modules and of project modules imported by them
+    transitively, so change in any code used by modules changes the version.
+
+    Args:
+        modules (Iterable[str]): Names of modules.
+
+    Returns:
+        str: Hex digest of source code.
+    """
+
+    sources = {name: inspect.getsource(importlib.import_module(name)) for name in modules}
+    pending = list(sources)
+    while pending:
+        for imported in _get_imported_modules(sources[pending.pop()]):
+            if imported in sources or (path := _get_project_module_path(imported)) is None:
+                continue
+            sources[imported] = path.read_text(encoding="utf-8")
+            pending.append(imported)
+
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        digest.update(name.encode())
+        digest.update(sources[name].encode())
+    return digest.hexdigest()
+
+
+class StepCache:
+    def __init__(self, directory: Union[str, Path], max_size: int):
+        r"""Local cache of pipeline step outputs keyed on hashes of inputs.
+        Least recently used entries are evicted when cache size exceeds max_size.
+
+        Args:
+            directory (Union[str, Path]): Cache directory.
+            max_size (int): Maximum size of cache in bytes.
+        """
+
+        self.directory = Path(directory)
+        self.directory.mkdir(exist_ok=True, parents=True)
+        self.max_size = max_size
+
+    @staticmethod
+    def get_key(file_hash: str, *parts: Any) -> str:
+        """Returns cache key of input file and parameters of its processing.
+
+        Args:
+            file_hash (str): Hash of input file content.
+            parts (Any): JSON serializable parameters which affect output,
+                e.g. step name, step parameters and code version.
+
+        Returns:
+            str: Cache key.
+        """
+
+        digest = hashlib.sha256(file_hash.encode())
+        digest.update(json.dumps(parts, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _get_entry(self, key: str, output_path: Union[str, Path]) -> Path:
+        return Path(os.path.join(self.directory, f"{key}{Path(output_path).suffix}"))
+
+    def restore(self, key: str, output_path: Union[str, Path]) -> bool:
+        """Copies cached output to output path.
+
+        Args:
+            key (str): Cache key.
+            output_path (Union[str, Path]): Path to output file.
+
+        Returns:
+            bool: True in case of cache hit.
+        """
+
+        entry = self._get_entry(key, output_path)
+        if not entry.exists():
+            return False
+        shutil.copyfile(entry, output_path)
+        # Modification time is used as last access time for eviction
+        os.utime(entry)
+        return True
+
+    def store(self, key: str, output_path: Union[str, Path]) -> None:
+        """Copies output file to cache.
+
+        Args:
+            key (str): Cache key.
+            output_path (Union[str, Path]): Path to output file.
+        """
+
+        entry = self._get_entry(key, output_path)
+        temporary_entry = entry.with_name(f".{entry.name}.tmp")
+        shutil.copyfile(output_path, temporary_entry)
+        os.replace(temporary_entry, entry)
+
+    def evict(self) -> None:
+        """Removes least recently used entries until cache size fits max_size."""
+
+        entries = sorted(
+            (entry for entry in self.directory.iterdir() if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        cache_size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if cache_size <= self.max_size:
+                break
+            cache_size -= entry.stat().st_size
+            entry.unlink()
+            LOGGER.debug(f"{entry.name} is evicted from cache")
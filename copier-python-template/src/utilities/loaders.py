@@ -3,25 +3,202 @@ r"""
 Preprocessor of the main input data
 """
 import logging
+from pathlib import Path, PosixPath
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
 
 import pandas as pd
+import pyarrow as pa
+from pyarrow import compute as pc
+from pyarrow import csv as pv
+from pyarrow import dataset as ds
+from pyarrow import parquet as pq
 
+from common.constants import FEATHER_EXTENSION, PARQUET_EXTENSION, PICKLE_EXTENSION
+from common.exceptions import FileTypeError
 from core import BaseLoader
+from utilities.utils import get_filters_mask
 
 LOGGER = logging.getLogger(__name__)
 
 
-class CsvLoader(BaseLoader):       
-    r"""Loads raw csv data files."""
+class CsvLoader(BaseLoader):
+    def __init__(
+        self,
+        path: Union[str, PosixPath],
+        block_size: Optional[int] = None,
+    ):
+        r"""Loads raw csv data files.
+
+        Args:
+            path (Union[str, PosixPath]):
+                path to source file.
+            block_size (Optional[int], optional):
+                size in bytes of chunks yielded by `load_chunks`.
+                Defaults to None which means pyarrow default block size.
+        """
+
+        super().__init__(path)
+        self.block_size = block_size
 
     def load(self) -> pd.DataFrame:
         data = pd.read_csv(self.path, engine="pyarrow")
         return data
-    
-    
-class PickleLoader(BaseLoader):       
+
+    def load_chunks(self) -> Iterator[pd.DataFrame]:
+        """Yields consecutive chunks of csv file, so memory footprint
+        is bounded by block size instead of file size. Types are inferred from the first block,
+        if values of the next blocks aren't converted to them, file is read again from the failed
+        block with integer columns widened to float64, like the whole file is read.
+
+        Yields:
+            Iterator[pd.DataFrame]: Chunks of raw data.
+        """
+        read_options = pv.ReadOptions()
+        if self.block_size:
+            read_options.block_size = self.block_size
+        column_types: Dict[str, pa.DataType] = {}
+        n_chunks = 0
+        while True:
+            convert_options = pv.ConvertOptions(column_types=column_types)
+            with pv.open_csv(self.path, read_options=read_options, convert_options=convert_options) as reader:
+                integer_columns = {
+                    field.name: pa.float64() for field in reader.schema if pa.types.is_integer(field.type)
+                }
+                try:
+                    # Blocks don't depend on types, so already yielded ones are skipped
+                    for i, batch in enumerate(reader):
+                        if i >= n_chunks:
+                            n_chunks += 1
+                            yield batch.to_pandas()
+                    return
+                except pa.ArrowInvalid as exception:
+                    if not integer_columns:
+                        raise
+                    LOGGER.debug(f"Integer columns of {self.path} are widened to float64 due to: {exception}")
+                    column_types.update(integer_columns)
+
+    def load_sample(self, n_rows: int) -> pd.DataFrame:
+        """Loads the first rows of csv file without reading whole file.
+
+        Args:
+            n_rows (int): Number of rows.
+
+        Returns:
+            pd.DataFrame: The first rows of raw data.
+        """
+        chunks, size = [], 0
+        for chunk in self.load_chunks():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= n_rows:
+                break
+        return pd.concat(chunks, ignore_index=True).iloc[:n_rows] if chunks else pd.DataFrame()
+
+    def load_unique(self, columns: List[str]) -> Dict[str, List[Any]]:
+        """Loads unique values of columns, other columns aren't converted.
+
+        Args:
+            columns (List[str]): Columns of csv file.
+
+        Returns:
+            Dict[str, List[Any]]: Unique non-missing values of columns which are present in file.
+        """
+        with pv.open_csv(self.path) as reader:
+            header = reader.schema.names
+        columns = [column for column in columns if column in header]
+        if not columns:
+            return {}
+        table = pv.read_csv(self.path, convert_options=pv.ConvertOptions(include_columns=columns))
+        return {
+            column: pc.unique(table[column]).drop_null().to_pylist() for column in columns
+        }
+
+
+class DatasetLoader(BaseLoader):
+    def __init__(
+        self,
+        path: Union[str, PosixPath],
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None,
+    ):
+        r"""Loads intermediate datasets of pipeline steps.
+
+        Args:
+            path (Union[str, PosixPath]):
+                path to source file.
+            columns (Optional[List[str]], optional):
+                columns to read. Defaults to None which means all columns.
+            filters (Optional[List[Tuple[str, str, Any]]], optional):
+                row filters in pyarrow format combined with 'and',
+                e.g. [("GROUP_ID", "in", [1, 2])]. Defaults to None.
+        """
+
+        super().__init__(path)
+        self.columns = columns
+        self.filters = filters
+
+
+class PickleLoader(DatasetLoader):
     r"""Loads raw pickle data files."""
 
     def load(self) -> pd.DataFrame:
         data = pd.read_pickle(self.path, compression={"method": "gzip"})
-        return data
\ No newline at end of file
+        if self.filters:
+            data = data[get_filters_mask(data, self.filters)]
+        if self.columns:
+            data = data[self.columns]
+        return data
+
+
+class ParquetLoader(DatasetLoader):
+    r"""Loads parquet data files with column projection and predicate pushdown."""
+
+    def load(self) -> pd.DataFrame:
+        table = pq.read_table(
+            self.path,
+            columns=self.columns,
+            filters=self.filters if self.filters else None,
+        )
+        return table.to_pandas()
+
+
+class FeatherLoader(DatasetLoader):
+    r"""Loads feather (Arrow IPC) data files with column projection and predicate pushdown."""
+
+    def load(self) -> pd.DataFrame:
+        table = ds.dataset(self.path, format="feather").to_table(
+            columns=self.columns,
+            filter=pq.filters_to_expression(self.filters) if self.filters else None,
+        )
+        return table.to_pandas()
+
+
+LOADERS: Dict[str, Type[DatasetLoader]] = {
+    PICKLE_EXTENSION: PickleLoader,
+    PARQUET_EXTENSION: ParquetLoader,
+    FEATHER_EXTENSION: FeatherLoader,
+}
+
+
+def get_loader(
+    path: Union[str, PosixPath],
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Tuple[str, str, Any]]] = None,
+) -> DatasetLoader:
+    """Returns loader of intermediate dataset according to file suffix.
+
+    Args:
+        path (Union[str, PosixPath]): Path to source file.
+        columns (Optional[List[str]], optional): Columns to read. Defaults to None.
+        filters (Optional[List[Tuple[str, str, Any]]], optional): Row filters. Defaults to None.
+
+    Raises:
+        FileTypeError: In case of unsupported file suffix.
+
+    Returns:
+        DatasetLoader: Loader of intermediate dataset.
+    """
+    suffix = Path(path).suffix
+    if suffix not in LOADERS:
+        raise FileTypeError(f"{suffix} is not supported, please use one of {list(LOADERS)}")
+    return LOADERS[suffix](path=path, columns=columns, filters=filters)
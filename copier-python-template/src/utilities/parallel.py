@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Module with multiprocessing utils"""
+import logging
+import os
+from typing import Any, Callable, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from parallelbar import progress_map
+
+if TYPE_CHECKING:
+    from settings import MultiprocessingSettings
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_n_cpu(n_cpu: int) -> int:
+    """Returns number of workers for process pool.
+
+    Args:
+        n_cpu (int): Required number of workers. Non-positive value means all available cores.
+
+    Returns:
+        int: Number of workers.
+    """
+
+    if n_cpu > 0:
+        return n_cpu
+    return os.cpu_count() or 1
+
+
+def split_cpu_budget(n_cpu: int, n_tasks: int, n_threads: Optional[int] = None) -> Tuple[int, int]:
+    """Splits CPU budget between processes and threads of every process, so
+    concurrently running tasks don't oversubscribe cores.
+
+    Args:
+        n_cpu (int): CPU budget. Non-positive value means all available cores.
+        n_tasks (int): Number of tasks.
+        n_threads (Optional[int], optional): Required number of threads of every process.
+            Defaults to None which means the rest of budget.
+
+    Returns:
+        Tuple[int, int]: Number of processes and number of threads of every process.
+    """
+
+    budget = get_n_cpu(n_cpu)
+    if n_threads is not None and n_threads > 0:
+        return max(min(budget // n_threads, n_tasks), 1), n_threads
+    n_processes = max(min(budget, n_tasks), 1)
+    return n_processes, max(budget // n_processes, 1)
+
+
+def process_map(
+    func: Callable[[Any], Any],
+    tasks: Iterable[Any],
+    settings: 'MultiprocessingSettings',
+) -> List[Any]:
+    """Applies function to every task in process pool according to multiprocessing settings.
+
+    Each task is executed with `settings.process_timeout`. In case of `settings.error_behavior`
+    equals to 'coerce' exception of failed task is returned in place of its result, otherwise
+    the first exception is raised.
+
+    Args:
+        func (Callable[[Any], Any]): Picklable function to apply.
+        tasks (Iterable[Any]): Function arguments.
+        settings (MultiprocessingSettings): Multiprocessing settings.
+
+    Returns:
+        List[Any]: Results of function in order of tasks.
+    """
+
+    tasks = list(tasks)
+    if not tasks:
+        return []
+    n_cpu = min(get_n_cpu(settings.n_cpu), len(tasks))
+    LOGGER.debug(f"Processing {len(tasks)} tasks with {n_cpu} processes")
+    return progress_map(
+        func,
+        tasks,
+        n_cpu=n_cpu,
+        chunk_size=1,
+        process_timeout=settings.process_timeout,
+        error_behavior=settings.error_behavior,
+        set_error_value=None,
+    )
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Module with CatBoost features layout and batched prediction of model ensembles"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from typing import Iterator, List, Optional, Sequence
+
+from catboost import CatBoostClassifier, FeaturesData
+import numpy as np
+import pandas as pd
+
+from common.constants import IGNORED_FEATURES
+from utilities.writers import DatasetWriter
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_features_data(data: pd.DataFrame) -> FeaturesData:
+    r"""Returns features in CatBoost layout: one C-contiguous float32 matrix of numeric features
+    and object matrix of categorical features, so pool doesn't convert dataframe column by column.
+    The same layout is used for training and prediction.
+
+    Args:
+        data (pd.DataFrame): Input data, TARGET column is ignored.
+
+    Returns:
+        FeaturesData: Numeric features followed by categorical ones.
+    """
+
+    features = data.columns.drop("TARGET", errors="ignore")
+    cat_features = data[features].select_dtypes(include=["object", "category"]).columns
+    num_features = features.drop(cat_features)
+
+    num_feature_data = np.empty((len(data), len(num_features)), dtype=np.float32)
+    for position, column in enumerate(num_features):
+        values = data[column]
+        if values.dtype.kind == "M":
+            # Timestamps are nanoseconds like in pool built from dataframe
+            values = values.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        else:
+            values = values.to_numpy(dtype=np.float32, na_value=np.nan)
+        num_feature_data[:, position] = values
+    cat_feature_data = None
+    if len(cat_features):
+        cat_feature_data = np.empty((len(data), len(cat_features)), dtype=object)
+        for position, column in enumerate(cat_features):
+            cat_feature_data[:, position] = data[column].astype(str).to_numpy()
+    return FeaturesData(
+        num_feature_data=num_feature_data,
+        cat_feature_data=cat_feature_data,
+        num_feature_names=num_features.tolist(),
+        cat_feature_names=cat_features.tolist() if len(cat_features) else None,
+    )
+
+
+def add_ignored_features(data: pd.DataFrame, models: Sequence[CatBoostClassifier]) -> pd.DataFrame:
+    """Adds ignored features of models which are missing in data, e.g. GROUP_ID of new objects.
+    Ignored features aren't used by models, so they are filled with missing values.
+
+    Args:
+        data (pd.DataFrame): Input data.
+        models (Sequence[CatBoostClassifier]): Fitted models.
+
+    Returns:
+        pd.DataFrame: Input data with all features of models.
+    """
+
+    for column in IGNORED_FEATURES:
+        if column not in data.columns and any(column in model.feature_names_ for model in models):
+            data[column] = np.nan
+    return data
+
+
+class BatchPredictor:
+    def __init__(
+        self,
+        models: Sequence[CatBoostClassifier],
+        batch_size: int = 100_000,
+        n_threads: int = 1,
+        threshold: float = 0.5,
+    ):
+        r"""Predicts probabilities of ensemble of models by batches of rows, so memory
+        footprint is bounded by batch size instead of data size. Batches are predicted
+        concurrently by threads, every model uses one thread of CatBoost.
+
+        Args:
+            models (Sequence[CatBoostClassifier]): Fitted models, their probabilities are averaged.
+            batch_size (int, optional): Number of rows of one batch. Defaults to 100_000.
+            n_threads (int, optional): Number of concurrently predicted batches. Defaults to 1.
+            threshold (float, optional): Threshold of positive class. Defaults to 0.5.
+        """
+
+        if not models:
+            raise ValueError("At least one model is required")
+        self.models = list(models)
+        self.batch_size = batch_size
+        self.n_threads = n_threads
+        self.threshold = threshold
+
+    def _predict_batch(self, data: pd.DataFrame, start: int, output: np.ndarray) -> None:
+        batch = data.iloc[start:start + self.batch_size]
+        probability = output[start:start + len(batch)]
+        for model in self.models:
+            features = batch[model.feature_names_]
+            cat_features = model.get_cat_feature_indices()
+            if all(position >= len(model.feature_names_) - len(cat_features) for position in cat_features):
+                # Layout of models trained on FeaturesData is kept, other models get dataframe
+                features = get_features_data(features)
+            probability += model.predict(features, prediction_type="Probability", thread_count=1)[:, 1]
+        probability /= len(self.models)
+
+    def _iter_batches(self, data: pd.DataFrame, output: np.ndarray) -> Iterator[slice]:
+        starts = range(0, len(data), self.batch_size)
+        if self.n_threads <= 1:
+            for start in starts:
+                self._predict_batch(data, start, output)
+                yield slice(start, min(start + self.batch_size, len(data)))
+            return
+        # Batches are yielded in order of rows as soon as they are predicted
+        with ThreadPoolExecutor(max_workers=self.n_threads) as executor:
+            futures = [executor.submit(self._predict_batch, data, start, output) for start in starts]
+            for start, future in zip(starts, futures):
+                future.result()
+                yield slice(start, min(start + self.batch_size, len(data)))
+
+    def predict_proba(self, data: pd.DataFrame) -> np.ndarray:
+        """Returns averaged probabilities of positive class.
+
+        Args:
+            data (pd.DataFrame): Input data with features of all models.
+
+        Returns:
+            np.ndarray: Float32 probabilities of rows.
+        """
+
+        output = np.zeros(len(data), dtype=np.float32)
+        for _ in self._iter_batches(data, output):
+            pass
+        return output
+
+    def write(
+        self,
+        data: pd.DataFrame,
+        writer: DatasetWriter,
+        columns: Optional[List[str]] = None,
+    ) -> np.ndarray:
+        """Writes predictions batch by batch with PREDICTION_CONT and PREDICTION_DISC columns.
+
+        Args:
+            data (pd.DataFrame): Input data with features of all models.
+            writer (DatasetWriter): Writer of predictions.
+            columns (Optional[List[str]], optional): Columns of data which are written along with
+                predictions. Defaults to None which means GROUP_ID if it's present.
+
+        Returns:
+            np.ndarray: Float32 probabilities of rows.
+        """
+
+        if columns is None:
+            columns = [column for column in ["GROUP_ID"] if column in data.columns]
+        output = np.zeros(len(data), dtype=np.float32)
+        for rows in self._iter_batches(data, output):
+            prediction = data.iloc[rows][columns].reset_index(drop=True)
+            prediction["PREDICTION_CONT"] = output[rows]
+            prediction["PREDICTION_DISC"] = (output[rows] > self.threshold).astype(np.int8)
+            writer.write(prediction)
+        return output
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""Module with profiling of pipeline steps stages"""
+from contextlib import contextmanager
+import json
+import logging
+import os
+from pathlib import Path
+import resource
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+LOGGER = logging.getLogger(__name__)
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def get_peak_rss() -> int:
+    """Returns peak resident set size of current process in bytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT
+
+
+class StageProfiler:
+    def __init__(self, enabled: bool = False):
+        r"""Collects wall time, CPU time and peak RSS of stages of pipeline step.
+        Disabled profiler doesn't measure anything.
+
+        Peak RSS is a high-water mark of the process, so `peak_rss_increase` shows
+        how much the stage raised it.
+
+        Args:
+            enabled (bool, optional): Whether to measure stages. Defaults to False.
+        """
+
+        self.enabled = enabled
+        self.records: List[Dict[str, Any]] = []
+        self._file_names: List[Optional[str]] = []
+
+    @contextmanager
+    def measure(self, stage: str, file_name: Optional[str] = None) -> Iterator[None]:
+        """Measures enclosed code as stage of processing of file.
+
+        Args:
+            stage (str): Name of stage.
+            file_name (Optional[str], optional): Name of processed file. Defaults to None
+                which means file of enclosing stage.
+        """
+
+        if not self.enabled:
+            yield
+            return
+
+        if file_name is None and self._file_names:
+            file_name = self._file_names[-1]
+        self._file_names.append(file_name)
+        start, wall_start, cpu_start = time.time(), time.perf_counter(), time.process_time()
+        peak_rss_start = get_peak_rss()
+        try:
+            yield
+        finally:
+            peak_rss = get_peak_rss()
+            self.records.append({
+                "stage": stage,
+                "file": file_name,
+                "start": start,
+                "wall_time": time.perf_counter() - wall_start,
+                "cpu_time": time.process_time() - cpu_start,
+                "peak_rss": peak_rss,
+                "peak_rss_increase": peak_rss - peak_rss_start,
+                "pid": os.getpid(),
+            })
+            self._file_names.pop()
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Adds records of profiler from child process.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): Records of another profiler.
+        """
+
+        self.records.extend(records)
+
+    def summary(self) -> pd.DataFrame:
+        """Returns measurements aggregated over repeated stages of one file, e.g. over chunks.
+
+        Returns:
+            pd.DataFrame: Calls number, total wall and CPU time and peak RSS of every stage of every file.
+        """
+
+        if not self.records:
+            return pd.DataFrame()
+        records = pd.DataFrame(self.records)
+        records["file"] = records["file"].fillna("")
+        return records.groupby(["stage", "file"], sort=False).agg(
+            calls=("wall_time", "size"),
+            wall_time=("wall_time", "sum"),
+            cpu_time=("cpu_time", "sum"),
+            peak_rss=("peak_rss", "max"),
+            peak_rss_increase=("peak_rss_increase", "max"),
+        ).reset_index()
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Saves records as JSON trace in Chrome trace event format,
+        which can be opened in chrome://tracing or Perfetto.
+
+        Args:
+            path (Union[str, Path]): Path to trace file.
+
+        Returns:
+            Path: Path to trace file.
+        """
+
+        events = [
+            {
+                "name": record["stage"],
+                "ph": "X",
+                "ts": record["start"] * 1e6,
+                "dur": record["wall_time"] * 1e6,
+                "pid": record["pid"],
+                "tid": record["pid"],
+                "args": {
+                    key: record[key]
+                    for key in ("file", "cpu_time", "peak_rss", "peak_rss_increase")
+                },
+            }
+            for record in self.records
+        ]
+        path = Path(path)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        LOGGER.debug(f"{len(events)} profiling records are saved to {path}")
+        return path
+
+
+def transform_pipeline(
+    pipeline: Pipeline,
+    X: Any,
+    profiler: Optional[StageProfiler] = None,
+) -> Any:
+    """Applies stateless transformers of pipeline one by one and measures every of them
+    as a separate stage when profiler is enabled.
+
+    Args:
+        pipeline (Pipeline): Pipeline of transformers.
+        X (Any): Input data.
+        profiler (Optional[StageProfiler], optional): Profiler. Defaults to None.
+
+    Returns:
+        Any: Transformed data.
+    """
+
+    for name, transformer in pipeline.steps:
+        if transformer is None or transformer == "passthrough":
+            continue
+        if profiler is None or not profiler.enabled:
+            X = transformer.transform(X)
+            continue
+        with profiler.measure(name):
+            X = transformer.transform(X)
+    return X
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""Module with sliding and expanding window quantiles"""
+from typing import Optional
+
+from numba import njit
+import numpy as np
+
+
+@njit(cache=True, nogil=True)
+def _find_kth(tree: np.ndarray, step: int, k: int) -> int:
+    # Descends Fenwick tree to position of the k-th (zero-based) present rank
+    position = 0
+    while step:
+        next_position = position + step
+        if next_position < len(tree) and tree[next_position] <= k:
+            position = next_position
+            k -= tree[position]
+        step >>= 1
+    return position
+
+
+@njit(cache=True, nogil=True)
+def _update(tree: np.ndarray, position: int, value: int) -> None:
+    position += 1
+    while position < len(tree):
+        tree[position] += value
+        position += position & -position
+
+
+@njit(cache=True, nogil=True)
+def _rank_blocks(
+    values: np.ndarray,
+    order: np.ndarray,
+    block: int,
+    ranks: np.ndarray,
+    sorted_values: np.ndarray,
+) -> None:
+    # Merges sorted previous and current blocks, missing values are greater than others
+    start = max(block - 1, 0) * len(order[block])
+    previous = order[block - 1] if block else order[block][:0]
+    current = order[block]
+    offset = len(previous)
+    i = j = 0
+    value = np.nan
+    for rank in range(len(previous) + len(current)):
+        if j < len(current):
+            value = values[start + offset + current[j]]
+        if i < len(previous) and (
+            j >= len(current) or np.isnan(value) or values[start + previous[i]] <= value
+        ):
+            position = previous[i]
+            i += 1
+        else:
+            position = offset + current[j]
+            j += 1
+        ranks[position] = rank
+        sorted_values[rank] = values[start + position]
+
+
+@njit(cache=True, nogil=True)
+def _move_quantile(
+    values: np.ndarray,
+    order: np.ndarray,
+    n_rows: int,
+    quantile: float,
+    min_count: int,
+    output: np.ndarray,
+) -> None:
+    # Windows of block rows lie in the block and the previous one, so values of both blocks
+    # are ranked together and tree has 2 * window leaves
+    n_blocks, window = order.shape
+    tree = np.empty(2 * window + 1, dtype=np.int64)
+    ranks = np.empty(2 * window, dtype=np.int64)
+    sorted_values = np.empty(2 * window, dtype=np.float64)
+    step = 1
+    while step * 2 <= 2 * window:
+        step *= 2
+
+    for block in range(n_blocks):
+        block_start = block * window
+        start = max(block - 1, 0) * window
+        _rank_blocks(values, order, block, ranks, sorted_values)
+
+        tree[:] = 0
+        count = 0
+        for row in range(start, block_start):
+            if not np.isnan(values[row]):
+                _update(tree, ranks[row - start], 1)
+                count += 1
+        for row in range(block_start, min(block_start + window, n_rows)):
+            if not np.isnan(values[row]):
+                _update(tree, ranks[row - start], 1)
+                count += 1
+            if row >= window and not np.isnan(values[row - window]):
+                _update(tree, ranks[row - window - start], -1)
+                count -= 1
+            if count == 0 or count < min_count:
+                output[row] = np.nan
+                continue
+            # Linear interpolation between order statistics like in pandas
+            index = quantile * (count - 1)
+            lower = int(np.floor(index))
+            fraction = index - lower
+            result = sorted_values[_find_kth(tree, step, lower)]
+            if fraction > 0:
+                upper = sorted_values[_find_kth(tree, step, lower + 1)]
+                result += (upper - result) * fraction
+            output[row] = result
+
+
+def move_quantile(
+    values: np.ndarray,
+    quantile: float,
+    window: Optional[int] = None,
+    min_count: Optional[int] = None,
+    axis: int = 0,
+) -> np.ndarray:
+    r"""Returns moving quantile of array along axis like rolling or expanding quantile of pandas
+    with linear interpolation. Missing and infinite values are skipped. Rows are split into blocks of window
+    size which are sorted at once by numpy, window is kept in Fenwick tree of ranks of the current
+    and the previous blocks, so every step costs O(log window) instead of sorting window.
+
+    Args:
+        values (np.ndarray): 1D or 2D input array.
+        quantile (float): Value between 0 <= q <= 1.
+        window (Optional[int], optional): Size of the moving window. Defaults to None
+            which means expanding window.
+        min_count (Optional[int], optional): Minimum number of not missing values in window
+            required to have a value. Defaults to None which means window for moving window
+            and 1 for expanding one.
+        axis (int, optional): Axis of moving window. Defaults to 0.
+
+    Raises:
+        ValueError: Raised when quantile, window or min_count are out of bounds.
+
+    Returns:
+        np.ndarray: Float64 array of quantiles with the same shape as input.
+    """
+
+    if not 0 <= quantile <= 1:
+        raise ValueError(f"Quantile {quantile} is out of [0, 1]")
+    if window is not None and window < 1:
+        raise ValueError(f"Window {window} must be positive")
+    if window is not None and min_count is not None and min_count > window:
+        raise ValueError(f"min_count {min_count} must be <= window {window}")
+    if min_count is None:
+        min_count = 1 if window is None else window
+
+    values = np.asarray(values, dtype=np.float64)
+    is_infinite = np.isinf(values)
+    if is_infinite.any():
+        # Infinite values are missing in windows of pandas
+        values = np.where(is_infinite, np.nan, values)
+    is_vector = values.ndim == 1
+    values = values.reshape(1, -1) if is_vector else np.moveaxis(values, axis, -1)
+    n_rows = values.shape[1]
+    output = np.empty(values.shape, dtype=np.float64)
+    if n_rows:
+        # Expanding window is one block of all rows
+        window = min(window or n_rows, n_rows)
+        n_blocks = -(-n_rows // window)
+        padded = np.full((len(values), n_blocks * window), np.nan)
+        padded[:, :n_rows] = values
+        # Missing values are sorted last, so ranks of present values are contiguous
+        order = np.argsort(padded.reshape(len(values), n_blocks, window), axis=-1)
+        for column in range(len(values)):
+            _move_quantile(padded[column], order[column], n_rows, float(quantile), min_count, output[column])
+    return output.reshape(-1) if is_vector else np.moveaxis(output, -1, axis)
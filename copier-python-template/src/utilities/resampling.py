@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""Module with time step inference and resampling of numeric time series"""
+import logging
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from common.config import RESAMPLING_CONFIG
+from common.constants import TIMESTEP_SAMPLE_SIZE
+
+LOGGER = logging.getLogger(__name__)
+
+NANOSECONDS_IN_SECOND = 10**9
+NANOSECONDS_IN_DAY = 86_400 * NANOSECONDS_IN_SECOND
+DEFAULT_AGGREGATION = "mean"
+
+
+def to_nanoseconds(datetimes: pd.Series) -> np.ndarray:
+    """Returns timestamps as integer nanoseconds, NaT is the minimal int64.
+
+    Args:
+        datetimes (pd.Series): Timezone-naive timestamps.
+
+    Returns:
+        np.ndarray: Array of int64 nanoseconds since epoch.
+    """
+    return datetimes.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def infer_timestep(datetimes: pd.Series, sample_size: int = TIMESTEP_SAMPLE_SIZE) -> Optional[int]:
+    """Returns the most frequent time step in seconds of timestamps. It's inferred
+    from the histogram of integer nanosecond differences of the first rows.
+
+    Args:
+        datetimes (pd.Series): Timestamps.
+        sample_size (int, optional): Number of first rows used for inference.
+            Defaults to TIMESTEP_SAMPLE_SIZE.
+
+    Returns:
+        Optional[int]: Time step in seconds, at least one second. None if there are
+            no two different timestamps in sample.
+    """
+
+    sample = datetimes.iloc[:sample_size]
+    if sample.dt.tz is not None:
+        sample = sample.dt.tz_convert(None)
+    nanoseconds = to_nanoseconds(sample)
+    nanoseconds = nanoseconds[nanoseconds != np.iinfo(np.int64).min]
+    differences = np.diff(nanoseconds)
+    differences = differences[differences > 0]
+    if not len(differences):
+        return None
+    steps, counts = np.unique(differences, return_counts=True)
+    return max(int(steps[counts.argmax()] // NANOSECONDS_IN_SECOND), 1)
+
+
+def get_origin(nanoseconds: np.ndarray, origin: Union[str, pd.Timestamp] = "epoch") -> int:
+    """Returns origin of time bins in integer nanoseconds.
+
+    Args:
+        nanoseconds (np.ndarray): Timestamps as integer nanoseconds.
+        origin (Union[str, pd.Timestamp], optional): 'epoch', 'start_day' or timestamp
+            like in pandas resample. Defaults to "epoch".
+
+    Returns:
+        int: Origin in nanoseconds since epoch.
+    """
+
+    if isinstance(origin, pd.Timestamp):
+        return int(origin.value)
+    if origin == "epoch":
+        return 0
+    if origin == "start_day":
+        return int(nanoseconds.min() // NANOSECONDS_IN_DAY * NANOSECONDS_IN_DAY)
+    raise ValueError(f"Origin {origin} isn't supported")
+
+
+def get_bins(nanoseconds: np.ndarray, time_step: int, origin: Union[str, pd.Timestamp] = "epoch") -> np.ndarray:
+    """Returns indices of time bins of timestamps.
+
+    Args:
+        nanoseconds (np.ndarray): Timestamps as integer nanoseconds.
+        time_step (int): Time step in seconds.
+        origin (Union[str, pd.Timestamp], optional): 'epoch', 'start_day' or timestamp
+            like in pandas resample. Defaults to "epoch".
+
+    Returns:
+        np.ndarray: Indices of bins counted from origin.
+    """
+    return (nanoseconds - get_origin(nanoseconds, origin)) // (time_step * NANOSECONDS_IN_SECOND)
+
+
+def _get_values(data: pd.DataFrame, position: int, rows: Optional[np.ndarray]) -> np.ndarray:
+    series = data.iloc[:, position]
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind == "f":
+        values = series.to_numpy()
+    else:
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return values if rows is None else values[rows]
+
+
+def _reduce_mean(block: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    is_valid = ~np.isnan(block)
+    sums = np.add.reduceat(np.where(is_valid, block, 0).astype(np.float64), starts, axis=1)
+    counts = np.add.reduceat(is_valid, starts, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def _reduce_last(block: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # Position of the last valid value of every bin, -1 for bins without valid values
+    positions = np.where(~np.isnan(block), np.arange(block.shape[1]), -1)
+    last_positions = np.maximum.reduceat(positions, starts, axis=1)
+    output = np.take_along_axis(block, np.maximum(last_positions, 0), axis=1)
+    output[last_positions < 0] = np.nan
+    return output
+
+
+def _reduce_max(block: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    return np.fmax.reduceat(block, starts, axis=1)
+
+
+REDUCERS: Dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "mean": _reduce_mean,
+    "last": _reduce_last,
+    "max": _reduce_max,
+}
+
+
+def resample(
+    data: pd.DataFrame,
+    time_step: int,
+    datetime_column: str = "datetime",
+    aggregations: Optional[Dict[str, str]] = None,
+    origin: Union[str, pd.Timestamp] = "epoch",
+    batch_size: int = 16,
+) -> pd.DataFrame:
+    r"""Resamples numeric columns of time series to regular time step. Non-numeric columns
+    are dropped. Bins are computed with integer arithmetic on nanoseconds and aggregated with
+    ufunc reduceat over blocks of columns, data which is already regular is only aligned to bins.
+    Empty bins between first and last bins are kept with missing values like in pandas resample.
+
+    Args:
+        data (pd.DataFrame): Input data.
+        time_step (int): Time step in seconds.
+        datetime_column (str, optional): Column of timestamps. Defaults to "datetime".
+        aggregations (Optional[Dict[str, str]], optional): Aggregations of columns, one of
+            'mean', 'last' or 'max'. Defaults to None which means RESAMPLING_CONFIG,
+            columns missing in config are averaged.
+        origin (Union[str, pd.Timestamp], optional): 'epoch', 'start_day' or timestamp
+            like in pandas resample. Defaults to "epoch".
+        batch_size (int, optional): Number of columns aggregated at once. Defaults to 16.
+
+    Returns:
+        pd.DataFrame: Resampled data with datetime column and numeric columns.
+    """
+
+    aggregations = RESAMPLING_CONFIG if aggregations is None else aggregations
+    numeric_columns = [
+        position for position, (column, dtype) in enumerate(data.dtypes.items())
+        # Nullable integers, floats and booleans of schema are resampled like numpy ones
+        if column != datetime_column and (
+            pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)
+        ) and not pd.api.types.is_timedelta64_dtype(dtype)
+    ]
+    datetimes = data[datetime_column]
+    if datetimes.dt.tz is not None:
+        # Local midnight of timezone-aware data is left to pandas
+        return _resample_with_pandas(data, time_step, datetime_column, aggregations, origin, numeric_columns)
+
+    nanoseconds = to_nanoseconds(datetimes)
+    is_valid = nanoseconds != np.iinfo(np.int64).min
+    rows = None if is_valid.all() else np.flatnonzero(is_valid)
+    if rows is not None:
+        nanoseconds = nanoseconds[rows]
+    if not len(nanoseconds):
+        return data.iloc[:0, [data.columns.get_loc(datetime_column)] + numeric_columns].reset_index(drop=True)
+
+    if not (nanoseconds[1:] >= nanoseconds[:-1]).all():
+        # Rows are sorted by time like index of pandas resample
+        order = np.argsort(nanoseconds, kind="stable")
+        rows = order if rows is None else rows[order]
+        nanoseconds = nanoseconds[order]
+    bins = get_bins(nanoseconds, time_step, origin)
+
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    first_bin, n_bins = bins[0], int(bins[-1] - bins[0] + 1)
+    is_regular = len(starts) == len(bins) == n_bins
+
+    time_step_nanoseconds = time_step * NANOSECONDS_IN_SECOND
+    output = {
+        -1: (get_origin(nanoseconds, origin) + np.arange(first_bin, first_bin + n_bins) * time_step_nanoseconds)
+        .astype("datetime64[ns]"),
+    }
+    groups: Dict[str, List[int]] = {}
+    for position in numeric_columns:
+        aggregation = aggregations.get(data.columns[position], DEFAULT_AGGREGATION)
+        if aggregation not in REDUCERS:
+            raise ValueError(f"Aggregation {aggregation} isn't supported")
+        groups.setdefault(aggregation, []).append(position)
+
+    for aggregation, positions in groups.items():
+        for start in range(0, len(positions), batch_size):
+            batch = positions[start:start + batch_size]
+            block = np.stack([_get_values(data, position, rows) for position in batch])
+            if is_regular:
+                # Every bin has exactly one row, so every aggregation returns it as is
+                reduced = block
+            else:
+                reduced = np.full((len(batch), n_bins), np.nan, dtype=block.dtype)
+                reduced[:, bins[starts] - first_bin] = REDUCERS[aggregation](block, starts)
+            for position, values in zip(batch, reduced):
+                dtype = data.dtypes.iloc[position]
+                is_float = isinstance(dtype, np.dtype) and dtype.kind == "f"
+                output[position] = values.astype(dtype if is_float else np.float64, copy=False)
+
+    # Columns are assembled by positions, so duplicated names are kept
+    positions = [-1] + numeric_columns
+    output = pd.DataFrame({i: output[position] for i, position in enumerate(positions)})
+    output.columns = [datetime_column] + [data.columns[position] for position in numeric_columns]
+    return output
+
+
+def _resample_with_pandas(
+    data: pd.DataFrame,
+    time_step: int,
+    datetime_column: str,
+    aggregations: Dict[str, str],
+    origin: Union[str, pd.Timestamp],
+    numeric_columns: List[int],
+) -> pd.DataFrame:
+    data = data.iloc[:, [data.columns.get_loc(datetime_column)] + numeric_columns].set_index(datetime_column)
+    output = data.resample(f"{time_step}s", origin=origin).agg({
+        column: aggregations.get(column, DEFAULT_AGGREGATION) for column in data.columns
+    })
+    return output.astype({
+        column: np.float64 for column, dtype in output.dtypes.items()
+        if not (isinstance(dtype, np.dtype) and dtype.kind == "f")
+    }).reset_index()
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""Module with inference, persistence and application of dtypes schema of datasets"""
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from common.config import ALL_TYPES
+
+LOGGER = logging.getLogger(__name__)
+
+INTEGER_DTYPES = ("int8", "int16", "int32", "int64")
+FLOAT_DTYPES = ("float32", "float64")
+
+
+def _get_integer_dtype(minimum: float, maximum: float, nullable: bool = False) -> str:
+    for dtype in INTEGER_DTYPES:
+        if np.iinfo(dtype).min <= minimum and maximum <= np.iinfo(dtype).max:
+            return dtype.capitalize() if nullable else dtype
+    return "Float64" if nullable else "float64"
+
+
+def _get_float_dtype(minimum: float, maximum: float) -> str:
+    # float16 isn't used, it loses too much precision of sensors
+    if float(np.finfo(np.float32).min) <= minimum and maximum <= float(np.finfo(np.float32).max):
+        return "float32"
+    return "float64"
+
+
+def _merge_dtypes(first: str, second: str) -> str:
+    r"""Returns the narrowest dtype which holds values of both dtypes."""
+    if first == second:
+        return first
+    numeric = INTEGER_DTYPES + FLOAT_DTYPES
+    nullable = first[0].isupper() or second[0].isupper()
+    first, second = first.lower(), second.lower()
+    if first in numeric and second in numeric:
+        if first in INTEGER_DTYPES and second in INTEGER_DTYPES:
+            dtype = max(first, second, key=INTEGER_DTYPES.index)
+            return dtype.capitalize() if nullable else dtype
+        if "int64" in (first, second) or "int32" in (first, second):
+            return "float64"
+        return max(first, second, key=numeric.index)
+    if {first, second} == {"bool", "boolean"}:
+        return "boolean"
+    return "object"
+
+
+class DataSchema:
+    def __init__(
+        self,
+        dtypes: Optional[Dict[str, str]] = None,
+        categories: Optional[Dict[str, List[Any]]] = None,
+        category_ratio: float = 0.05,
+        max_categories: int = 1000,
+        infer_integers: bool = False,
+    ):
+        r"""Dtypes of dataset columns which are inferred once from samples of the first files
+        and applied to all files, so dtypes don't drift between objects. Dtypes of ALL_TYPES
+        take precedence over inferred ones. Categorical columns of all files are encoded with
+        the same categories, so concatenated objects stay categorical.
+
+        Args:
+            dtypes (Optional[Dict[str, str]], optional): Known dtypes of columns. Defaults to None.
+            categories (Optional[Dict[str, List[Any]]], optional): Known categories of categorical
+                columns. New categories are only appended, so codes of known ones don't change.
+                Defaults to None.
+            category_ratio (float, optional): Maximum ratio of unique values to rows of string
+                column to convert it to category. Defaults to 0.05.
+            max_categories (int, optional): Maximum number of categories. Defaults to 1000.
+            infer_integers (bool, optional): Whether to convert float columns with only integral
+                values to integers, nullable if there are missing values. It's safe only if
+                samples are representative. Defaults to False.
+        """
+
+        self.dtypes: Dict[str, str] = dict(dtypes or {})
+        self.categories: Dict[str, List[Any]] = {
+            column: list(values) for column, values in (categories or {}).items()
+        }
+        self.category_ratio = category_ratio
+        self.max_categories = max_categories
+        self.infer_integers = infer_integers
+
+    def infer(self, data: pd.DataFrame) -> Dict[str, str]:
+        """Returns optimal dtypes of columns of data.
+
+        Args:
+            data (pd.DataFrame): Sample of data.
+
+        Returns:
+            Dict[str, str]: Dtypes of columns.
+        """
+
+        data = data.loc[:, ~data.columns.duplicated()]
+        numeric = data.select_dtypes(include=["number"]).columns
+        # Bounds of all numeric columns are computed by one vectorized reduction
+        bounds = data[numeric].agg(["min", "max"]) if len(numeric) else pd.DataFrame()
+        dtypes = {}
+        for column, dtype in data.dtypes.items():
+            if column in ALL_TYPES:
+                dtypes[column] = ALL_TYPES[column]
+            elif column in numeric:
+                minimum, maximum = bounds[column]
+                if pd.isna(minimum):
+                    dtypes[column] = str(dtype)
+                elif pd.api.types.is_integer_dtype(dtype):
+                    dtypes[column] = _get_integer_dtype(
+                        minimum, maximum, nullable=not isinstance(dtype, np.dtype)
+                    )
+                elif self.infer_integers and self._is_integral(data[column]):
+                    dtypes[column] = _get_integer_dtype(
+                        minimum, maximum, nullable=bool(data[column].isna().any())
+                    )
+                else:
+                    dtypes[column] = _get_float_dtype(minimum, maximum)
+            elif dtype == object:
+                dtypes[column] = self._infer_object_dtype(data[column])
+            elif isinstance(dtype, np.dtype) and dtype.kind == "M":
+                dtypes[column] = "datetime64[ns]"
+            else:
+                dtypes[column] = str(dtype)
+        return dtypes
+
+    def update(self, data: pd.DataFrame) -> 'DataSchema':
+        """Infers dtypes of sample and merges them with known dtypes.
+
+        Args:
+            data (pd.DataFrame): Sample of data.
+
+        Returns:
+            DataSchema: Updated schema.
+        """
+
+        for column, dtype in self.infer(data).items():
+            if column in ALL_TYPES or column not in self.dtypes:
+                self.dtypes[column] = dtype
+            else:
+                self.dtypes[column] = _merge_dtypes(self.dtypes[column], dtype)
+        return self.update_categories({
+            column: data[column].dropna().unique()
+            for column in data.columns.unique() if self.dtypes.get(column) == "category"
+        })
+
+    def update_categories(self, values: Dict[str, Iterable[Any]]) -> 'DataSchema':
+        """Appends new values of categorical columns to their categories.
+
+        Args:
+            values (Dict[str, Iterable[Any]]): Values of categorical columns.
+
+        Returns:
+            DataSchema: Updated schema.
+        """
+
+        for column, column_values in values.items():
+            categories = self.categories.setdefault(column, [])
+            known = set(categories)
+            # New categories are sorted, so schema doesn't depend on order of rows
+            categories.extend(sorted(set(column_values) - known, key=str))
+        return self
+
+    def apply(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Converts columns of data to schema dtypes with single astype.
+        Columns which already have required dtype aren't copied.
+
+        Args:
+            data (pd.DataFrame): Input data.
+
+        Returns:
+            pd.DataFrame: Data with schema dtypes.
+        """
+
+        dtypes = {}
+        for column, dtype in self.dtypes.items():
+            if column not in data.columns:
+                continue
+            if dtype == "category" and column in self.categories:
+                categories = pd.Index(self.categories[column])
+                source = data.dtypes[column]
+                # Equal unordered categoricals may have different codes, so categories are compared
+                if not (isinstance(source, pd.CategoricalDtype) and source.categories.equals(categories)):
+                    dtypes[column] = pd.CategoricalDtype(categories)
+            elif str(data.dtypes[column]) != dtype:
+                dtypes[column] = dtype
+        # Integers are inferred from samples, so columns with values out of their bounds,
+        # fractional values or missing values which don't fit non-nullable integers keep source dtype
+        integer_columns = [
+            column for column, dtype in dtypes.items() 
+            if isinstance(dtype, str) and dtype.lower() in INTEGER_DTYPES 
+            and pd.api.types.is_numeric_dtype(data.dtypes[column])
+        ]
+        if integer_columns:
+            bounds = data[integer_columns].agg(["min", "max"])
+            has_missing = data[integer_columns].isna().any()
+            for column in integer_columns:
+                dtype = dtypes[column]
+                minimum, maximum = bounds[column]
+                if pd.notna(minimum) and not (
+                    np.iinfo(dtype.lower()).min <= minimum and maximum <= np.iinfo(dtype.lower()).max
+                ):
+                    LOGGER.warning(f"Values of {column} are out of bounds of {dtype}, dtype is kept")
+                    del dtypes[column]
+                elif dtype.islower() and has_missing[column]:
+                    LOGGER.debug(f"{column} has missing values, so it isn't converted to {dtype}")
+                    del dtypes[column]
+                elif pd.api.types.is_float_dtype(data.dtypes[column]) and pd.notna(minimum) \
+                    and not self._is_integral(data[column]):
+                    LOGGER.debug(f"{column} has fractional values, so it isn't converted to {dtype}")
+                    del dtypes[column]
+        if not dtypes:
+            return data
+        LOGGER.debug(f"Columns {list(dtypes)} are converted to schema dtypes")
+        category_columns = [
+            column for column, dtype in dtypes.items() if isinstance(dtype, pd.CategoricalDtype)
+        ]
+        n_missing = data[category_columns].isna().sum()
+        # astype doesn't recode categoricals with equal unordered dtype, so their categories are set
+        recoded = {
+            column: data[column].cat.set_categories(dtypes.pop(column).categories)
+            for column in category_columns if isinstance(data.dtypes[column], pd.CategoricalDtype)
+        }
+        data = data.astype(dtypes, copy=False) if dtypes else data.copy(deep=False)
+        for column, values in recoded.items():
+            data[column] = values
+        n_unknown = data[category_columns].isna().sum() - n_missing
+        for column, count in n_unknown[n_unknown > 0].items():
+            LOGGER.warning(f"{count} values of {column} are missing in categories of schema")
+        return data
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Returns dtypes and categories of schema.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Dtypes and categories of columns.
+        """
+        return {"dtypes": self.dtypes, "categories": self.categories}
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Saves schema to JSON file.
+
+        Args:
+            path (Union[str, Path]): Path to schema file.
+
+        Returns:
+            Path: Path to schema file.
+        """
+
+        path = Path(path)
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2, sort_keys=True)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path], **kwargs) -> 'DataSchema':
+        """Loads schema from JSON file.
+
+        Args:
+            path (Union[str, Path]): Path to schema file.
+            kwargs: Other arguments of DataSchema.
+
+        Returns:
+            DataSchema: Loaded schema.
+        """
+
+        with open(path) as file:
+            return cls(**json.load(file), **kwargs)
+
+    @staticmethod
+    def _is_integral(series: pd.Series) -> bool:
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        return bool(len(values)) and bool(np.all(values == np.round(values)))
+
+    def _infer_object_dtype(self, series: pd.Series) -> str:
+        values = series.dropna()
+        if not len(values):
+            return "object"
+        if values.map(type).eq(bool).all():
+            return "boolean"
+        n_unique = values.nunique()
+        if n_unique <= self.max_categories and n_unique <= self.category_ratio * len(values):
+            return "category"
+        return "object"
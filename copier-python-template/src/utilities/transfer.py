@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""Module with concurrent and resumable transfer of datasets files"""
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import threading
+from tempfile import TemporaryDirectory
+from typing import Callable, Dict, Iterable, List, Union
+
+from clearml import StorageManager
+from tqdm import tqdm
+
+from common.constants import CHECKSUMS_FILE_NAME, OBJECTS_FOLDER_NAME
+from common.exceptions import DatasetDownloadError, DatasetUploadError
+from utilities.cache import get_file_hash
+
+LOGGER = logging.getLogger(__name__)
+
+LOCAL_SCHEME = "file://"
+
+
+def join_url(*parts: str) -> str:
+    """Joins parts of remote url with slashes.
+
+    Returns:
+        str: Remote url.
+    """
+
+    return "/".join(part.strip("/") if i else part.rstrip("/") for i, part in enumerate(parts))
+
+
+def get_objects_prefix(remote_prefix: str) -> str:
+    """Returns remote folder of content-addressed files of all versions of dataset,
+    it's next to folder of version.
+
+    Args:
+        remote_prefix (str): Remote url of dataset version folder.
+
+    Returns:
+        str: Remote url of objects folder.
+    """
+
+    return join_url(remote_prefix.rstrip("/").rsplit("/", 1)[0], OBJECTS_FOLDER_NAME)
+
+
+class BaseStorageBackend(ABC):
+    r"""Abstract storage of datasets files addressed by remote urls."""
+
+    @abstractmethod
+    def exists(self, remote_url: str) -> bool:
+        pass
+
+    @abstractmethod
+    def download_file(self, remote_url: str, local_path: Path) -> None:
+        pass
+
+    @abstractmethod
+    def upload_file(self, local_path: Path, remote_url: str) -> None:
+        pass
+
+
+class LocalStorageBackend(BaseStorageBackend):
+    r"""File-backed stand-in of remote storage, remote urls are local paths
+    with or without file:// scheme."""
+
+    @staticmethod
+    def _get_path(remote_url: str) -> Path:
+        return Path(remote_url[len(LOCAL_SCHEME):] if remote_url.startswith(LOCAL_SCHEME) else remote_url)
+
+    def exists(self, remote_url: str) -> bool:
+        return self._get_path(remote_url).is_file()
+
+    def download_file(self, remote_url: str, local_path: Path) -> None:
+        shutil.copyfile(self._get_path(remote_url), local_path)
+
+    def upload_file(self, local_path: Path, remote_url: str) -> None:
+        path = self._get_path(remote_url)
+        path.parent.mkdir(exist_ok=True, parents=True)
+        # File appears only when it's complete, so interrupted upload doesn't leave existing object
+        partial_path = path.with_name(f".{path.name}.{threading.get_ident()}.part")
+        shutil.copyfile(local_path, partial_path)
+        os.replace(partial_path, path)
+
+
+class ClearmlStorageBackend(BaseStorageBackend):
+    r"""Remote storage accessed by ClearML StorageManager, e.g. s3, gs, azure or http."""
+
+    def exists(self, remote_url: str) -> bool:
+        return StorageManager.exists_file(remote_url)
+
+    def download_file(self, remote_url: str, local_path: Path) -> None:
+        cached_path = StorageManager.get_local_copy(remote_url, extract_archive=False, force_download=True)
+        if cached_path is None:
+            raise DatasetDownloadError(f"{remote_url} is not downloaded")
+        shutil.copyfile(cached_path, local_path)
+
+    def upload_file(self, local_path: Path, remote_url: str) -> None:
+        StorageManager.upload_file(local_file=str(local_path), remote_url=remote_url, wait_for_upload=True)
+
+
+def get_storage_backend(remote_url: str) -> BaseStorageBackend:
+    """Returns storage backend according to scheme of remote url.
+
+    Args:
+        remote_url (str): Remote url, urls without scheme are treated as local paths.
+
+    Returns:
+        BaseStorageBackend: Storage backend.
+    """
+
+    if remote_url.startswith(LOCAL_SCHEME) or "://" not in remote_url:
+        return LocalStorageBackend()
+    return ClearmlStorageBackend()
+
+
+class DatasetTransfer:
+    def __init__(
+        self,
+        backend: BaseStorageBackend,
+        max_workers: int = 8,
+        retries: int = 3,
+    ):
+        r"""Transfers files of dataset folder concurrently.
+        Files are stored once by their sha256 hashes in objects folder shared by all versions
+        of dataset, and every version lists its files in checksums file of its own folder.
+        So stored files are never overwritten, files which are already stored by previous versions
+        or interrupted transfers aren't uploaded again and downloaded files are verified.
+
+        Args:
+            backend (BaseStorageBackend): Storage backend.
+            max_workers (int, optional): Number of concurrently transferred files. Defaults to 8.
+            retries (int, optional): Number of attempts to transfer one file. Defaults to 3.
+        """
+
+        self.backend = backend
+        self.max_workers = max_workers
+        self.retries = retries
+
+    def _map(self, func: Callable[[str], None], files: Iterable[str], description: str) -> None:
+        r"""Applies func to every file in thread pool.
+        The first exception is raised after all submitted files are finished."""
+        exception = None
+        with ThreadPoolExecutor(max_workers=max(self.max_workers, 1)) as executor:
+            futures = [executor.submit(func, file) for file in files]
+            for future in tqdm(as_completed(futures), total=len(futures), desc=description):
+                try:
+                    future.result()
+                except Exception as error:
+                    exception = exception or error
+        if exception is not None:
+            raise exception
+
+    def read_checksums(self, remote_prefix: str) -> Dict[str, str]:
+        """Returns checksums of files of remote dataset folder.
+
+        Args:
+            remote_prefix (str): Remote url of dataset folder.
+
+        Returns:
+            Dict[str, str]: Relative paths of files mapped to their sha256 hashes.
+        """
+
+        remote_url = join_url(remote_prefix, CHECKSUMS_FILE_NAME)
+        if not self.backend.exists(remote_url):
+            return {}
+        with TemporaryDirectory() as directory:
+            local_path = Path(os.path.join(directory, CHECKSUMS_FILE_NAME))
+            self.backend.download_file(remote_url, local_path)
+            with open(local_path) as file:
+                return json.load(file)
+
+    def _write_checksums(self, remote_prefix: str, checksums: Dict[str, str]) -> None:
+        with TemporaryDirectory() as directory:
+            local_path = Path(os.path.join(directory, CHECKSUMS_FILE_NAME))
+            with open(local_path, "w") as file:
+                json.dump(checksums, file, indent=2, sort_keys=True)
+            self.backend.upload_file(local_path, join_url(remote_prefix, CHECKSUMS_FILE_NAME))
+
+    def _download_file(self, remote_url: str, local_path: Path, checksum: str) -> None:
+        local_path.parent.mkdir(exist_ok=True, parents=True)
+        partial_path = local_path.with_name(f".{local_path.name}.part")
+        for attempt in range(1, self.retries + 1):
+            try:
+                self.backend.download_file(remote_url, partial_path)
+                if get_file_hash(partial_path) == checksum:
+                    os.replace(partial_path, local_path)
+                    return
+                LOGGER.warning(f"Checksum of {remote_url} mismatched, attempt {attempt}/{self.retries}")
+            except Exception as exception:
+                LOGGER.warning(f"Downloading of {remote_url} failed due to: {exception}, "
+                               f"attempt {attempt}/{self.retries}")
+        partial_path.unlink(missing_ok=True)
+        raise DatasetDownloadError(f"{remote_url} is not downloaded after {self.retries} attempts")
+
+    def _upload_file(self, local_path: Path, remote_url: str) -> bool:
+        for attempt in range(1, self.retries + 1):
+            try:
+                if self.backend.exists(remote_url):
+                    return False
+                self.backend.upload_file(local_path, remote_url)
+                return True
+            except Exception as exception:
+                LOGGER.warning(f"Uploading of {local_path} failed due to: {exception}, "
+                               f"attempt {attempt}/{self.retries}")
+        raise DatasetUploadError(f"{local_path} is not uploaded after {self.retries} attempts")
+
+    def download(self, remote_prefix: str, local_folder: Union[str, Path]) -> List[Path]:
+        """Downloads files of remote dataset version which are missing locally
+        or which local checksums differ.
+
+        Args:
+            remote_prefix (str): Remote url of dataset version folder.
+            local_folder (Union[str, Path]): Local dataset folder.
+
+        Raises:
+            DatasetDownloadError: In case of file is not downloaded or its checksum mismatched
+                after all retries.
+
+        Returns:
+            List[Path]: Paths to local copies of all files of remote dataset version.
+        """
+
+        local_folder = Path(local_folder)
+        checksums = self.read_checksums(remote_prefix)
+        if not checksums:
+            raise DatasetDownloadError(f"Checksums of {remote_prefix} are not found")
+        objects_prefix = get_objects_prefix(remote_prefix)
+        pending = [
+            file for file, checksum in checksums.items()
+            if not (local_folder / file).is_file() or get_file_hash(local_folder / file) != checksum
+        ]
+        LOGGER.debug(f"{len(checksums) - len(pending)} of {len(checksums)} files are already downloaded")
+        self._map(
+            lambda file: self._download_file(
+                join_url(objects_prefix, checksums[file]), local_folder / file, checksums[file]
+            ),
+            pending,
+            description="download",
+        )
+        return [local_folder / file for file in checksums]
+
+    def upload(self, local_folder: Union[str, Path], remote_prefix: str) -> Dict[str, str]:
+        """Uploads files of local dataset folder which aren't stored yet and lists them
+        in checksums file of dataset version.
+
+        Checksums file is written only when all files are stored, so version is either complete
+        or missing. Files stored before failure aren't uploaded again by the next call.
+
+        Args:
+            local_folder (Union[str, Path]): Local dataset folder.
+            remote_prefix (str): Remote url of dataset version folder.
+
+        Raises:
+            DatasetUploadError: In case of file is not uploaded after all retries.
+
+        Returns:
+            Dict[str, str]: Relative paths of files of version mapped to their sha256 hashes.
+        """
+
+        local_folder = Path(local_folder)
+        checksums = {
+            path.relative_to(local_folder).as_posix(): get_file_hash(path)
+            for path in sorted(local_folder.rglob("*"))
+            if path.is_file() and path.name != CHECKSUMS_FILE_NAME
+        }
+        objects_prefix = get_objects_prefix(remote_prefix)
+        # Files with the same content are stored once
+        files = {checksum: file for file, checksum in checksums.items()}
+        uploaded: List[str] = []
+
+        def upload_file(checksum: str) -> None:
+            if self._upload_file(local_folder / files[checksum], join_url(objects_prefix, checksum)):
+                uploaded.append(files[checksum])
+
+        self._map(upload_file, list(files), description="upload")
+        LOGGER.debug(f"{len(files) - len(uploaded)} of {len(files)} files are already stored")
+        self._write_checksums(remote_prefix, checksums)
+        return checksums
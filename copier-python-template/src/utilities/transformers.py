@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 r"""Main transformers"""
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from bottleneck import move_max, move_mean, move_median, move_min, move_std, move_sum
 import numpy as np
 from numpy.fft import irfft, rfft, rfftfreq
 import pandas as pd
@@ -12,15 +13,72 @@ import pywt
 from sklearn.pipeline import Pipeline
 
 from common.config import ACCEPTED_BOUNDARIES, FILLNA_CONFIG
-from common.constants import SECONDS_IN_HOUR, SECONDS_IN_MINUTE
+from common.constants import SECONDS_IN_MINUTE
 from core import BaseTransformer
+from utilities.aggregations import aggregate
+from utilities.quantiles import move_quantile
+from utilities.resampling import get_bins, resample, to_nanoseconds
+from utilities.schema import DataSchema
 from utilities.utils import get_subclasses, convert_columns_type, get_common_timestep
 
 LOGGER = logging.getLogger(__name__)
 
 
+def get_window_aggregation(
+    data: Union[pd.Series, pd.DataFrame],
+    window_type: str = "expanding",
+    **kwargs
+):
+    """Returns rolling or expanding window of input data.
+
+    Args:
+        data (Union[pd.Series, pd.DataFrame]): Input data.
+        window_type (str, optional): 'rolling' or 'expanding'. Defaults to "expanding".
+
+    Raises:
+        AttributeError: Raised when window_type is not supported.
+    """
+
+    if window_type == "rolling":
+        rolling_param_names = [
+            "window",
+            "min_periods",
+            "center",
+            "win_type",
+            "axis",
+            "closed",
+        ]
+        rolling_kwargs = {
+            param: value
+            for param, value in kwargs.items()
+            if param in rolling_param_names
+        }
+        return data.rolling(**rolling_kwargs)
+    elif window_type == "expanding":
+        expanding_param_names = ["min_periods", "center", "axis"]
+        expanding_kwargs = {
+            param: value
+            for param, value in kwargs.items()
+            if param in expanding_param_names
+        }
+        return data.expanding(**expanding_kwargs)
+    else:
+        message = (
+            f"{window_type} is not supported, please use 'rolling' or 'expanding'"
+        )
+        LOGGER.error(message)
+        raise AttributeError(message)
+
+
 class DuplicatedColumnsTransformer(BaseTransformer):
     """Drops duplicated columns and leaves the most filled."""
+    def __init__(self, copy: bool = True):
+        """
+        Args:
+            copy (bool, optional): Whether to copy input data. Defaults to True.
+        """
+        self.copy = copy
+    
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         X = self._drop_duplicated_columns(X)
         return X
@@ -35,7 +93,7 @@ class DuplicatedColumnsTransformer(BaseTransformer):
             pd.DataFrame: Input dataframe without duplicated columns and empty columns.
         """
 
-        ldf = data.copy()
+        ldf = data.copy() if self.copy else data
         duplicated_columns = pd.Series(ldf.columns).value_counts()[
             pd.Series(ldf.columns).value_counts() > 1
         ]
@@ -47,14 +105,32 @@ class DuplicatedColumnsTransformer(BaseTransformer):
     
     
 class ColumnsTypeTransformer(BaseTransformer):
-    r"""Transformer for converting column values type according to config."""
+    r"""Transformer for converting column values type according to schema or config."""
+    def __init__(self, copy: bool = True, schema: Optional[DataSchema] = None):
+        """
+        Args:
+            copy (bool, optional): Whether to copy input data. Defaults to True.
+            schema (Optional[DataSchema], optional): Schema of dataset. Defaults to None
+                which means dtypes of ALL_TYPES only.
+        """
+        self.copy = copy
+        self.schema = schema
+    
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
-        X = convert_columns_type(X)
+        X = convert_columns_type(X, copy=self.copy, schema=self.schema)
         return X
     
     
 class ClipTransformer(BaseTransformer):
     """Transformer for removing data outliers with min and max accepted values"""
+    def __init__(self, copy: bool = True):
+        """
+        Args:
+            copy (bool, optional): Whether to copy input data. Clipped columns are 
+                replaced, so copy is shallow. Defaults to True.
+        """
+        self.copy = copy
+    
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """Removes data outliers according to config.
 
@@ -64,6 +140,8 @@ class ClipTransformer(BaseTransformer):
         Returns:
             pd.DataFrame: Input data with clipped values exceeding the boundaries.
         """
+        if self.copy:
+            X = X.copy(deep=False)
         X = self._outlier_correction(X, boundaries=ACCEPTED_BOUNDARIES)
         LOGGER.debug(
             f"ClipTransformer removes outliers, results shape is {X.shape}"
@@ -91,6 +169,14 @@ class ClipTransformer(BaseTransformer):
 
 class InfValuesTransformer(BaseTransformer):
     """Transformer for replacing infinite values with nans."""
+    def __init__(self, copy: bool = True):
+        """
+        Args:
+            copy (bool, optional): Whether to copy input data. Only columns with infinite
+                values are replaced, so copy is shallow. Defaults to True.
+        """
+        self.copy = copy
+    
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """Replaces infinite values with nans.
 
@@ -101,15 +187,37 @@ class InfValuesTransformer(BaseTransformer):
             pd.DataFrame: Input data without infinite values.
         """
 
-        LOGGER.debug(f"ReplaceInfValues found {np.isinf(X.select_dtypes(exclude='category')).values.sum()} "
-                     "infinite values")
-        
-        X = X.replace([np.inf, -np.inf], np.nan)
+        if self.copy:
+            X = X.copy(deep=False)
+        n_infinite = 0
+        for position in np.flatnonzero(X.dtypes.map(pd.api.types.is_float_dtype).to_numpy()):
+            values = X.iloc[:, position].to_numpy()
+            is_infinite = np.isinf(values)
+            if is_infinite.any():
+                n_infinite += int(is_infinite.sum())
+                X.isetitem(position, np.where(is_infinite, np.nan, values))
+        LOGGER.debug(f"ReplaceInfValues found {n_infinite} infinite values")
         return X
     
     
 class FillNanTransformer(BaseTransformer):
     """Transformer for replacing missing values with values according to config."""
+
+    def __init__(self, keep_state: bool = False, copy: bool = True):
+        """
+        Args:
+            keep_state (bool, optional): Whether to carry last valid values across
+                consecutive calls of transform, so forward filling limits don't reset
+                at chunk boundaries. Defaults to False.
+            copy (bool, optional): Whether to copy input data. Filled columns are 
+                replaced, so copy is shallow. Defaults to True.
+        """
+        self.keep_state = keep_state
+        self.copy = copy
+
+    def reset_state(self) -> None:
+        self.state_: Dict[str, Tuple[Any, int]] = {}
+
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """Replaces missing values with values according to config.
 
@@ -120,50 +228,310 @@ class FillNanTransformer(BaseTransformer):
             pd.DataFrame: Input data without missing values.
         """
 
-        LOGGER.debug(f"FillNanTransformer found {X.isna().sum().sum()} NaN values")
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"FillNanTransformer found {X.isna().sum().sum()} NaN values")
+        if self.copy:
+            X = X.copy(deep=False)
         X = self._fill_missing_values(X, config=FILLNA_CONFIG)
         return X
     
-    def _fill_missing_values(self, data: pd.DataFrame, config: Dict[str, Dict[str, float]]) -> pd.DataFrame:
+    def _fill_missing_values(
+        self, 
+        data: pd.DataFrame, 
+        config: Dict[str, Dict[str, float]], 
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
         """Replaces missing values with values according to config.
 
         Args:
             data (pd.DataFrame): Input data.
             config (Dict[str, Dict[str, float]]): Config with fillna method
                 parameters for specified columns.
+            columns (Optional[List[str]], optional): Columns to fill. Defaults to None
+                which means all columns.
 
         Returns:
             pd.DataFrame: Input data without missing values.
         """
 
+        columns = data.columns if columns is None else columns
         specified_features = list(
-            np.intersect1d(data.columns, list(config.keys()))
+            np.intersect1d(columns, list(config.keys()))
             )
         nonspecified_features = list(
-            np.setdiff1d(data.columns, list(config.keys()))
+            np.setdiff1d(columns, list(config.keys()))
             )
 
         for column in specified_features:
             if column in data.columns:
-                data[column] = data[column].fillna(
-                    value=config[column]["value"],
-                    method=config[column]["method"],
-                    limit=config[column]["limit"],
-                )
+                if config[column]["method"] in ("ffill", "pad"):
+                    data[column] = self._ffill(data[column], limit=config[column]["limit"])
+                else:
+                    data[column] = data[column].fillna(
+                        value=config[column]["value"],
+                        method=config[column]["method"],
+                        limit=config[column]["limit"],
+                    )
         for column in nonspecified_features:
-            data[column] = data[column].ffill(limit=SECONDS_IN_MINUTE*10)
+            data[column] = self._ffill(data[column], limit=SECONDS_IN_MINUTE*10)
             
         return data
 
+    def _ffill(self, series: pd.Series, limit: Optional[int]) -> pd.Series:
+        """Propagates last valid observation forward. In case of keep_state
+        leading missing values are filled with last valid value of previous chunk.
+
+        Args:
+            series (pd.Series): Input series.
+            limit (Optional[int]): Maximum number of consecutive missing values to fill.
+
+        Returns:
+            pd.Series: Forward filled series.
+        """
+
+        output = series.ffill(limit=limit)
+        if not self.keep_state or series.empty:
+            return output
+        if not hasattr(self, "state_"):
+            self.reset_state()
+
+        last_value, gap = self.state_.get(series.name, (np.nan, 0))
+        is_valid = series.notna().to_numpy()
+        n_leading = int(np.argmax(is_valid)) if is_valid.any() else len(series)
+        if n_leading and not pd.isna(last_value):
+            n_fill = n_leading if limit is None else max(min(n_leading, limit - gap), 0)
+            if n_fill:
+                output.iloc[:n_fill] = last_value
+
+        if is_valid.any():
+            last_position = len(series) - 1 - int(np.argmax(is_valid[::-1]))
+            last_value, gap = series.iloc[last_position], len(series) - 1 - last_position
+        else:
+            gap += len(series)
+        self.state_[series.name] = (last_value, gap)
+        return output
+
+
+class CleaningTransformer(FillNanTransformer):
+    r"""Transformer for clipping outliers, replacing infinite values with nans and filling missing
+    values of float columns block by block instead of column by column. It's equivalent to 
+    ClipTransformer, InfValuesTransformer and FillNanTransformer applied one after another."""
+
+    def __init__(self, keep_state: bool = False, copy: bool = True, batch_size: int = 128):
+        """
+        Args:
+            keep_state (bool, optional): Whether to carry last valid values across
+                consecutive calls of transform, so forward filling limits don't reset
+                at chunk boundaries. Defaults to False.
+            copy (bool, optional): Whether to copy input data. Cleaned float columns are 
+                always new arrays, so it's kept for compatibility with other transformers. 
+                Defaults to True.
+            batch_size (int, optional): Number of float columns cleaned at once, it bounds
+                memory of kernel temporaries. Defaults to 128.
+        """
+        super().__init__(keep_state=keep_state, copy=copy)
+        self.batch_size = batch_size
+
+    def _get_parameters(self, columns: pd.Index) -> Dict[str, Any]:
+        r"""Compiles ACCEPTED_BOUNDARIES and FILLNA_CONFIG into arrays of per-column parameters.
+        Forward filling limit -1 means column isn't forward filled, columns with fillna methods
+        other than forward filling are returned as fallback columns for pandas."""
+        if not hasattr(self, "parameters_"):
+            self.parameters_: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        key = tuple(columns)
+        if key in self.parameters_:
+            return self.parameters_[key]
+
+        lower = np.full(len(columns), -np.inf)
+        upper = np.full(len(columns), np.inf)
+        limits = np.full(len(columns), float(SECONDS_IN_MINUTE * 10))
+        values = np.full(len(columns), np.nan)
+        fallback_columns = []
+        for position, column in enumerate(columns):
+            if column in ACCEPTED_BOUNDARIES:
+                lower[position] = ACCEPTED_BOUNDARIES[column]["min"]
+                upper[position] = ACCEPTED_BOUNDARIES[column]["max"]
+            if column not in FILLNA_CONFIG:
+                continue
+            config = FILLNA_CONFIG[column]
+            if config["method"] in ("ffill", "pad"):
+                limits[position] = np.inf if config["limit"] is None else config["limit"]
+            elif config["method"] is None and config["limit"] is None and config["value"] is not None:
+                limits[position] = -1
+                values[position] = config["value"]
+            else:
+                limits[position] = -1
+                fallback_columns.append(column)
+
+        self.parameters_[key] = {
+            "bounded": np.flatnonzero(np.isfinite(lower) | np.isfinite(upper)),
+            "lower": lower,
+            "upper": upper,
+            "limits": limits,
+            "values": values,
+            "fallback_columns": fallback_columns,
+        }
+        return self.parameters_[key]
+
+    def _clean_block(self, block: np.ndarray, columns: pd.Index) -> List[str]:
+        """Cleans 2D block of float columns in place.
+
+        Args:
+            block (np.ndarray): C-contiguous block of shape (columns, rows).
+            columns (pd.Index): Names of block columns.
+
+        Returns:
+            List[str]: Columns which should be filled by pandas.
+        """
+
+        parameters = self._get_parameters(columns)
+        limits = parameters["limits"]
+        if len(parameters["bounded"]):
+            bounded = parameters["bounded"]
+            block[bounded] = np.clip(
+                block[bounded], parameters["lower"][bounded, None], parameters["upper"][bounded, None]
+            )
+        np.copyto(block, np.nan, where=np.isinf(block))
+
+        n_rows = block.shape[1]
+        if self.keep_state and n_rows:
+            is_missing = np.isnan(block)
+            has_valid = ~is_missing.all(axis=1)
+            leading = np.where(has_valid, is_missing.argmin(axis=1), n_rows)
+            last_positions = np.where(has_valid, n_rows - 1 - is_missing[:, ::-1].argmin(axis=1), -1)
+            del is_missing
+
+        # Forward filling of 2D block is a single compiled pass for all columns with the same limit
+        for limit in np.unique(limits[limits >= 0]):
+            positions = np.flatnonzero(limits == limit)
+            selected = block if len(positions) == len(block) else block[positions]
+            filled = pd.DataFrame(selected.T, copy=False)
+            filled.ffill(limit=None if np.isinf(limit) else int(limit), inplace=True)
+            filled = filled.to_numpy().T
+            if selected is not block or not np.shares_memory(filled, block):
+                block[positions] = filled
+
+        if self.keep_state and n_rows:
+            self._carry_state(block, columns, leading, last_positions, limits)
+        for position in np.flatnonzero(~np.isnan(parameters["values"])):
+            values = block[position]
+            values[np.isnan(values)] = parameters["values"][position]
+        return parameters["fallback_columns"]
+
+    def _carry_state(
+        self,
+        block: np.ndarray,
+        columns: pd.Index,
+        leading: np.ndarray,
+        last_positions: np.ndarray,
+        limits: np.ndarray,
+    ) -> None:
+        r"""Fills leading missing values with last valid values of previous chunk
+        and stores last valid values of current chunk."""
+        n_rows = block.shape[1]
+        last_values, gaps = map(np.array, zip(*(
+            self.state_.get(column, (np.nan, 0)) for column in columns
+        )))
+        last_values = last_values.astype(block.dtype)
+        n_carried = np.minimum(leading, np.clip(limits - gaps, 0, n_rows)).astype(np.int64)
+        for position in np.flatnonzero((n_carried > 0) & ~np.isnan(last_values)):
+            block[position, :n_carried[position]] = last_values[position]
+
+        has_valid = last_positions >= 0
+        last_values = np.where(has_valid, block[np.arange(len(block)), np.maximum(last_positions, 0)], last_values)
+        gaps = np.where(has_valid, n_rows - 1 - last_positions, gaps + n_rows)
+        for position, column in enumerate(columns):
+            if limits[position] >= 0:
+                self.state_[column] = (last_values[position], int(gaps[position]))
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Clips outliers, replaces infinite values and fills missing values according to config.
+
+        Args:
+            X (pd.DataFrame): Input data.
+
+        Returns:
+            pd.DataFrame: Cleaned input data.
+        """
+
+        if self.keep_state and not hasattr(self, "state_"):
+            self.reset_state()
+
+        dtypes = list(X.dtypes)
+        is_float = np.array([isinstance(dtype, np.dtype) and dtype.kind == "f" for dtype in dtypes], dtype=bool)
+        # Frame is split into runs of adjacent columns, runs of float columns of one dtype are
+        # cleaned as blocks and all runs are concatenated back in original order
+        pieces, fallback_columns = [], []
+        start = 0
+        while start < len(dtypes):
+            stop = start + 1
+            while stop < len(dtypes) and is_float[stop] == is_float[start] and (
+                not is_float[start] or (dtypes[stop] == dtypes[start] and stop - start < self.batch_size)
+            ):
+                stop += 1
+            if is_float[start]:
+                # Columns are contiguous in any block layout, so stacking them is a plain copy
+                block = np.stack([X.iloc[:, position].to_numpy() for position in range(start, stop)])
+                columns = X.columns[start:stop]
+                fallback_columns.extend(self._clean_block(block, columns))
+                pieces.append(pd.DataFrame(block.T, index=X.index, columns=columns, copy=False))
+            else:
+                pieces.append(X.iloc[:, start:stop])
+            start = stop
+        if pieces:
+            X = pd.concat(pieces, axis=1, copy=False)
+
+        other_columns = X.columns[~is_float]
+        for column in other_columns.intersection(list(ACCEPTED_BOUNDARIES)):
+            X[column] = X[column].clip(
+                lower=ACCEPTED_BOUNDARIES[column]["min"], upper=ACCEPTED_BOUNDARIES[column]["max"]
+            )
+        return self._fill_missing_values(
+            X, 
+            config=FILLNA_CONFIG, 
+            columns=list(other_columns) + fallback_columns,
+        )
+
 
 class TimeResampler(BaseTransformer):
-    """Transformer for resampling data to regular time step."""
+    """Transformer for resampling numeric columns to regular time step."""
 
-    def __init__(self, time_step: Optional[int] = None):
+    def __init__(
+        self, 
+        time_step: Optional[int] = None, 
+        keep_state: bool = False, 
+        copy: bool = True,
+        batch_size: int = 16,
+        aggregations: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            time_step (Optional[int], optional): Time step in seconds. Defaults to None
+                which means the common time step of input data.
+            keep_state (bool, optional): Whether to carry rows of the last incomplete bin
+                and origin of bins across consecutive calls of transform, so resample bins
+                don't reset at chunk boundaries. Remaining rows are returned by flush.
+                Defaults to False.
+            copy (bool, optional): Whether to copy input data. Input data is never modified,
+                so it's kept for compatibility with other transformers. Defaults to True.
+            batch_size (int, optional): Number of columns resampled at once, it bounds
+                memory of aggregation temporaries. Defaults to 16.
+            aggregations (Optional[Dict[str, str]], optional): Aggregations of columns, one of
+                'mean', 'last' or 'max'. Defaults to None which means RESAMPLING_CONFIG.
+        """
         self.time_step = time_step
+        self.keep_state = keep_state
+        self.copy = copy
+        self.batch_size = batch_size
+        self.aggregations = aggregations
+
+    def reset_state(self) -> None:
+        self.time_step_: Optional[int] = None
+        self.origin_: Optional[pd.Timestamp] = None
+        self.tail_: Optional[pd.DataFrame] = None
 
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
-        """Resamples data to regular time step.
+        """Resamples numeric columns to regular time step, other columns are dropped.
 
         Args:
             X (pd.DataFrame): Input data.
@@ -172,12 +540,57 @@ class TimeResampler(BaseTransformer):
             pd.DataFrame: Input data with regular time step.
         """
         
-        if not self.time_step:
-            time_step = get_common_timestep(X)
-        else:
-            time_step = self.time_step
+        if not self.keep_state:
+            return self._resample(X, self.time_step or get_common_timestep(X), origin="start_day")
+
+        if not hasattr(self, "tail_"):
+            self.reset_state()
+        if self.tail_ is not None:
+            X = pd.concat([self.tail_, X], ignore_index=True)
+        if not self.time_step_:
+            self.time_step_ = self.time_step or get_common_timestep(X)
+        if X.empty or not self.time_step_:
+            # Time step can't be inferred from one timestamp, so rows wait for the next chunk
+            self.tail_ = X
+            return self._resample(X.iloc[:0], self.time_step_)
+        if self.origin_ is None:
+            # Bins start at midnight of the first timestamp like without keep_state
+            self.origin_ = X["datetime"].min().normalize()
+
+        # Rows of the last bin can be continued in the next chunk
+        bins = get_bins(to_nanoseconds(X["datetime"]), self.time_step_, self.origin_)
+        is_last_bin = bins == bins[-1]
+        self.tail_ = X[is_last_bin]
+        return self._resample(X[~is_last_bin], self.time_step_, self.origin_)
+
+    def flush(self) -> pd.DataFrame:
+        """Returns resampled rows of the last bin which were kept by transform.
 
-        return X.resample(f"{time_step}s", on="datetime").mean().reset_index()
+        Returns:
+            pd.DataFrame: Resampled rows of the last bin.
+        """
+        if getattr(self, "tail_", None) is None:
+            return pd.DataFrame()
+        output = self._resample(self.tail_, self.time_step_, self.origin_)
+        self.reset_state()
+        return output
+
+    def _resample(
+        self, 
+        data: pd.DataFrame, 
+        time_step: Optional[int], 
+        origin: Union[str, pd.Timestamp, None] = "start_day",
+    ) -> pd.DataFrame:
+        r"""Resamples data with the resampling engine. Chunks are resampled with origin kept 
+        in state to have identical bins for all chunks. Rows of data without time step have 
+        one timestamp, so they are resampled to one bin with any time step."""
+        return resample(
+            data, 
+            time_step=time_step or 1, 
+            aggregations=self.aggregations, 
+            origin="start_day" if origin is None else origin, 
+            batch_size=self.batch_size,
+        )
     
     
 class OutlierImputer(BaseTransformer):
@@ -264,63 +677,7 @@ class Aggregator(BaseTransformer):
         window_type: str = "expanding",
         **kwargs
     ):
-
-        if window_type == "rolling":
-            rolling_param_names = [
-                "window",
-                "min_periods",
-                "center",
-                "win_type",
-                "axis",
-                "closed",
-            ]
-            rolling_kwargs = {
-                param: value
-                for param, value in kwargs.items()
-                if param in rolling_param_names
-            }
-            return series.rolling(**rolling_kwargs)
-        elif window_type == "expanding":
-            expanding_param_names = ["min_periods", "center", "axis"]
-            expanding_kwargs = {
-                param: value
-                for param, value in kwargs.items()
-                if param in expanding_param_names
-            }
-            return series.expanding(**expanding_kwargs)
-        else:
-            message = (
-                f"{window_type} is not supported, please use 'rolling' or 'expanding'"
-            )
-            LOGGER.error(message)
-            raise AttributeError(message)
-
-    def _get_bottleneck_agg(
-        self,
-        series: pd.Series,
-        window: int,
-        min_periods: int,
-        agg_func: Union[str, Callable[[Any], Any]],
-        **kwargs,
-    ) -> pd.Series:
-        
-        aggregations_dict = {
-            "sum": move_sum,
-            "mean": move_mean,
-            "median": move_median,
-            "min": move_min,
-            "max": move_max,
-            "std": move_std,
-        }
-        output = pd.Series(
-            aggregations_dict[agg_func](
-                series,
-                window=window,
-                min_count=min_periods,
-                **kwargs,
-            )
-        )
-        return output
+        return get_window_aggregation(series, window_type=window_type, **kwargs)
 
     def _get_pandas_agg(
         self,
@@ -344,7 +701,8 @@ class Aggregator(BaseTransformer):
         
     def transform(self, X: pd.DataFrame) -> pd.Series:
         """Returns series of required aggregation of input parameter.
-        If input series has more than 7200 points, aggregation is calculated with bottleneck.
+        Aggregations without extra window parameters are calculated with the cheapest backend
+        of `utilities.aggregations` by calibrated cost, others with pandas. Quantiles without extra window parameters are calculated with `move_quantile`.
 
         Args:
             X (pd.DataFrame): Input dataframe.
@@ -366,24 +724,37 @@ class Aggregator(BaseTransformer):
             mask = len(X) * [True]
             
         window_type = "expanding" if self.window is None else "rolling"
-        if self.agg_func is not None:
-            if len(X.loc[mask, self.feature_source]) > SECONDS_IN_HOUR * 2:
-                output = self._get_bottleneck_agg(
-                    series=X.loc[mask, self.feature_source],
-                    window=self.window,
-                    min_periods=self.min_periods,
+        if self.agg_func is not None and not self.kwargs:
+            series = X.loc[mask, self.feature_source]
+            output = pd.Series(
+                aggregate(
+                    series.to_numpy(dtype=np.float64, na_value=np.nan),
                     agg_func=self.agg_func,
-                    **self.kwargs,
-                )
-            else:
-                output = self._get_pandas_agg(
-                    series=X.loc[mask, self.feature_source],
                     window=self.window,
                     min_periods=self.min_periods,
-                    agg_func=self.agg_func,
-                    window_type=window_type,
-                    **self.kwargs,
-                )
+                ),
+                index=series.index,
+            )
+        elif self.agg_func is not None:
+            output = self._get_pandas_agg(
+                series=X.loc[mask, self.feature_source],
+                window=self.window,
+                min_periods=self.min_periods,
+                agg_func=self.agg_func,
+                window_type=window_type,
+                **self.kwargs,
+            )
+        elif self.quantile is not None and not self.kwargs:
+            series = X.loc[mask, self.feature_source]
+            output = pd.Series(
+                move_quantile(
+                    series.to_numpy(dtype=np.float64, na_value=np.nan),
+                    quantile=self.quantile,
+                    window=self.window,
+                    min_count=self.min_periods,
+                ),
+                index=series.index,
+            )
         elif self.quantile is not None:
             rolling = self._get_aggregation(
                 series=X.loc[mask, self.feature_source],
@@ -404,6 +775,141 @@ class Aggregator(BaseTransformer):
         X[self.feature_name] = output.reindex(X.index).shift(self.shift_size)
         return X
     
+
+class MultiAggregator(BaseTransformer):
+    r"""Transformer for batched aggregation feature engineering"""
+
+    def __init__(self, aggregators: List[Aggregator]):
+        """
+        Args:
+            aggregators (List[Aggregator]): Specifications of aggregations. Aggregations with 
+                the same filter are computed on one masked frame, aggregations with the same 
+                filter, window and function are computed for all their sources in one pass.
+        """
+        self.aggregators = aggregators
+
+    def _group_aggregators(self) -> Dict[Tuple[Any, ...], Dict[Tuple[Any, ...], List[Aggregator]]]:
+        groups: Dict[Tuple[Any, ...], Dict[Tuple[Any, ...], List[Aggregator]]] = {}
+        for aggregator in self.aggregators:
+            if aggregator.agg_func is None and aggregator.quantile is None:
+                message = (
+                    f"It's required to provide at least agg_func or quantile in parameters\n"
+                    f"for {aggregator.feature_name}"
+                )
+                LOGGER.error(message)
+                raise AttributeError(message)
+            mask_key = (aggregator.filter_column, aggregator.filter_value)
+            window_key = (
+                aggregator.window,
+                aggregator.min_periods,
+                aggregator.agg_func,
+                aggregator.quantile,
+                tuple(sorted(aggregator.kwargs.items())),
+            )
+            groups.setdefault(mask_key, {}).setdefault(window_key, []).append(aggregator)
+        return groups
+
+    def _aggregate(
+        self,
+        data: pd.DataFrame,
+        window: Optional[int],
+        min_periods: Optional[int],
+        agg_func: Optional[Union[str, Callable[[Any], Any]]],
+        quantile: Optional[float],
+        **kwargs,
+    ) -> np.ndarray:
+        """Returns 2D array of the same aggregation of every column of input data."""
+
+        if quantile is None and not kwargs:
+            return aggregate(
+                data.to_numpy(dtype=np.float64, na_value=np.nan),
+                agg_func=agg_func,
+                window=window,
+                min_periods=min_periods,
+            )
+
+        if quantile is not None and not kwargs:
+            return move_quantile(
+                data.to_numpy(dtype=np.float64, na_value=np.nan),
+                quantile=quantile,
+                window=window,
+                min_count=min_periods,
+                axis=0,
+            )
+
+        window_type = "expanding" if window is None else "rolling"
+        rolling = get_window_aggregation(
+            data,
+            window=window,
+            min_periods=min_periods if min_periods is not None or window is not None else 1,
+            window_type=window_type,
+            **kwargs,
+        )
+        output = rolling.quantile(quantile) if quantile is not None else rolling.agg(agg_func)
+        return output.to_numpy()
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Returns input dataframe with all required aggregations.
+
+        Args:
+            X (pd.DataFrame): Input dataframe.
+            
+        Raises:
+            KeyError: Raised when feature_source column not in data columns.
+            AttributeError: Raised when agg_func nor quantile provided.
+
+        Returns:
+            pd.DataFrame: Input dataframe with aggregations.
+        """
+        
+        missing_sources = set(aggregator.feature_source for aggregator in self.aggregators) \
+            - set(X.columns)
+        if missing_sources:
+            raise KeyError(f"{missing_sources} are not in dataframe columns")
+
+        features = []
+        for (filter_column, filter_value), window_groups in self._group_aggregators().items():
+            mask = X[filter_column] == filter_value if filter_column else slice(None)
+            sources = list(dict.fromkeys(
+                aggregator.feature_source 
+                for aggregators in window_groups.values() 
+                for aggregator in aggregators
+            ))
+            masked = X.loc[mask, sources]
+
+            masked_features = {}
+            for (window, min_periods, agg_func, quantile, kwargs), aggregators in window_groups.items():
+                group_sources = list(dict.fromkeys(aggregator.feature_source for aggregator in aggregators))
+                values = self._aggregate(
+                    masked[group_sources],
+                    window=window,
+                    min_periods=min_periods,
+                    agg_func=agg_func,
+                    quantile=quantile,
+                    **dict(kwargs),
+                )
+                for aggregator in aggregators:
+                    masked_features[aggregator.feature_name] = \
+                        values[:, group_sources.index(aggregator.feature_source)]
+
+            output = pd.DataFrame(masked_features, index=masked.index).reindex(X.index)
+            shifts: Dict[int, List[str]] = {}
+            for aggregators in window_groups.values():
+                for aggregator in aggregators:
+                    shifts.setdefault(aggregator.shift_size or 0, []).append(aggregator.feature_name)
+            for shift_size, feature_names in shifts.items():
+                if shift_size:
+                    output[feature_names] = output[feature_names].shift(shift_size)
+            features.append(output)
+
+        if not features:
+            return X
+        features = pd.concat(features, axis="columns")
+        return pd.concat(
+            [X.drop(columns=features.columns, errors="ignore"), features], 
+            axis="columns",
+        )
+    
     
 class Converter(BaseTransformer):
     r"""Transformer for math operations with input series"""
@@ -459,29 +965,207 @@ class Converter(BaseTransformer):
         return X
  
 
+def fourier_denoise(values: np.ndarray, threshold: float, axis: int = 0) -> np.ndarray:
+    """Returns values with frequencies above threshold removed, all columns are
+    transformed by one `rfft` and one `irfft` along axis.
+
+    Args:
+        values (np.ndarray): 1D or 2D input array.
+        threshold (float): Maximum kept frequency.
+        axis (int, optional): Axis of signals. Defaults to 0.
+
+    Returns:
+        np.ndarray: Float32 denoised array with the same shape as input.
+    """
+
+    n_values = values.shape[axis]
+    fourier = rfft(values, axis=axis)
+    frequencies = rfftfreq(n_values, d=1e-5)
+    fourier[(slice(None),) * (axis % fourier.ndim) + (frequencies > threshold,)] = 0
+    return irfft(fourier, n=n_values, axis=axis).astype("float32")
+
+
+def wavelet_denoise(values: np.ndarray, wavelet: str = "db4", level: int = 1, axis: int = 0) -> np.ndarray:
+    """Returns values with hard thresholded detail coefficients, universal threshold is estimated
+    for every column from mean absolute deviation of detail coefficients of level.
+    All columns are decomposed by one `pywt.wavedec` along axis.
+
+    Args:
+        values (np.ndarray): 1D or 2D input array.
+        wavelet (str, optional): Wavelet family. Defaults to "db4".
+        level (int, optional): Level of coefficients which estimate noise. Defaults to 1.
+        axis (int, optional): Axis of signals. Defaults to 0.
+
+    Returns:
+        np.ndarray: Float32 denoised array with the same shape as input.
+    """
+
+    n_values = values.shape[axis]
+    coeff = pywt.wavedec(values, wavelet, mode="per", axis=axis)
+    noise = coeff[-level]
+    sigma = (1 / 0.6745) * np.mean(
+        np.absolute(noise - np.mean(noise, axis=axis, keepdims=True)), axis=axis, keepdims=True
+    )
+    u_threshold = sigma * np.sqrt(2 * np.log(n_values))
+    coeff[1:] = (
+        np.where(np.absolute(detail) < u_threshold, 0, detail) for detail in coeff[1:]
+    )
+    output = pywt.waverec(coeff, wavelet, mode="per", axis=axis)
+    # Periodized reconstruction of odd signal has one extra value
+    return np.take(output, np.arange(n_values), axis=axis).astype("float32")
+
+
+def get_lowpass_kernel(threshold: float, overlap: int) -> np.ndarray:
+    """Returns Hann windowed sinc kernel which approximates removal of frequencies
+    above threshold like `fourier_denoise`.
+
+    Args:
+        threshold (float): Maximum kept frequency.
+        overlap (int): Half width of kernel.
+
+    Returns:
+        np.ndarray: Symmetric kernel of 2 * overlap + 1 values.
+    """
+
+    cutoff = threshold * 1e-5
+    offsets = np.arange(-overlap, overlap + 1)
+    return 2 * cutoff * np.sinc(2 * cutoff * offsets) * np.hanning(2 * overlap + 1)
+
+
 class FourierTransformer(BaseTransformer):
     r"""Transformer for denoising input series with FFT approach"""
 
-    def __init__(self, threshold: float = 1e8, **kwargs):
+    def __init__(
+        self,
+        threshold: float = 1e8,
+        block_size: Optional[int] = None,
+        overlap: Optional[int] = None,
+        keep_state: bool = False,
+        **kwargs,
+    ):
+        """
+        Args:
+            threshold (float, optional): Maximum kept frequency. Defaults to 1e8.
+            block_size (Optional[int], optional): Number of output values of one FFT of overlap-save
+                filter. Defaults to None which means one FFT of the whole series without keep_state
+                and 65536 with it.
+            overlap (Optional[int], optional): Half width of kernel of overlap-save filter, longer kernel
+                is closer to FFT of the whole series. Defaults to None which means 16 periods of cutoff
+                frequency, but not more than 2 ** 20.
+            keep_state (bool, optional): Whether to carry the last values across consecutive calls
+                of transform, so chunks of one series are denoised like the whole series. Output lags
+                input by overlap values, the remaining values are returned by flush. Defaults to False.
+        """
 
         super().__init__(**kwargs)
         self.threshold = threshold
+        self.block_size = block_size
+        self.overlap = overlap
+        self.keep_state = keep_state
+
+    def reset_state(self) -> None:
+        self.buffer_: Optional[np.ndarray] = None
+
+    @property
+    def _is_identity(self) -> bool:
+        # Frequencies above Nyquist frequency aren't present, so nothing is removed
+        return self.threshold * 1e-5 >= 0.5
+
+    def _get_filter(self) -> Tuple[int, int, np.ndarray]:
+        overlap = self.overlap or int(min(np.ceil(16 / max(self.threshold * 1e-5, 1e-12)), 2 ** 20))
+        block_size = self.block_size or 2 ** 16
+        if getattr(self, "filter_", None) is None or self.filter_[:2] != (block_size, overlap):
+            size = block_size + 2 * overlap
+            kernel = get_lowpass_kernel(self.threshold, overlap)
+            # Kernel is centered at zero of circular convolution
+            circular_kernel = np.zeros(size)
+            circular_kernel[:overlap + 1] = kernel[overlap:]
+            circular_kernel[size - overlap:] = kernel[:overlap]
+            self.filter_ = (block_size, overlap, rfft(circular_kernel))
+        return self.filter_
+
+    def _filter_blocks(self, values: np.ndarray, n_outputs: int) -> np.ndarray:
+        block_size, overlap, kernel_spectrum = self._get_filter()
+        size = block_size + 2 * overlap
+        n_blocks = -(-n_outputs // block_size)
+        padding = n_blocks * block_size + 2 * overlap - len(values)
+        if padding > 0:
+            values = np.concatenate([values, np.full(padding, values[-1])])
+        segments = np.lib.stride_tricks.sliding_window_view(values, size)[::block_size][:n_blocks]
+
+        output = np.empty(n_blocks * block_size, dtype=np.float32)
+        # Segments are filtered by batches, so temporaries don't depend on length of series
+        batch_size = max(1, 2 ** 18 // size)
+        for start in range(0, n_blocks, batch_size):
+            filtered = irfft(rfft(segments[start:start + batch_size], axis=-1) * kernel_spectrum, n=size, axis=-1)
+            output[start * block_size:(start + len(filtered)) * block_size] = \
+                filtered[:, overlap:overlap + block_size].reshape(-1)
+        return output[:n_outputs]
+
+    def _stream(self, values: np.ndarray) -> np.ndarray:
+        if getattr(self, "buffer_", None) is None:
+            self.reset_state()
+        if not len(values):
+            return np.empty(0, dtype=np.float32)
+        block_size, overlap, _ = self._get_filter()
+        if self.buffer_ is None:
+            # Series is extended by its edge values instead of wrapping like FFT of the whole series
+            self.buffer_ = np.full(overlap, values[0])
+        buffer = np.concatenate([self.buffer_, values])
+        n_outputs = (len(buffer) - 2 * overlap) // block_size * block_size
+        if n_outputs <= 0:
+            self.buffer_ = buffer
+            return np.empty(0, dtype=np.float32)
+        output = self._filter_blocks(buffer[:n_outputs + 2 * overlap], n_outputs)
+        self.buffer_ = buffer[n_outputs:]
+        return output
+
+    def flush(self) -> np.ndarray:
+        """Returns denoised values which were kept by transform with keep_state.
+
+        Returns:
+            np.ndarray: Denoised values of the end of series.
+        """
+
+        buffer = getattr(self, "buffer_", None)
+        self.reset_state()
+        if buffer is None or self._is_identity:
+            return np.empty(0, dtype=np.float32)
+        _, overlap, _ = self._get_filter()
+        buffer = np.concatenate([buffer, np.full(overlap, buffer[-1])])
+        return self._filter_blocks(buffer, len(buffer) - 2 * overlap)
 
     def transform(self, series: pd.Series) -> np.ndarray:
-        """Returns denoised array.
+        """Returns denoised array. With block size or keep_state series is denoised by overlap-save
+        filter with Hann windowed sinc kernel, so memory doesn't depend on length of series.
+        Its output is close to FFT of the whole series except the first and the last overlap values,
+        because FFT of the whole series wraps its ends.
 
         Args:
-            series (pd.Series): Input series.
+            series (pd.Series): Input series or chunk of series with keep_state.
 
         Returns:
             np.ndarray: Denoised with FFT array.
         """
 
-        series = series.to_numpy()
-        fourier = rfft(series)
-        frequencies = rfftfreq(series.size, d=1e-5)
-        fourier[frequencies > self.threshold] = 0
-        output = irfft(fourier).astype("float32")
+        if self.block_size is None and not self.keep_state:
+            return fourier_denoise(series.to_numpy(), self.threshold)
+        values = np.asarray(series)
+        if self._is_identity:
+            return values.astype("float32")
+        if self.keep_state:
+            return self._stream(values.astype(np.float64))
+
+        # Series is streamed by slices, so only output has length of series
+        self.reset_state()
+        output = np.empty(len(values), dtype=np.float32)
+        position = 0
+        step = max(self._get_filter()[0], 2 ** 18)
+        for start in range(0, len(values), step):
+            chunk = self._stream(values[start:start + step].astype(np.float64))
+            output[position:position + len(chunk)] = chunk
+            position += len(chunk)
+        output[position:] = self.flush()
         return output
 
 
@@ -507,16 +1191,158 @@ class WaveletTransformer(BaseTransformer):
         Returns:
             np.ndarray: Denoised array with wavelet families.
         """
+        return wavelet_denoise(series.to_numpy(), self.wavelet, self.level)
+
+
+class MultiDenoiserMixin(ABC):
+    r"""Mixin of transformers for denoising many columns of all objects at once"""
+
+    def __init__(
+        self,
+        columns: Optional[List[str]] = None,
+        group_column: Optional[str] = "GROUP_ID",
+        suffix: str = "",
+        n_jobs: int = 1,
+    ):
+        """
+        Args:
+            columns (Optional[List[str]], optional): Denoised columns. Defaults to None
+                which means all float columns.
+            group_column (Optional[str], optional): Column of objects, every object is denoised
+                separately. Defaults to "GROUP_ID".
+            suffix (str, optional): Suffix of denoised columns, empty suffix replaces
+                source columns. Defaults to "".
+            n_jobs (int, optional): Number of objects denoised concurrently by threads. Defaults to 1.
+        """
+
+        self.columns = columns
+        self.group_column = group_column
+        self.suffix = suffix
+        self.n_jobs = n_jobs
 
-        series = series.to_numpy()
-        coeff = pywt.wavedec(series, self.wavelet, mode="per")
-        sigma = (1 / 0.6745) * self.madev(coeff[-self.level])
-        u_threshold = sigma * np.sqrt(2 * np.log(len(series)))
-        coeff[1:] = (
-            pywt.threshold(i, value=u_threshold, mode="hard") for i in coeff[1:]
+    @abstractmethod
+    def _denoise(self, values: np.ndarray) -> np.ndarray:
+        pass
+
+    def _denoise_rows(self, values: np.ndarray, rows: Union[slice, np.ndarray], output: np.ndarray) -> None:
+        # Signals of columns are contiguous rows of 2D array, so kernels don't copy strided data
+        signals = np.ascontiguousarray(values[:, rows])
+        if signals.shape[-1]:
+            output[:, rows] = self._denoise(signals)
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Returns dataframe with denoised columns. Columns of every object are stacked
+        into one 2D float32 array and denoised at once. Input dataframe isn't modified.
+
+        Args:
+            X (pd.DataFrame): Input dataframe.
+
+        Raises:
+            KeyError: Raised when columns aren't in dataframe columns.
+
+        Returns:
+            pd.DataFrame: Dataframe with denoised columns.
+        """
+
+        columns = self.columns
+        if columns is None:
+            columns = X.select_dtypes(include="float").columns.tolist()
+        missing_columns = set(columns) - set(X.columns)
+        if missing_columns:
+            raise KeyError(f"{missing_columns} are not in dataframe columns")
+        if not columns:
+            return X.copy() if self.copy else X
+
+        values = X[columns].to_numpy(dtype=np.float32, na_value=np.nan).T
+        output = np.empty(values.shape, dtype=np.float32)
+        if self.group_column and self.group_column in X.columns:
+            # Rows with missing object are denoised as one object, so every row is written
+            groups = X.groupby(self.group_column, sort=False, observed=True, dropna=False).indices
+            partitions = [
+                # Rows of sorted objects are contiguous, so they are sliced without gathering
+                slice(rows[0], rows[-1] + 1) if rows[-1] - rows[0] + 1 == len(rows) else rows
+                for rows in groups.values()
+            ]
+        else:
+            partitions = [slice(None)]
+
+        if self.n_jobs > 1 and len(partitions) > 1:
+            # FFT and wavelet kernels release GIL, so objects are denoised by threads
+            with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+                for future in [
+                    executor.submit(self._denoise_rows, values, rows, output) for rows in partitions
+                ]:
+                    future.result()
+        else:
+            for rows in partitions:
+                self._denoise_rows(values, rows, output)
+
+        # Denoised columns are one block of dataframe, they aren't inserted one by one
+        denoised = pd.DataFrame(
+            output.T, index=X.index, columns=[f"{column}{self.suffix}" for column in columns], copy=False
         )
-        output = pywt.waverec(coeff, self.wavelet, mode="per").astype("float32")
-        return output
+        if self.suffix:
+            return pd.concat([X.drop(columns=denoised.columns, errors="ignore"), denoised], axis="columns")
+        return pd.concat([X.drop(columns=columns), denoised], axis="columns")[X.columns]
+
+
+class MultiFourierTransformer(MultiDenoiserMixin, BaseTransformer):
+    r"""Transformer for denoising many columns of all objects with FFT approach"""
+
+    def __init__(
+        self,
+        threshold: float = 1e8,
+        columns: Optional[List[str]] = None,
+        group_column: Optional[str] = "GROUP_ID",
+        suffix: str = "",
+        n_jobs: int = 1,
+    ):
+        """
+        Args:
+            threshold (float, optional): Maximum kept frequency. Defaults to 1e8.
+            columns (Optional[List[str]], optional): Denoised columns. Defaults to None
+                which means all float columns.
+            group_column (Optional[str], optional): Column of objects. Defaults to "GROUP_ID".
+            suffix (str, optional): Suffix of denoised columns. Defaults to "".
+            n_jobs (int, optional): Number of objects denoised concurrently. Defaults to 1.
+        """
+
+        super().__init__(columns=columns, group_column=group_column, suffix=suffix, n_jobs=n_jobs)
+        self.threshold = threshold
+
+    def _denoise(self, values: np.ndarray) -> np.ndarray:
+        return fourier_denoise(values, self.threshold, axis=-1)
+
+
+class MultiWaveletTransformer(MultiDenoiserMixin, BaseTransformer):
+    r"""Transformer for denoising many columns of all objects with wavelet families"""
+
+    def __init__(
+        self,
+        wavelet: str = "db4",
+        level: int = 1,
+        columns: Optional[List[str]] = None,
+        group_column: Optional[str] = "GROUP_ID",
+        suffix: str = "",
+        n_jobs: int = 1,
+    ):
+        """
+        Args:
+            wavelet (str, optional): Wavelet family. Defaults to "db4".
+            level (int, optional): Level of coefficients which estimate noise. Defaults to 1.
+            columns (Optional[List[str]], optional): Denoised columns. Defaults to None
+                which means all float columns.
+            group_column (Optional[str], optional): Column of objects. Defaults to "GROUP_ID".
+            suffix (str, optional): Suffix of denoised columns. Defaults to "".
+            n_jobs (int, optional): Number of objects denoised concurrently. Defaults to 1.
+        """
+
+        super().__init__(columns=columns, group_column=group_column, suffix=suffix, n_jobs=n_jobs)
+        self.wavelet = wavelet
+        self.level = level
+
+    def _denoise(self, values: np.ndarray) -> np.ndarray:
+        return wavelet_denoise(values, self.wavelet, self.level, axis=-1)
     
     
 class PositiveReplacer(BaseTransformer):
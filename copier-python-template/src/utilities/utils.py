@@ -3,17 +3,56 @@
 import os
 from collections.abc import Iterable
 import logging
+import operator
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
-import numpy as np
+import pyarrow as pa
+from pyarrow import feather
 
 from common.config import ALL_TYPES
-from common.constants import GENERAL_EXTENSION
+from common.constants import (
+    FEATHER_EXTENSION,
+    GENERAL_EXTENSION,
+    PARQUET_EXTENSION,
+    PICKLE_EXTENSION,
+    TIMESTEP_SAMPLE_SIZE,
+)
+from common.exceptions import FileTypeError
+from utilities.resampling import infer_timestep
+from utilities.schema import DataSchema
 
 LOGGER = logging.getLogger(__name__)
 
+FILTER_OPERATORS: Dict[str, Callable[[pd.Series, Any], pd.Series]] = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda series, value: series.isin(value),
+    "not in": lambda series, value: ~series.isin(value),
+}
+
+
+def get_output_filepath(path: Union[str, Path], extension: str) -> Path:
+    """Returns path of output file with required extension.
+
+    Args:
+        path (Union[str, Path]): Path to output file with or without extension.
+        extension (str): Required extension.
+
+    Returns:
+        Path: Path to output file with required extension.
+    """
+    path = Path(path)
+    if path.suffix != extension:
+        return Path(os.path.join(path.parent, (path.name + extension)))
+    return path
+
 
 def compress_pickle(path: Path, data: pd.DataFrame) -> Path:
     """Saves compressed dataframe to storage.
@@ -25,13 +64,7 @@ def compress_pickle(path: Path, data: pd.DataFrame) -> Path:
     Returns:
         Path: path to compressed file.
     """
-    file_extension = Path(path).suffix
-    if file_extension == '' or file_extension != GENERAL_EXTENSION:
-        output_filepath = Path(
-            os.path.join(path.parent, (path.name + GENERAL_EXTENSION))
-        ) 
-    else:
-        output_filepath = Path(path)
+    output_filepath = get_output_filepath(path, PICKLE_EXTENSION)
     data.to_pickle(
         output_filepath, compression={"method": "gzip", "compresslevel": 1, "mtime": 1}
     )
@@ -39,27 +72,117 @@ def compress_pickle(path: Path, data: pd.DataFrame) -> Path:
     return output_filepath
 
 
-def convert_columns_type(data: pd.DataFrame) -> pd.DataFrame:
-    """Converts column values type according to config.
+def save_parquet(path: Path, data: pd.DataFrame) -> Path:
+    """Saves dataframe to storage in parquet format.
+
+    Args:
+        path (Path): Path to output directory.
+        data (pd.DataFrame): Input data.
+        
+    Returns:
+        Path: path to parquet file.
+    """
+    output_filepath = get_output_filepath(path, PARQUET_EXTENSION)
+    data.to_parquet(output_filepath, engine="pyarrow", compression="zstd")
+    
+    return output_filepath
+
+
+def save_feather(path: Path, data: pd.DataFrame) -> Path:
+    """Saves dataframe to storage in feather (Arrow IPC) format.
+
+    Args:
+        path (Path): Path to output directory.
+        data (pd.DataFrame): Input data.
+        
+    Returns:
+        Path: path to feather file.
+    """
+    output_filepath = get_output_filepath(path, FEATHER_EXTENSION)
+    feather.write_feather(
+        pa.Table.from_pandas(data), output_filepath, compression="zstd"
+    )
+    
+    return output_filepath
+
+
+SAVERS: Dict[str, Callable[[Path, pd.DataFrame], Path]] = {
+    PICKLE_EXTENSION: compress_pickle,
+    PARQUET_EXTENSION: save_parquet,
+    FEATHER_EXTENSION: save_feather,
+}
+
+
+def save_data(path: Path, data: pd.DataFrame, extension: str = GENERAL_EXTENSION) -> Path:
+    """Saves dataframe to storage in format defined by extension.
+
+    Args:
+        path (Path): Path to output directory.
+        data (pd.DataFrame): Input data.
+        extension (str, optional): Extension of output file. Defaults to GENERAL_EXTENSION.
+
+    Raises:
+        FileTypeError: In case of unsupported extension.
+
+    Returns:
+        Path: path to saved file.
+    """
+    if extension not in SAVERS:
+        raise FileTypeError(f"{extension} is not supported, please use one of {list(SAVERS)}")
+    return SAVERS[extension](path, data)
+
+
+def get_filters_mask(data: pd.DataFrame, filters: List[Tuple[str, str, Any]]) -> pd.Series:
+    """Returns mask of rows which satisfy all filters.
+    Filters have the same format as pyarrow filters: (column, operator, value).
+
+    Args:
+        data (pd.DataFrame): Input data.
+        filters (List[Tuple[str, str, Any]]): Filters to combine with 'and'.
+
+    Raises:
+        ValueError: In case of unsupported operator.
+
+    Returns:
+        pd.Series: Mask of rows.
+    """
+    mask = pd.Series(True, index=data.index)
+    for column, operator_name, value in filters:
+        if operator_name not in FILTER_OPERATORS:
+            raise ValueError(
+                f"{operator_name} is not supported, please use one of {list(FILTER_OPERATORS)}"
+            )
+        mask &= FILTER_OPERATORS[operator_name](data[column], value)
+    return mask
+
+
+def convert_columns_type(
+    data: pd.DataFrame, 
+    copy: bool = True, 
+    schema: Optional[DataSchema] = None,
+) -> pd.DataFrame:
+    """Converts column values type according to schema or config with single astype.
 
     Args:
         data (pd.DataFrame): Input data.
+        copy (bool, optional): Whether to copy input data, otherwise converted
+            columns are replaced in place. Converted columns are always new arrays,
+            so copy is shallow. Defaults to True.
+        schema (Optional[DataSchema], optional): Schema of dataset. Defaults to None
+            which means dtypes of ALL_TYPES only.
 
     Returns:
         pd.DataFrame: Input data with converted columns types.
     """
 
-    columns = data.columns.tolist()
-    types_dict = {key: ALL_TYPES[key] for key in columns & ALL_TYPES.keys()}
-    undefined_columns = np.setdiff1d(np.unique(columns), ALL_TYPES.keys())
-    if len(undefined_columns) > 0:
-        reduce_memory_usage(data[undefined_columns])
-    return data.astype(types_dict)
+    if schema is None:
+        schema = DataSchema(dtypes=ALL_TYPES)
+    return schema.apply(data.copy(deep=False) if copy else data)
 
 
 def reduce_memory_usage(data: pd.DataFrame) -> pd.DataFrame:
-    """Iterates through all columns of input dataframe and
-        converting the data type in order to reduce memory usage.
+    """Converts columns of input dataframe to the narrowest dtypes
+        in order to reduce memory usage.
 
     Args:
         data (pd.DataFrame): Input data.
@@ -71,33 +194,7 @@ def reduce_memory_usage(data: pd.DataFrame) -> pd.DataFrame:
     initial_memory = data.memory_usage().sum() / 1024**2
     LOGGER.debug(f"Initial memory usage of dataframe is {initial_memory:.2f} MB")
     
-    for column, dtype in zip(data.columns, data.dtypes):
-        dtype = str(dtype)
-        column_data = data[column]
-        if any([_ in dtype for _ in ("int", "float")]):
-            col_min, col_max = column_data.min(), column_data.max()
-            if "int" in dtype:
-                if (col_min > np.iinfo(np.int8).min) and (col_max < np.iinfo(np.int8).max):
-                    column_data = column_data.astype(np.int8)
-                elif (col_min > np.iinfo(np.int16).min) and (col_max < np.iinfo(np.int16).max):
-                    column_data = column_data.astype(np.int16)
-                elif (col_min > np.iinfo(np.int32).min) and (col_max < np.iinfo(np.int32).max):
-                    column_data = column_data.astype(np.int32)
-                elif (col_min > np.iinfo(np.int64).min) and (col_max < np.iinfo(np.int64).max):
-                    column_data = column_data.astype(np.int64)
-            else:
-                if (col_min > np.finfo(np.float16).min) and (col_max < np.finfo(np.float16).max):
-                    column_data = column_data.astype(np.float16)
-                elif (col_min > np.finfo(np.float32).min) and (col_max < np.finfo(np.float32).max):
-                    column_data = column_data.astype(np.float32)
-                else:
-                    column_data = column_data.astype(np.float64)
-        elif ("object" in dtype) or ("category" in dtype):
-            column_data = pd.Categorical(column_data)
-        elif "datetime" in dtype:
-            column_data = column_data.astype("datetime64[ns]")
-            
-        data[column] = column_data
+    data = DataSchema().update(data).apply(data)
 
     final_memory = data.memory_usage().sum() / 1024**2
     LOGGER.debug(f"Memory usage after optimization is {final_memory:.2f} MB")
@@ -105,22 +202,22 @@ def reduce_memory_usage(data: pd.DataFrame) -> pd.DataFrame:
     return data
 
 
-def get_common_timestep(data: pd.DataFrame) -> int:
+def get_common_timestep(data: pd.DataFrame, sample_size: int = TIMESTEP_SAMPLE_SIZE) -> Optional[int]:
     """Returns the common time step in seconds of input timeseries dataframe.
 
     Args:
         data (pd.DataFrame): Input data.
+        sample_size (int, optional): Number of first rows used for inference.
+            Defaults to TIMESTEP_SAMPLE_SIZE.
 
     Returns:
-        int: Common time step in seconds.
+        Optional[int]: Common time step in seconds. None if it can't be inferred.
     """
 
-    datetime_columns = data.select_dtypes(include=['datetime64']).columns
-    common_timestep = None
-    for column in datetime_columns:
-        timestep = data[column].diff().dt.total_seconds().mode().astype(int)[0]
-        common_timestep = timestep if common_timestep is None else min(timestep, common_timestep)
-    return common_timestep
+    datetime_columns = data.select_dtypes(include=['datetime64', 'datetimetz']).columns
+    timesteps = [infer_timestep(data[column], sample_size=sample_size) for column in datetime_columns]
+    timesteps = [timestep for timestep in timesteps if timestep is not None]
+    return min(timesteps) if timesteps else None
 
 
 def get_subclasses(cls):
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+r"""
+Writers of the pipeline steps datasets
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import parquet as pq
+
+from common.constants import (
+    FEATHER_EXTENSION,
+    GENERAL_EXTENSION,
+    PARQUET_EXTENSION,
+    PICKLE_EXTENSION,
+)
+from common.exceptions import DatasetWriteError, FileTypeError
+from utilities.utils import compress_pickle, get_output_filepath
+
+LOGGER = logging.getLogger(__name__)
+
+
+class DatasetWriter:
+    def __init__(
+        self,
+        path: Union[str, Path],
+        extension: str = GENERAL_EXTENSION,
+    ):
+        r"""Incrementally writes chunks of dataset to one file.
+        Parquet and feather chunks are flushed to disk on every write,
+        pickle chunks are concatenated once on close. Chunks with other columns or types
+        are written to the next temporary segment, segments are merged on close
+        with union of columns and promoted types like in pd.concat.
+
+        Args:
+            path (Union[str, Path]): Path to output file with or without extension.
+            extension (str, optional): Extension of output file. Defaults to GENERAL_EXTENSION.
+
+        Raises:
+            FileTypeError: In case of unsupported extension.
+        """
+
+        if extension not in (PICKLE_EXTENSION, PARQUET_EXTENSION, FEATHER_EXTENSION):
+            raise FileTypeError(f"{extension} is not supported")
+        self.extension = extension
+        self.path = get_output_filepath(path, extension)
+        self.n_rows = 0
+        self._chunks: List[pd.DataFrame] = []
+        self._schema: Optional[pa.Schema] = None
+        self._head: Optional[pd.DataFrame] = None
+        self._segments: List[Tuple[Path, pa.Schema]] = []
+        self._writer = None
+
+    def __enter__(self) -> 'DatasetWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self) -> None:
+        """Removes written chunks without writing output file, it does nothing after close."""
+        self._chunks = []
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for path, _ in self._segments:
+            if path.exists():
+                os.remove(path)
+        self._segments = []
+
+    def _open(self, path: Path, schema: pa.Schema) -> None:
+        if self.extension == PARQUET_EXTENSION:
+            self._writer = pq.ParquetWriter(path, schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(
+                str(path),
+                schema,
+                options=pa.ipc.IpcWriteOptions(compression="zstd", emit_dictionary_deltas=True),
+            )
+
+    def _open_segment(self, schema: pa.Schema) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        path = self.path.with_name(f".{self.path.name}.{len(self._segments)}")
+        self._segments.append((path, schema))
+        self._schema = schema
+        self._open(path, schema)
+
+    def _read_segment(self, path: Path) -> Iterator[pa.RecordBatch]:
+        if self.extension == PARQUET_EXTENSION:
+            yield from pq.ParquetFile(path).iter_batches()
+        else:
+            with pa.memory_map(str(path)) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield reader.get_batch(i)
+
+    def _unify_schemas(self, schemas: List[pa.Schema]) -> pa.Schema:
+        try:
+            schema = pa.unify_schemas(schemas, promote_options="permissive")
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as exception:
+            raise DatasetWriteError(f"Chunks of {self.path.name} can't be written to one file: {exception}")
+        # Categories which differ between chunks are decoded like in pd.concat,
+        # pandas metadata of concatenated chunks restores their dtypes on read
+        dtypes = self._head.dtypes
+        return pa.schema(
+            [
+                field.with_type(field.type.value_type)
+                if pa.types.is_dictionary(field.type) and not isinstance(dtypes.get(field.name), pd.CategoricalDtype)
+                else field
+                for field in schema
+            ],
+            metadata=pa.Schema.from_pandas(self._head, preserve_index=False).metadata,
+        )
+
+    def write(self, data: pd.DataFrame) -> None:
+        """Writes chunk of dataset.
+
+        Args:
+            data (pd.DataFrame): Chunk of dataset.
+
+        Raises:
+            DatasetWriteError: In case of types of chunk which can't be promoted to types of previous chunks.
+        """
+        self.n_rows += len(data)
+        if self.extension == PICKLE_EXTENSION:
+            self._chunks.append(data)
+            return
+
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        previous_head = self._head
+        self._head = data.iloc[:0] if previous_head is None else pd.concat(
+            [previous_head, data.iloc[:0]], ignore_index=True
+        )
+        if self._schema is None:
+            self._open_segment(table.schema)
+        elif not table.schema.equals(self._schema) or not self._head.dtypes.equals(previous_head.dtypes):
+            schema = self._unify_schemas([self._schema, table.schema])
+            if (
+                list(data.columns) == self._schema.names
+                and self._head.dtypes.equals(previous_head.dtypes)
+                and schema.equals(self._schema)
+            ):
+                table = table.cast(self._schema)
+            else:
+                LOGGER.debug(f"Columns or types of chunk differ from {self.path.name}, next segment is written")
+                self._open_segment(table.schema)
+        self._writer.write_table(table)
+
+    def _merge_segments(self) -> None:
+        schema = self._unify_schemas([schema for _, schema in self._segments])
+        self._open(self.path, schema)
+        for path, _ in self._segments:
+            for batch in self._read_segment(path):
+                # Missing columns are filled with nulls like missing values of pd.concat
+                columns = [
+                    batch.column(field.name).cast(field.type) if field.name in batch.schema.names
+                    else pa.nulls(len(batch), field.type)
+                    for field in schema
+                ]
+                self._writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=schema))
+            os.remove(path)
+        self._writer.close()
+        self._writer = None
+
+    def close(self) -> Path:
+        """Finalizes output file.
+
+        Returns:
+            Path: Path to output file.
+        """
+        if self.extension == PICKLE_EXTENSION:
+            if self._chunks:
+                compress_pickle(self.path, pd.concat(self._chunks, ignore_index=True))
+                self._chunks = []
+        elif self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            if len(self._segments) == 1:
+                os.replace(self._segments[0][0], self.path)
+            else:
+                try:
+                    self._merge_segments()
+                except BaseException:
+                    # Partially merged output isn't left besides segments
+                    self.abort()
+                    if self.path.exists():
+                        os.remove(self.path)
+                    raise
+            self._segments = []
+        LOGGER.debug(f"{self.n_rows} rows are written to {self.path}")
+        return self.path
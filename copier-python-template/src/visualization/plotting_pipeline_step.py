@@ -4,14 +4,13 @@ import gc
 from glob import glob
 import logging
 from pathlib import Path
-from typing import Dict, List, Union, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 import warnings
 
 from clearml import Dataset, Task
 import pandas as pd
 from tqdm import tqdm
 
-from common.constants import GENERAL_EXTENSION
 from common.exceptions import (
     DatasetDownloadError,
     PipelineExecutionError,
@@ -22,7 +21,7 @@ from common.pipeline_steps import (
     PREPROCESS,
 )
 from core import BasePipelineStep
-from utilities.loaders import PickleLoader
+from utilities.loaders import get_loader
 from utilities.utils import (
     is_empty_dir,
     invert_dict,
@@ -48,9 +47,14 @@ class PlottingPipelineStep(BasePipelineStep):
     def _input_files(self) -> List[Path]:
         return []
     
-    def _get_data(self, path: Union[Path, str]) -> pd.DataFrame:
-        file_path = get_last_modified(path=path, suffixes=GENERAL_EXTENSION)
-        data = PickleLoader(path=file_path).load()
+    def _get_data(
+        self,
+        path: Union[Path, str],
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None,
+    ) -> pd.DataFrame:
+        file_path = get_last_modified(path=path, suffixes=[self._extension])
+        data = get_loader(path=file_path, columns=columns, filters=filters).load()
         return data
     
     def _upload_artifacts(self) -> None:
@@ -92,10 +96,13 @@ class PlottingPipelineStep(BasePipelineStep):
             if file_name:
                 preprocessed_filepath = Path(
                     os.path.join(
-                        self.settings.storage.processed_folder, f"{file_name}{GENERAL_EXTENSION}"
+                        self.settings.storage.processed_folder, f"{file_name}{self._extension}"
                     )
                 )
-                data = PickleLoader(path=preprocessed_filepath).load()
+                data = get_loader(
+                    path=preprocessed_filepath,
+                    columns=(self.step_params or {}).get("columns"),
+                ).load()
                 processed = pd.concat([processed, data])
                 
                 del data
@@ -123,7 +130,12 @@ class PlottingPipelineStep(BasePipelineStep):
                 _ = plotter.plot()
     
     def _process_data(self) -> None:
-        self.prediction = self._get_data(self._input_directory)
+        # Read only required groups if they are specified
+        groups: Optional[List[int]] = (self.step_params or {}).get("groups")
+        self.prediction = self._get_data(
+            self._input_directory,
+            filters=[("GROUP_ID", "in", groups)] if groups else None,
+        )
         self.processed = self._get_processed_data()
         self.processed = pd.concat([self.processed, self.prediction], axis="columns")
         self._create_plot()
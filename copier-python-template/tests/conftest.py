@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Configuration of tests of project modules"""
+from pathlib import Path
+import sys
+
+# Modules of project are imported by their top-level names like in pipelines
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from utilities.aggregations import ALL_BACKENDS, PandasBackend, aggregate
+
+AGG_FUNCS = ["sum", "mean", "std", "median", "min", "max"]
+WINDOWS = [1, 5, 60, 1000, None]
+
+
+def _get_values() -> dict:
+    rng = np.random.default_rng(0)
+    noise = rng.normal(size=600)
+    level_shift = noise.copy()
+    level_shift[300:] += 1e6
+    with_inf = noise.copy()
+    with_inf[[50, 400]] = [np.inf, -np.inf]
+    with_nan = noise.copy()
+    with_nan[::7] = np.nan
+    return {
+        "level_shift": level_shift,
+        "inf": with_inf,
+        "all_nan": np.full(600, np.nan),
+        "nan": with_nan,
+        "constant": np.full(600, 1e9 + 0.5),
+    }
+
+
+VALUES = _get_values()
+CASES = [
+    (name, agg_func, window, min_periods)
+    for name, backend in ALL_BACKENDS.items() if name != PandasBackend.name
+    for agg_func in AGG_FUNCS
+    for window in WINDOWS
+    for min_periods in (None, 1)
+    if backend.supports(agg_func, window, min_periods if min_periods is not None else (window or 1))
+]
+
+
+@pytest.mark.parametrize("values", list(VALUES))
+@pytest.mark.parametrize("name, agg_func, window, min_periods", CASES)
+def test_backend_parity(values, name, agg_func, window, min_periods):
+    values = VALUES[values]
+
+    expected = aggregate(values, agg_func, window, min_periods, backend=PandasBackend.name)
+    output = aggregate(values, agg_func, window, min_periods, backend=name)
+
+    np.testing.assert_allclose(output, expected, rtol=1e-7, atol=1e-9, equal_nan=True)
+
+
+def test_aggregate_keeps_shape():
+    values = np.random.default_rng(0).normal(size=(100, 3))
+
+    assert aggregate(values, "mean", 10).shape == (100, 3)
+    assert aggregate(values[:, 0], "mean").shape == (100,)
+
+
+def test_aggregate_fails_on_unsupported_backend():
+    with pytest.raises(ValueError):
+        aggregate(np.arange(10.0), "median", None, backend="bottleneck")
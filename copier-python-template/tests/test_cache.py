@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import sys
+
+import pytest
+
+import utilities.cache
+from utilities.cache import get_code_version
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    package = tmp_path / "cached_project"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "step.py").write_text("from cached_project import helpers\nimport json\n")
+    (package / "helpers.py").write_text("from cached_project.core import VALUE\n")
+    (package / "core.py").write_text("VALUE = 1\n")
+    (package / "unused.py").write_text("VALUE = 1\n")
+    monkeypatch.setattr(utilities.cache, "SOURCE_ROOT", tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package
+    for name in [name for name in sys.modules if name.startswith("cached_project")]:
+        del sys.modules[name]
+
+
+def _get_version(package, module_name: str, source: str) -> str:
+    (package / f"{module_name}.py").write_text(source)
+    sys.modules.pop(f"cached_project.{module_name}", None)
+    return get_code_version(["cached_project.step"])
+
+
+def test_code_version_changes_with_transitively_imported_module(project):
+    version = get_code_version(["cached_project.step"])
+
+    assert _get_version(project, "core", "VALUE = 1\n") == version
+    assert _get_version(project, "core", "VALUE = 2\n") != version
+
+
+def test_code_version_ignores_not_imported_module(project):
+    version = get_code_version(["cached_project.step"])
+
+    assert _get_version(project, "unused", "VALUE = 2\n") == version
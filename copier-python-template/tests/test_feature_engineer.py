@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from features.feature_engineer import FeatureEngineer
+from settings import MultiprocessingSettings
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n_rows = 1200
+    groups = rng.choice([1.0, 2.0, 3.0, np.nan], size=n_rows)
+    data = pd.DataFrame({
+        "datetime": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(n_rows), unit="min"),
+        "some_column": rng.normal(size=n_rows),
+        "GROUP_ID": groups,
+    })
+    data.loc[rng.choice(n_rows, size=50), "some_column"] = np.inf
+    return data
+
+
+def test_parallel_feature_engineer_equals_serial(data: pd.DataFrame):
+    settings = MultiprocessingSettings(n_cpu=2, error_behavior="raise")
+
+    output = FeatureEngineer(multiprocessing_settings=settings).fit_transform(data)
+
+    expected = FeatureEngineer().fit_transform(data)
+    pd.testing.assert_frame_equal(output, expected)
+
+
+def test_feature_engineer_windows_do_not_cross_groups(data: pd.DataFrame):
+    output = FeatureEngineer().fit_transform(data)
+
+    # Rows of missing GROUP_ID are one object
+    for _, group in data.groupby("GROUP_ID", dropna=False):
+        expected = FeatureEngineer(group_column=None).fit_transform(group)
+        pd.testing.assert_frame_equal(output.loc[group.index], expected)
+    pd.testing.assert_index_equal(output.index, data.index)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from utilities.loaders import CsvLoader
+
+
+@pytest.fixture
+def csv_path(tmp_path: Path) -> Path:
+    # Integer values fill the first blocks, float and missing values appear later
+    data = pd.DataFrame({"a": range(2000), "b": range(2000), "c": ["x", "y"] * 1000})
+    data["a"] = data["a"].astype(object)
+    data.loc[1500, "a"] = 1.5
+    data["b"] = data["b"].astype(object)
+    data.loc[1900, "b"] = None
+    path = tmp_path / "data.csv"
+    data.to_csv(path, index=False)
+    return path
+
+
+def test_load_chunks_widens_integer_columns(csv_path: Path):
+    chunks = list(CsvLoader(path=csv_path, block_size=4096).load_chunks())
+    expected = CsvLoader(path=csv_path).load()
+
+    assert len(chunks) > 1
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected, check_dtype=False)
+
+
+def test_load_sample_reads_blocks_after_float_values(csv_path: Path):
+    sample = CsvLoader(path=csv_path, block_size=4096).load_sample(1600)
+
+    assert len(sample) == 1600
+    assert sample["a"].iloc[1500] == 1.5
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+
+import preprocess.preprocess_pipeline_step as preprocess_pipeline_step
+from common.constants import PARQUET_EXTENSION
+from common.pipeline_steps import PipelineStep
+from preprocess.preprocess_pipeline_step import PreprocessPipelineStep
+from settings import CacheSettings, DataSchemaSettings, MultiprocessingSettings
+from utilities.loaders import CsvLoader
+from utilities.profiling import StageProfiler
+from utilities.transformers import ColumnsTypeTransformer
+
+
+def _write_raw_file(directory: Path, name: str, modes: list, seed: int = 0) -> Path:
+    rng = np.random.default_rng(seed)
+    n_rows = 600
+    data = pd.DataFrame({
+        "datetime": pd.date_range("2024-01-01", periods=n_rows, freq="s"),
+        "feature_1": rng.uniform(0, 100, size=n_rows),
+        "mode": rng.choice(modes, size=n_rows),
+    })
+    path = directory / f"{name}.csv"
+    data.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def raw_directory(tmp_path: Path) -> Path:
+    directory = tmp_path / "raw"
+    directory.mkdir()
+    _write_raw_file(directory, "object_1", ["a", "b"])
+    _write_raw_file(directory, "object_2", ["b", "c"])
+    return directory
+
+
+def _get_step(raw_directory: Path, incremental: bool = False) -> PreprocessPipelineStep:
+    r"""Returns step without ClearML task, its data is processed by `_process_data`."""
+    output_directory = raw_directory.parent / "processed"
+    output_directory.mkdir(exist_ok=True)
+    step = object.__new__(PreprocessPipelineStep)
+    step.settings = SimpleNamespace(
+        incremental=incremental,
+        data_schema=DataSchemaSettings(sample_files=1),
+        cache=CacheSettings(enabled=False),
+        multiprocessing=MultiprocessingSettings(n_cpu=1, error_behavior="raise"),
+        storage=SimpleNamespace(extension=PARQUET_EXTENSION, stream_block_size=None),
+    )
+    step.pipeline_step = PipelineStep("preprocess", "data_processing", raw_directory, output_directory)
+    step.task = MagicMock()
+    step.profiler = StageProfiler(enabled=False)
+    step.common_params = None
+    step.step_params = {}
+    step._previous_dataset = None
+    return step
+
+
+def test_categories_of_dropped_columns_are_not_collected(raw_directory: Path, monkeypatch):
+    load_unique = MagicMock(side_effect=CsvLoader.load_unique)
+    monkeypatch.setattr(CsvLoader, "load_unique", load_unique)
+    step = _get_step(raw_directory)
+
+    step._process_data()
+
+    # Resampler of default pipeline drops categorical columns
+    assert step._schema.dtypes["mode"] == "category"
+    load_unique.assert_not_called()
+    assert sorted(step.result) == ["OBJECT_1", "OBJECT_2"]
+
+
+def test_categories_of_kept_columns_are_collected_from_all_files(raw_directory: Path, monkeypatch):
+    def get_step_pipeline(skip_mark, profiler=None, schema=None) -> Pipeline:
+        return Pipeline([("convert_columns_type", ColumnsTypeTransformer(copy=False, schema=schema))])
+
+    monkeypatch.setattr(preprocess_pipeline_step, "get_step_pipeline", get_step_pipeline)
+    step = _get_step(raw_directory)
+
+    step._process_data()
+
+    # Schema is inferred from the first file only, other categories are collected from all files
+    assert step._schema.categories["mode"] == ["a", "b", "c"]
+    output = pd.read_parquet(Path(step._output_directory) / f"OBJECT_2{PARQUET_EXTENSION}")
+    assert list(output["mode"].cat.categories) == ["a", "b", "c"]
+
+
+def test_manifest_skips_unchanged_files_and_rebuilds_modified(raw_directory: Path, monkeypatch):
+    _get_step(raw_directory, incremental=True)._process_data()
+    transform = MagicMock(side_effect=PreprocessPipelineStep._transform_input_data)
+    monkeypatch.setattr(
+        PreprocessPipelineStep, "_transform_input_data", lambda self, path: transform(self, path)
+    )
+
+    step = _get_step(raw_directory, incremental=True)
+    step._process_data()
+
+    transform.assert_not_called()
+    assert sorted(step.result) == ["OBJECT_1", "OBJECT_2"]
+
+    _write_raw_file(raw_directory, "object_2", ["b", "c"], seed=1)
+    _write_raw_file(raw_directory, "object_3", ["a", "c"])
+    step = _get_step(raw_directory, incremental=True)
+    step._process_data()
+
+    assert sorted(call.args[1].name for call in transform.call_args_list) == ["object_2.csv", "object_3.csv"]
+    assert sorted(step._load_manifest()) == ["object_1.csv", "object_2.csv", "object_3.csv"]
+
+
+def test_manifest_removes_outputs_of_deleted_files(raw_directory: Path):
+    _get_step(raw_directory, incremental=True)._process_data()
+    (raw_directory / "object_2.csv").unlink()
+
+    step = _get_step(raw_directory, incremental=True)
+    step._process_data()
+
+    assert sorted(step._load_manifest()) == ["object_1.csv"]
+    assert not (Path(step._output_directory) / f"OBJECT_2{PARQUET_EXTENSION}").exists()
+
+
+def test_manifest_rebuilds_files_when_step_parameters_change(raw_directory: Path, monkeypatch):
+    _get_step(raw_directory, incremental=True)._process_data()
+    transform = MagicMock(side_effect=PreprocessPipelineStep._transform_input_data)
+    monkeypatch.setattr(
+        PreprocessPipelineStep, "_transform_input_data", lambda self, path: transform(self, path)
+    )
+
+    step = _get_step(raw_directory, incremental=True)
+    step.step_params = {"skip_mark": True}
+    step._process_data()
+
+    assert transform.call_count == 2
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import json
+from pathlib import Path
+
+import pytest
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
+
+from utilities.profiling import StageProfiler, transform_pipeline
+
+
+def test_disabled_profiler_does_not_measure():
+    profiler = StageProfiler()
+
+    with profiler.measure("load", "OBJECT"):
+        pass
+
+    assert not profiler.records
+    assert profiler.summary().empty
+
+
+def test_nested_stages_inherit_file_and_are_summed():
+    profiler = StageProfiler(enabled=True)
+
+    with profiler.measure("transform_input_file", "OBJECT"):
+        for _ in range(3):
+            with profiler.measure("chunk"):
+                pass
+    with profiler.measure("upload"):
+        pass
+
+    summary = profiler.summary().set_index(["stage", "file"])
+    assert summary.loc[("chunk", "OBJECT"), "calls"] == 3
+    assert summary.loc[("transform_input_file", "OBJECT"), "calls"] == 1
+    assert summary.loc[("upload", ""), "calls"] == 1
+    assert (summary["wall_time"] >= 0).all()
+
+
+def test_failed_stage_is_measured():
+    profiler = StageProfiler(enabled=True)
+
+    with pytest.raises(ValueError):
+        with profiler.measure("load", "OBJECT"):
+            raise ValueError
+
+    assert [record["stage"] for record in profiler.records] == ["load"]
+    with profiler.measure("save"):
+        pass
+    assert profiler.records[-1]["file"] is None
+
+
+def test_records_of_child_process_are_merged_and_saved(tmp_path: Path):
+    child = StageProfiler(enabled=True)
+    with child.measure("load", "OBJECT"):
+        pass
+    profiler = StageProfiler(enabled=True)
+
+    profiler.extend(child.records)
+    with open(profiler.save(tmp_path / "trace.json")) as file:
+        trace = json.load(file)
+
+    assert [event["name"] for event in trace["traceEvents"]] == ["load"]
+    assert trace["traceEvents"][0]["args"]["file"] == "OBJECT"
+
+
+def test_transform_pipeline_measures_every_transformer():
+    pipeline = Pipeline([
+        ("double", FunctionTransformer(lambda X: X * 2)),
+        ("skip", "passthrough"),
+        ("increment", FunctionTransformer(lambda X: X + 1)),
+    ])
+    profiler = StageProfiler(enabled=True)
+
+    with profiler.measure("transform", "OBJECT"):
+        output = transform_pipeline(pipeline, 1, profiler)
+
+    assert output == 3
+    assert [record["stage"] for record in profiler.records] == ["double", "increment", "transform"]
+    assert {record["file"] for record in profiler.records} == {"OBJECT"}
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from utilities.quantiles import move_quantile
+
+
+def _get_values() -> dict:
+    rng = np.random.default_rng(0)
+    noise = rng.normal(size=300)
+    with_nan = noise.copy()
+    with_nan[rng.choice(300, 60, replace=False)] = np.nan
+    with_inf = with_nan.copy()
+    with_inf[[3, 40, 41, 150]] = [np.inf, -np.inf, np.inf, -np.inf]
+    ties = rng.integers(0, 4, size=300).astype(np.float64)
+    ties[::11] = np.nan
+    return {
+        "noise": noise,
+        "nan": with_nan,
+        "inf": with_inf,
+        "ties": ties,
+        "all_nan": np.full(300, np.nan),
+        "level_shift": np.concatenate([noise[:150], noise[150:] + 1e6]),
+    }
+
+
+VALUES = _get_values()
+
+
+def _get_expected(values: np.ndarray, quantile: float, window, min_periods) -> np.ndarray:
+    series = pd.Series(values)
+    if window is None:
+        rolling = series.expanding(min_periods=1 if min_periods is None else min_periods)
+    else:
+        rolling = series.rolling(window=window, min_periods=min_periods)
+    return rolling.quantile(quantile).to_numpy()
+
+
+@pytest.mark.parametrize("values", list(VALUES))
+@pytest.mark.parametrize("quantile", [0.0, 0.1, 0.5, 0.75, 1.0])
+@pytest.mark.parametrize("window", [1, 2, 7, 50, 500, None])
+@pytest.mark.parametrize("min_periods", [None, 0, 1, 5])
+def test_move_quantile_parity(values, quantile, window, min_periods):
+    values = VALUES[values]
+    if window is not None and min_periods is not None and min_periods > window:
+        with pytest.raises(ValueError):
+            _get_expected(values, quantile, window, min_periods)
+        with pytest.raises(ValueError):
+            move_quantile(values, quantile, window=window, min_count=min_periods)
+        return
+
+    output = move_quantile(values, quantile, window=window, min_count=min_periods)
+
+    np.testing.assert_allclose(output, _get_expected(values, quantile, window, min_periods), equal_nan=True)
+
+
+def test_move_quantile_of_columns():
+    values = np.stack([VALUES["nan"], VALUES["inf"]], axis=1)
+
+    output = move_quantile(values, 0.3, window=20, min_count=3)
+
+    for column in range(values.shape[1]):
+        np.testing.assert_allclose(
+            output[:, column], _get_expected(values[:, column], 0.3, 20, 3), equal_nan=True
+        )
+
+
+@pytest.mark.parametrize(
+    "quantile, window, min_count", [(-0.1, 5, None), (1.1, 5, None), (0.5, 0, None), (0.5, 2, 3)]
+)
+def test_move_quantile_fails_on_invalid_arguments(quantile, window, min_count):
+    with pytest.raises(ValueError):
+        move_quantile(VALUES["noise"], quantile, window=window, min_count=min_count)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from utilities.resampling import resample
+from utilities.schema import DataSchema
+from utilities.transformers import TimeResampler
+
+AGGREGATIONS = {"a": "mean", "b": "max", "c": "mean"}
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    data = pd.DataFrame({
+        "datetime": pd.date_range("2024-01-01", periods=8, freq="20min"),
+        "a": [1.5, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, 8.0],
+        "b": [1, 2, 3, None, 5, 6, 7, 8],
+        "c": [True, False, None, True, True, False, False, True],
+        "d": list("abcdefgh"),
+    })
+    data = data.astype({"b": "Int8", "c": "boolean"})
+    return DataSchema().update(data).apply(data)
+
+
+def _get_expected(data: pd.DataFrame) -> pd.DataFrame:
+    data = data[["datetime", *AGGREGATIONS]].astype({column: np.float64 for column in AGGREGATIONS})
+    return data.set_index("datetime").resample("3600s", origin="epoch").agg(AGGREGATIONS).reset_index()
+
+
+@pytest.mark.parametrize("timezone", [None, "UTC"])
+def test_resample_keeps_nullable_numeric_and_boolean_columns(data: pd.DataFrame, timezone):
+    if timezone is not None:
+        data["datetime"] = data["datetime"].dt.tz_localize(timezone)
+
+    output = resample(data, 3600, aggregations=AGGREGATIONS)
+
+    assert list(output.columns) == ["datetime", "a", "b", "c"]
+    assert (output.dtypes[["b", "c"]] == np.float64).all()
+    pd.testing.assert_frame_equal(output, _get_expected(data), check_dtype=False, check_freq=False)
+
+
+@pytest.mark.parametrize("timezone", [None, "UTC"])
+@pytest.mark.parametrize("time_step", [7, 3600])
+def test_time_resampler_keep_state_equals_whole_data(timezone, time_step):
+    rng = np.random.default_rng(0)
+    # Step of 7 seconds doesn't divide a day, so bins depend on origin
+    seconds = np.cumsum(rng.integers(1, 5, size=2000)) + 12 * 3600 + 5
+    data = pd.DataFrame({
+        "datetime": pd.Timestamp("2024-01-01") + pd.to_timedelta(seconds, unit="s"),
+        "a": rng.normal(size=len(seconds)),
+        "b": rng.normal(size=len(seconds)),
+    })
+    if timezone is not None:
+        data["datetime"] = data["datetime"].dt.tz_localize(timezone)
+    resampler = TimeResampler(time_step=time_step, keep_state=True, aggregations=AGGREGATIONS)
+
+    bounds = [0, 1, 333, 1000, 1001, 1700, len(data)]
+    chunks = [resampler.transform(data.iloc[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+    output = pd.concat([*chunks, resampler.flush()], ignore_index=True)
+
+    expected = TimeResampler(time_step=time_step, aggregations=AGGREGATIONS).transform(data)
+    pd.testing.assert_frame_equal(output, expected, check_dtype=False)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+import pandas as pd
+
+from utilities.schema import DataSchema
+
+
+def _get_object(modes: list) -> pd.DataFrame:
+    return pd.DataFrame({"mode": modes * 50, "value": range(50 * len(modes))})
+
+
+def test_objects_are_encoded_with_shared_categories():
+    first, second = _get_object(["b", "a"]), _get_object(["c", "b"])
+    schema = DataSchema().update(first).update(second)
+
+    output = pd.concat([schema.apply(first), schema.apply(second)], ignore_index=True)
+
+    assert schema.categories["mode"] == ["a", "b", "c"]
+    assert isinstance(output["mode"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_series_equal(
+        output["mode"].astype(str), pd.concat([first, second], ignore_index=True)["mode"]
+    )
+
+
+def test_new_categories_are_appended():
+    schema = DataSchema().update(_get_object(["b", "c"]))
+    codes = schema.apply(_get_object(["b", "c"]))["mode"].cat.codes
+
+    schema.update_categories({"mode": ["d", "a"]})
+
+    # Codes of known categories don't change
+    assert schema.categories["mode"] == ["b", "c", "a", "d"]
+    pd.testing.assert_series_equal(schema.apply(_get_object(["b", "c"]))["mode"].cat.codes, codes)
+
+
+def test_categorical_input_is_recoded():
+    schema = DataSchema().update(_get_object(["a", "b"]))
+    data = _get_object(["b", "a"]).astype({"mode": pd.CategoricalDtype(["b", "a"])})
+
+    output = schema.apply(data)
+
+    assert list(output["mode"].cat.categories) == ["a", "b"]
+    pd.testing.assert_series_equal(output["mode"].astype(str), data["mode"].astype(str))
+
+
+def test_schema_is_saved_and_loaded(tmp_path: Path):
+    schema = DataSchema().update(_get_object(["a", "b"])).update_categories({"mode": ["c"]})
+
+    loaded = DataSchema.load(schema.save(tmp_path / "schema.json"))
+
+    assert loaded.to_dict() == schema.to_dict()
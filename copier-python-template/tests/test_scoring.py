@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+from catboost import CatBoostClassifier
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.constants import PARQUET_EXTENSION
+from features.feature_engineer import FeatureEngineer
+from predict.artifacts import load_model
+from predict.predict_pipeline_step import predict_input_file
+from predict.scoring import ScoringService
+from utilities.prediction import BatchPredictor
+
+
+def _get_data(seed: int, n_rows: int = 500) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "datetime": pd.date_range("2024-01-01", periods=n_rows, freq="s"),
+        "some_column": rng.normal(size=n_rows).cumsum(),
+    })
+
+
+@pytest.fixture
+def feature_engineer() -> FeatureEngineer:
+    return FeatureEngineer().fit(_get_data(0))
+
+
+@pytest.fixture
+def model_path(tmp_path: Path, feature_engineer: FeatureEngineer) -> Path:
+    features = feature_engineer.transform(_get_data(0)).drop(columns="datetime")
+    model = CatBoostClassifier(iterations=20, depth=3, verbose=False, random_seed=0)
+    model.fit(features, (features["some_column"].diff() > 0).astype(int))
+    path = tmp_path / "model.cbm"
+    model.save_model(str(path))
+    return path
+
+
+def _get_expected(feature_engineer: FeatureEngineer, model: CatBoostClassifier, data: pd.DataFrame) -> np.ndarray:
+    return BatchPredictor(models=[model]).predict_proba(feature_engineer.transform(data))
+
+
+def test_scoring_by_parts_equals_scoring_of_whole_object(feature_engineer, model_path):
+    model = load_model(model_path)
+    service = ScoringService(feature_engineer, [model], preprocess=False)
+    first, second = _get_data(1), _get_data(2)
+
+    predictions = {"first": [], "second": []}
+    for start, end in [(0, 1), (1, 50), (50, 300), (300, 500)]:
+        # Requests of objects are interleaved, so their states are separated
+        predictions["first"].append(service.score("first", first.iloc[start:end]))
+        predictions["second"].append(service.score("second", second.iloc[start:end]))
+
+    for group_id, data in [("first", first), ("second", second)]:
+        output = pd.concat(predictions[group_id], ignore_index=True)
+        pd.testing.assert_series_equal(output["datetime"], data["datetime"])
+        np.testing.assert_allclose(output["PREDICTION_CONT"], _get_expected(feature_engineer, model, data), rtol=1e-6)
+
+
+def test_states_of_least_recently_used_objects_are_evicted(feature_engineer, model_path):
+    service = ScoringService(feature_engineer, [load_model(model_path)], preprocess=False, max_groups=2)
+
+    for group_id in ["first", "second", "first", "third"]:
+        service.score(group_id, _get_data(0, n_rows=10))
+
+    assert list(service._states) == ["first", "third"]
+    service.flush("first")
+    assert service.n_groups == 1
+
+
+def test_predict_input_file_reuses_loaded_model(tmp_path, feature_engineer, model_path):
+    data = _get_data(3)
+    data.to_csv(tmp_path / "object 1.csv", index=False)
+    model = load_model(model_path)
+
+    file_name = predict_input_file(
+        tmp_path / "object 1.csv",
+        tmp_path,
+        feature_engineer=feature_engineer,
+        model_path=model_path,
+        extension=PARQUET_EXTENSION,
+        batch_size=128,
+    )
+
+    # Model is loaded once per process
+    assert load_model(model_path) is model
+    output = pd.read_parquet(tmp_path / f"{file_name}{PARQUET_EXTENSION}")
+    assert file_name == "OBJECT1"
+    np.testing.assert_allclose(output["PREDICTION_CONT"], _get_expected(feature_engineer, model, data), rtol=1e-6)
+    assert (output["PREDICTION_DISC"] == (output["PREDICTION_CONT"] > 0.5)).all()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from common.exceptions import DatasetDownloadError, DatasetUploadError
+from utilities.cache import get_file_hash
+from utilities.transfer import DatasetTransfer, LocalStorageBackend, get_objects_prefix, join_url
+
+
+class FlakyStorageBackend(LocalStorageBackend):
+    r"""Local storage which fails the first transfers of chosen files."""
+
+    def __init__(self, failures: dict):
+        self.failures = dict(failures)
+        self.uploaded: List[str] = []
+        self.downloaded: List[str] = []
+
+    def _fail(self, name: str) -> None:
+        if self.failures.get(name, 0) > 0:
+            self.failures[name] -= 1
+            raise OSError(f"{name} isn't transferred")
+
+    def download_file(self, remote_url: str, local_path: Path) -> None:
+        self._fail(Path(remote_url).name)
+        super().download_file(remote_url, local_path)
+        self.downloaded.append(Path(remote_url).name)
+
+    def upload_file(self, local_path: Path, remote_url: str) -> None:
+        self._fail(Path(remote_url).name)
+        super().upload_file(local_path, remote_url)
+        self.uploaded.append(Path(remote_url).name)
+
+
+@pytest.fixture
+def local_folder(tmp_path: Path) -> Path:
+    folder = tmp_path / "local"
+    (folder / "nested").mkdir(parents=True)
+    for name in ["a.parquet", "b.parquet", "nested/c.parquet"]:
+        (folder / name).write_text(name)
+    return folder
+
+
+def _hash(folder: Path, file: str) -> str:
+    return get_file_hash(folder / file)
+
+
+def test_upload_and_download(tmp_path: Path, local_folder: Path):
+    transfer = DatasetTransfer(LocalStorageBackend(), max_workers=2)
+    remote_prefix = str(tmp_path / "remote" / "version")
+
+    checksums = transfer.upload(local_folder, remote_prefix)
+    paths = transfer.download(remote_prefix, tmp_path / "downloaded")
+
+    assert sorted(checksums) == ["a.parquet", "b.parquet", "nested/c.parquet"]
+    assert transfer.read_checksums(remote_prefix) == checksums
+    assert [path.read_text() for path in paths] == [(local_folder / file).read_text() for file in checksums]
+
+
+def test_new_version_keeps_files_of_previous_version(tmp_path: Path, local_folder: Path):
+    backend = FlakyStorageBackend({})
+    transfer = DatasetTransfer(backend)
+    first, second = str(tmp_path / "remote" / "first"), str(tmp_path / "remote" / "second")
+    transfer.upload(local_folder, first)
+    (local_folder / "b.parquet").write_text("changed")
+    backend.uploaded = []
+
+    transfer.upload(local_folder, second)
+
+    # Only changed file and checksums of the new version are uploaded
+    assert sorted(backend.uploaded) == sorted([_hash(local_folder, "b.parquet"), "checksums.json"])
+    assert transfer.download(first, tmp_path / "first")[1].read_text() == "b.parquet"
+    assert transfer.download(second, tmp_path / "second")[1].read_text() == "changed"
+
+
+def test_upload_retries_failed_files(tmp_path: Path, local_folder: Path):
+    checksum = _hash(local_folder, "a.parquet")
+    transfer = DatasetTransfer(FlakyStorageBackend({checksum: 2}), retries=3)
+    remote_prefix = str(tmp_path / "remote" / "version")
+
+    transfer.upload(local_folder, remote_prefix)
+
+    assert Path(join_url(get_objects_prefix(remote_prefix), checksum)).read_text() == "a.parquet"
+
+
+def test_upload_resumes_after_failure(tmp_path: Path, local_folder: Path):
+    checksum = _hash(local_folder, "a.parquet")
+    backend = FlakyStorageBackend({checksum: 2})
+    transfer = DatasetTransfer(backend, retries=2)
+    remote_prefix = str(tmp_path / "remote" / "version")
+
+    with pytest.raises(DatasetUploadError):
+        transfer.upload(local_folder, remote_prefix)
+    # Incomplete version isn't listed
+    assert transfer.read_checksums(remote_prefix) == {}
+
+    backend.uploaded = []
+    transfer.upload(local_folder, remote_prefix)
+    assert backend.uploaded == [checksum, "checksums.json"]
+
+
+def test_download_fails_on_checksum_mismatch(tmp_path: Path, local_folder: Path):
+    transfer = DatasetTransfer(LocalStorageBackend(), retries=2)
+    remote_prefix = str(tmp_path / "remote" / "version")
+    transfer.upload(local_folder, remote_prefix)
+    Path(join_url(get_objects_prefix(remote_prefix), _hash(local_folder, "a.parquet"))).write_text("corrupted")
+
+    with pytest.raises(DatasetDownloadError):
+        transfer.download(remote_prefix, tmp_path / "downloaded")
+    assert not (tmp_path / "downloaded" / "a.parquet").exists()
+    assert not (tmp_path / "downloaded" / ".a.parquet.part").exists()
+
+
+def test_download_retries_and_resumes(tmp_path: Path, local_folder: Path):
+    remote_prefix = str(tmp_path / "remote" / "version")
+    DatasetTransfer(LocalStorageBackend()).upload(local_folder, remote_prefix)
+    backend = FlakyStorageBackend({_hash(local_folder, "b.parquet"): 1})
+    downloaded = tmp_path / "downloaded"
+    downloaded.mkdir()
+    (downloaded / "a.parquet").write_text("a.parquet")
+
+    DatasetTransfer(backend, retries=2).download(remote_prefix, downloaded)
+
+    assert sorted(backend.downloaded) == sorted([
+        _hash(local_folder, "b.parquet"), _hash(local_folder, "nested/c.parquet"), "checksums.json",
+    ])
+    assert sorted(path.relative_to(downloaded).as_posix() for path in downloaded.rglob("*.parquet")) == [
+        "a.parquet", "b.parquet", "nested/c.parquet",
+    ]
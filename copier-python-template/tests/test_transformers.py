@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from utilities.transformers import (
+    Aggregator,
+    CleaningTransformer,
+    ClipTransformer,
+    FillNanTransformer,
+    FourierTransformer,
+    InfValuesTransformer,
+    MultiAggregator,
+    MultiFourierTransformer,
+    MultiWaveletTransformer,
+)
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "a": rng.normal(size=120).cumsum(),
+        "b": rng.normal(size=120).cumsum(),
+        "GROUP_ID": np.repeat([1.0, 2.0], 60),
+    })
+    data.loc[50:55, "GROUP_ID"] = np.nan
+    return data
+
+
+@pytest.fixture
+def raw_data() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n_rows = 3000
+    data = pd.DataFrame({
+        "feature_1": rng.normal(10_000, 20_000, size=n_rows),
+        "feature_2": rng.normal(size=n_rows),
+        "feature_3": rng.normal(size=n_rows).astype(np.float32),
+        "count": rng.integers(0, 10, size=n_rows),
+        "label": rng.choice(["a", "b", None], size=n_rows),
+    })
+    for column in ["feature_1", "feature_2", "feature_3"]:
+        data.loc[rng.choice(n_rows, size=300), column] = np.nan
+        data.loc[rng.choice(n_rows, size=30), column] = rng.choice([np.inf, -np.inf], size=30)
+    # Gap is longer than forward filling limit and crosses chunk boundaries
+    data.loc[1000:1900, "feature_2"] = np.nan
+    return data
+
+
+@pytest.fixture
+def signal() -> pd.Series:
+    rng = np.random.default_rng(0)
+    time = np.arange(20_000)
+    return pd.Series(
+        np.sin(2 * np.pi * 0.001 * time) + 0.5 * np.sin(2 * np.pi * 0.004 * time + 1)
+        + 0.3 * rng.normal(size=len(time))
+    )
+
+
+@pytest.mark.parametrize("transformer", [MultiFourierTransformer(), MultiWaveletTransformer()])
+def test_multi_denoiser_denoises_rows_of_missing_group(data: pd.DataFrame, transformer):
+    output = transformer.transform(data)
+    # Rows with missing group are denoised like rows of one more object
+    expected = transformer.transform(data.fillna({"GROUP_ID": 0.0}))
+
+    pd.testing.assert_frame_equal(output.drop(columns="GROUP_ID"), expected.drop(columns="GROUP_ID"))
+    assert output["GROUP_ID"].isna().sum() == 6
+
+
+@pytest.mark.parametrize("threshold", [2000, 5000])
+def test_overlap_save_fourier_equals_full_signal_fft(signal: pd.Series, threshold):
+    transformer = FourierTransformer(threshold=threshold, block_size=1024)
+
+    output = transformer.transform(signal)
+
+    # Ends differ, because FFT of the whole series wraps them
+    overlap = transformer._get_filter()[1]
+    expected = FourierTransformer(threshold=threshold).transform(signal)
+    np.testing.assert_allclose(output[overlap:-overlap], expected[overlap:-overlap], atol=0.03)
+
+
+def test_streaming_fourier_equals_overlap_save_of_whole_series(signal: pd.Series):
+    transformer = FourierTransformer(threshold=2000, block_size=1024, keep_state=True)
+
+    bounds = [0, 3, 5000, 5001, 13_000, len(signal)]
+    chunks = [transformer.transform(signal.iloc[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+    output = np.concatenate([*chunks, transformer.flush()])
+
+    expected = FourierTransformer(threshold=2000, block_size=1024).transform(signal)
+    np.testing.assert_allclose(output, expected, rtol=1e-6)
+
+
+def test_multi_aggregator_equals_aggregators():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "a": rng.normal(size=300),
+        "b": rng.normal(size=300),
+        "mode": rng.choice(["x", "y"], size=300),
+    })
+    data.loc[rng.choice(300, size=30), "a"] = np.nan
+    data.loc[rng.choice(300, size=10), "b"] = np.inf
+    aggregators = [
+        Aggregator("a", "a_mean_10", window=10, agg_func="mean"),
+        Aggregator("b", "b_mean_10", window=10, agg_func="mean", shift_size=1),
+        Aggregator("a", "a_max", agg_func="max"),
+        Aggregator("b", "b_std_20", window=20, min_periods=5, agg_func="std", shift_size=-2),
+        Aggregator("a", "a_median_x", filter_column="mode", filter_value="x", window=15, agg_func="median"),
+        Aggregator("b", "b_quantile_x", filter_column="mode", filter_value="x", window=15, quantile=0.9),
+        Aggregator("a", "a_quantile", quantile=0.25, min_periods=3),
+        Aggregator("b", "b_mean_centered", window=7, min_periods=1, agg_func="mean", center=True),
+    ]
+
+    output = MultiAggregator(aggregators).transform(data.copy())
+
+    expected = data.copy()
+    for aggregator in aggregators:
+        expected = aggregator.transform(expected)
+    # Features are ordered by filters, so only columns set is the same
+    assert set(output.columns) == set(expected.columns)
+    pd.testing.assert_frame_equal(output, expected[output.columns])
+
+
+def test_cleaning_transformer_equals_separate_transformers(raw_data: pd.DataFrame):
+    output = CleaningTransformer().transform(raw_data)
+
+    expected = raw_data
+    for transformer in [ClipTransformer(), InfValuesTransformer(), FillNanTransformer()]:
+        expected = transformer.transform(expected)
+    pd.testing.assert_frame_equal(output, expected)
+
+
+def test_streaming_cleaning_transformer_equals_whole_data(raw_data: pd.DataFrame):
+    transformer = CleaningTransformer(keep_state=True)
+
+    bounds = [0, 1, 700, 1200, 1201, 2500, len(raw_data)]
+    output = pd.concat(
+        [transformer.transform(raw_data.iloc[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+    )
+
+    pd.testing.assert_frame_equal(output, CleaningTransformer().transform(raw_data))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from common.constants import FEATHER_EXTENSION, PARQUET_EXTENSION, PICKLE_EXTENSION
+from common.exceptions import DatasetWriteError
+from utilities.writers import DatasetWriter
+
+EXTENSIONS = [PICKLE_EXTENSION, PARQUET_EXTENSION, FEATHER_EXTENSION]
+
+
+def _write(path: Path, extension: str, chunks) -> pd.DataFrame:
+    with DatasetWriter(path / "dataset", extension=extension) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    if extension == PICKLE_EXTENSION:
+        return pd.read_pickle(writer.path)
+    if extension == PARQUET_EXTENSION:
+        return pd.read_parquet(writer.path)
+    return pd.read_feather(writer.path)
+
+
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_write_same_columns(tmp_path: Path, extension: str):
+    categories = ["x", "y"]
+    chunks = [
+        pd.DataFrame({"a": [1, 2], "b": pd.Categorical(["x", "y"], categories=categories)}),
+        pd.DataFrame({"a": [3], "b": pd.Categorical(["y"], categories=categories)}),
+    ]
+
+    output = _write(tmp_path, extension, chunks)
+
+    pd.testing.assert_frame_equal(output, pd.concat(chunks, ignore_index=True))
+    assert [path.name for path in tmp_path.iterdir()] == [f"dataset{extension}"]
+
+
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_write_unifies_columns_and_types(tmp_path: Path, extension: str):
+    chunks = [
+        pd.DataFrame({"a": [1, 2], "b": pd.Categorical(["x", "y"]), "c": [1, 2]}),
+        pd.DataFrame({"a": [1.5], "b": pd.Categorical(["z"]), "d": [0.5]}),
+        pd.DataFrame({"a": [3], "b": pd.Categorical(["x"]), "c": [3], "d": [1.0]}),
+    ]
+
+    output = _write(tmp_path, extension, chunks)
+
+    pd.testing.assert_frame_equal(output, pd.concat(chunks, ignore_index=True))
+    assert [path.name for path in tmp_path.iterdir()] == [f"dataset{extension}"]
+
+
+@pytest.mark.parametrize("extension", [PARQUET_EXTENSION, FEATHER_EXTENSION])
+def test_write_fails_on_incompatible_types(tmp_path: Path, extension: str):
+    with pytest.raises(DatasetWriteError):
+        _write(tmp_path, extension, [pd.DataFrame({"a": [True]}), pd.DataFrame({"a": [1.5]})])
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_abort_removes_segments(tmp_path: Path, extension: str):
+    writer = DatasetWriter(tmp_path / "dataset", extension=extension)
+    writer.write(pd.DataFrame({"a": [1.5]}))
+    writer.write(pd.DataFrame({"b": ["x"]}))
+
+    writer.abort()
+    writer.close()
+
+    assert not list(tmp_path.iterdir())